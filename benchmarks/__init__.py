@@ -0,0 +1,4 @@
+# Benchmarks of the DroidRpc client hot paths
+#
+# Run everything against a local stand-in bot service and write the results as JSON:
+#     python -m benchmarks --output bench.json
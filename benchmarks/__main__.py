@@ -0,0 +1,54 @@
+# Runs every benchmark and writes the results as JSON
+#
+# Usage:
+#     python -m benchmarks [--output bench.json] [--quick]
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+
+import grpc
+from google.protobuf.internal import api_implementation
+
+from . import client_bench, converter_bench, hot_paths
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "grpc": grpc.__version__,
+        "protobuf_implementation": api_implementation.Type(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the DroidRpc benchmarks and write the results as JSON.")
+    parser.add_argument("--output", "-o", default="-", help="File to write the JSON results to, '-' for stdout.")
+    parser.add_argument("--quick", action="store_true", help="Use few iterations, as a smoke test.")
+    args = parser.parse_args()
+
+    scale = 10 if args.quick else 1
+    results = {
+        "environment": environment(),
+        "client": client_bench.run(calls=2000 // scale),
+        "hot_paths": hot_paths.run(number=20000 // scale),
+        "converter": converter_bench.run(number=20000 // scale),
+    }
+    payload = json.dumps(results, indent=2, sort_keys=True)
+    if args.output == "-":
+        sys.stdout.write(payload + "\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+
+
+if __name__ == "__main__":
+    main()
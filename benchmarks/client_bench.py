@@ -0,0 +1,128 @@
+# End-to-end benchmark of create/hedge/stop against a local stand-in bot service
+#
+# Usage:
+#     python -m benchmarks.client_bench [--calls N] [--threads T] [--concurrency C]
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from DroidRpc import Client
+from DroidRpc.batch import fan_out
+from DroidRpc.testing import LocalGuardian
+
+from .stats import summarize
+
+
+def _inputs(client: Client):
+    """
+    Returns the keyword arguments of one create, hedge and stop call.
+    """
+    create = {
+        "ticker": "IBM",
+        "spot_date": "2022-02-15",
+        "investment_amount": 100000,
+        "bot_id": "CLASSIC_classic_025",
+        "price": 156.5,
+    }
+    bot = client.create_bot(**create)
+    position = {
+        "bot_id": bot["bot_id"],
+        "ticker": bot["ticker"],
+        "current_price": 160.0,
+        "entry_price": bot["entry_price"],
+        "last_share_num": bot["share_num"],
+        "last_hedge_delta": bot["delta"],
+        "investment_amount": 100000,
+        "bot_cash_balance": 100000 - bot["share_num"] * bot["entry_price"],
+        "stop_loss_price": bot["max_loss_price"],
+        "take_profit_price": bot["target_profit_price"],
+        "expiry": bot["expiry"],
+        "trading_day": "2022-02-16",
+    }
+    return {"create_bot": create, "hedge": position, "stop": position}
+
+
+def _timed(function, latencies):
+    clock = time.perf_counter_ns
+
+    def call(kwargs):
+        begin = clock()
+        result = function(**kwargs)
+        latencies.append(clock() - begin)
+        return result
+    return call
+
+
+def run_sequential(function, kwargs, calls: int) -> dict:
+    latencies = []
+    call = _timed(function, latencies)
+    start = time.perf_counter()
+    for _ in range(calls):
+        call(kwargs)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_threaded(function, kwargs, calls: int, threads: int) -> dict:
+    latencies = []  # list.append is atomic, so threads can share it
+    call = _timed(function, latencies)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, [kwargs] * calls))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_batch(function, kwargs, calls: int, concurrency: int) -> dict:
+    """
+    Runs the calls through `fan_out`, as `Client.hedge_many` and `Client.stop_many` do.
+    """
+    latencies = []
+    call = _timed(function, latencies)
+    start = time.perf_counter()
+    failures = sum(not item.ok for item in fan_out(call, [kwargs] * calls, concurrency, ordered=False))
+    summary = summarize(latencies, time.perf_counter() - start)
+    summary["failures"] = failures
+    return summary
+
+
+def run(calls: int = 2000, threads: int = 8, concurrency: int = 32, pool_size: int = 1) -> dict:
+    """
+    Benchmarks each client method in sequential, threaded and batch modes.
+
+    Returns:
+        dict: Timing summary per method and mode.
+    """
+    results = {}
+    with LocalGuardian(max_workers=max(threads, concurrency)) as guardian:
+        with Client(address=guardian.address, port=guardian.port, pool_size=pool_size) as client:
+            inputs = _inputs(client)
+            for method, kwargs in inputs.items():
+                function = getattr(client, method)
+                # Warm up the connection and the caches before timing.
+                run_sequential(function, kwargs, min(calls, 100))
+                results[method] = {
+                    "sequential": run_sequential(function, kwargs, calls),
+                    "threaded": run_threaded(function, kwargs, calls, threads),
+                    "batch": run_batch(function, kwargs, calls, concurrency),
+                }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark client calls against a local stand-in bot service.")
+    parser.add_argument("--calls", type=int, default=2000, help="Calls per method and mode.")
+    parser.add_argument("--threads", type=int, default=8, help="Threads in threaded mode.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Calls in flight in batch mode.")
+    parser.add_argument("--pool-size", type=int, default=1, help="Channels in the client's pool.")
+    args = parser.parse_args()
+    for method, modes in run(args.calls, args.threads, args.concurrency, args.pool_size).items():
+        for mode, result in modes.items():
+            print("%-10s %-10s %9.0f calls/s  p50 %8.1f us  p95 %8.1f us  p99 %8.1f us" % (
+                method, mode, result["throughput_per_s"], result["p50_us"], result["p95_us"], result["p99_us"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Benchmark of the converter functions
+#
+# Usage:
+#     python -m benchmarks.converter_bench [--number N]
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import argparse
+from datetime import datetime
+
+from DroidRpc.converter import protobuf_to_dict, dict_to_protobuf, dicts_to_protobufs, datetime_to_timestamp
+from DroidRpc.grpc_interface import bot_pb2
+
+from .stats import time_calls
+
+
+def sample_hedge():
+    """
+    Returns a fully populated Hedge message, as sent for a typical hedge.
+    """
+    return bot_pb2.Hedge(
+        bot_id="CLASSIC_classic_025",
+        ric="IBM",
+        current_price=170.0,
+        entry_price=156.5,
+        last_share_num=319.0,
+        last_hedge_delta=0.5,
+        investment_amount=100000,
+        bot_cash_balance=50076.5,
+        stop_loss_price=140.0,
+        take_profit_price=180.0,
+        expiry=datetime_to_timestamp(datetime(2022, 3, 15, 9, 30)),
+        strike=156.5,
+        strike_2=0,
+        margin=1,
+        fraction=0,
+        option_price=0,
+        barrier=0,
+        current_low_price=168.0,
+        current_high_price=171.0,
+        ask_price=170.1,
+        bid_price=169.9,
+        trading_day=datetime_to_timestamp(datetime(2022, 2, 16, 9, 30)),
+    )
+
+
+def _compare(legacy, compiled, number: int) -> dict:
+    """
+    Times a legacy and a compiled conversion and the ratio of their median latencies.
+    """
+    legacy = time_calls(legacy, number)
+    compiled = time_calls(compiled, number)
+    return {"legacy": legacy, "compiled": compiled, "speedup_p50": legacy["p50_us"] / compiled["p50_us"]}
+
+
+def run(number: int = 20000, batch_size: int = 1000) -> dict:
+    """
+    Times `protobuf_to_dict`, `dict_to_protobuf` and `dicts_to_protobufs` with and
+    without `compiled=True`, on Hedge messages.
+
+    Returns:
+        dict: Throughput and latency percentiles of each mode, per conversion or, for
+            `dicts_to_protobufs`, per batch of `batch_size` dicts, and the p50 speedup.
+    """
+    pb = sample_hedge()
+    assert protobuf_to_dict(pb) == protobuf_to_dict(pb, compiled=True)
+    results = {}
+    for label, kwargs in (
+        ("protobuf_to_dict", {}),
+        ("protobuf_to_dict_with_defaults", {"including_default_value_fields": True}),
+    ):
+        results[label] = _compare(lambda: protobuf_to_dict(pb, **kwargs),
+                                  lambda: protobuf_to_dict(pb, compiled=True, **kwargs), number)
+
+    values = protobuf_to_dict(pb)
+    assert dict_to_protobuf(bot_pb2.Hedge, values) == dict_to_protobuf(bot_pb2.Hedge, values, compiled=True)
+    results["dict_to_protobuf"] = _compare(lambda: dict_to_protobuf(bot_pb2.Hedge, values),
+                                           lambda: dict_to_protobuf(bot_pb2.Hedge, values, compiled=True), number)
+
+    batch = [values] * batch_size
+    results["dicts_to_protobufs_%d" % batch_size] = _compare(
+        lambda: list(dicts_to_protobufs(bot_pb2.Hedge, batch)),
+        lambda: list(dicts_to_protobufs(bot_pb2.Hedge, batch, compiled=True)),
+        max(number // batch_size, 1))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the converter functions.")
+    parser.add_argument("--number", type=int, default=20000, help="Conversions per mode.")
+    args = parser.parse_args()
+    for label, result in run(args.number).items():
+        for mode in ("legacy", "compiled"):
+            summary = result[mode]
+            print("%-32s %-8s p50 %9.2f us  p95 %9.2f us  p99 %9.2f us" % (
+                label, mode, summary["p50_us"], summary["p95_us"], summary["p99_us"]))
+        print("%-32s speedup at p50 %.2fx" % (label, result["speedup_p50"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Microbenchmarks of each stage of a client call
+#
+# Usage:
+#     python -m benchmarks.hot_paths [--number N]
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import argparse
+import json
+from datetime import datetime
+
+from DroidRpc import Client
+from DroidRpc.dates import date_to_timestamp
+from DroidRpc.converter import datetime_to_timestamp
+from DroidRpc.grpc_interface import bot_pb2
+from DroidRpc.json_backend import get_decoder
+from DroidRpc.testing import FakeEchoServicer
+
+from .stats import time_calls
+
+HEDGE_ARGS = (
+    bot_pb2.Hedge, "CLASSIC_classic_025", "IBM", 170.0, 156.5, 319.0, 0.5, 100000, 50076.5,
+    148.675, 172.15, "2022-05-17",
+)
+
+
+def run(number: int = 20000) -> dict:
+    """
+    Times the client-side stages of a hedge: argument conversion, request building,
+    serialization, reply parsing and JSON decoding.
+
+    Returns:
+        dict: Timing summary per stage.
+    """
+    # The channel is never used, building requests needs no server.
+    client = Client(address="127.0.0.1", port="1")
+    request = client._position_request(*HEDGE_ARGS, trading_day="2022-02-16")
+    wire_request = request.SerializeToString()
+    reply = bot_pb2.EchoReply(message=json.dumps(FakeEchoServicer().hedge_reply(request)))
+    wire_reply = reply.SerializeToString()
+
+    results = {
+        "strptime_date_conversion": time_calls(
+            lambda: datetime_to_timestamp(datetime.combine(datetime.strptime("2022-05-17", "%Y-%m-%d"), datetime.now().time())),
+            number),
+        "cached_date_conversion": time_calls(lambda: date_to_timestamp("2022-05-17"), number),
+        "build_create_request": time_calls(
+            lambda: client._create_request("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5), number),
+        "build_hedge_request": time_calls(lambda: client._position_request(*HEDGE_ARGS), number),
+        "serialize_hedge": time_calls(request.SerializeToString, number),
+        "parse_hedge": time_calls(lambda: bot_pb2.Hedge.FromString(wire_request), number),
+        "parse_reply": time_calls(lambda: bot_pb2.EchoReply.FromString(wire_reply), number),
+    }
+    for backend in ("json", "orjson", "ujson"):
+        try:
+            decode = get_decoder(backend)
+        except ImportError:
+            continue
+        results["decode_reply_%s" % backend] = time_calls(lambda: decode(reply.message), number)
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the stages of a client call.")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per stage.")
+    args = parser.parse_args()
+    for label, result in run(args.number).items():
+        print("%-28s mean %8.2f us  p50 %8.2f us  p99 %8.2f us" % (
+            label, result["mean_us"], result["p50_us"], result["p99_us"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Timing helpers shared by the benchmarks
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import time
+from typing import Callable, Dict, List, Sequence
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values.
+    """
+    if not sorted_values:
+        return float("nan")
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies_ns: List[int], wall_seconds: float) -> Dict[str, float]:
+    """
+    Throughput and latency percentiles, in microseconds, of a run.
+    """
+    ordered = sorted(latencies_ns)
+    return {
+        "calls": len(ordered),
+        "wall_s": wall_seconds,
+        "throughput_per_s": len(ordered) / wall_seconds if wall_seconds else float("nan"),
+        "mean_us": sum(ordered) / len(ordered) / 1e3 if ordered else float("nan"),
+        "p50_us": percentile(ordered, 0.50) / 1e3,
+        "p95_us": percentile(ordered, 0.95) / 1e3,
+        "p99_us": percentile(ordered, 0.99) / 1e3,
+    }
+
+
+def time_calls(function: Callable[[], object], number: int) -> Dict[str, float]:
+    """
+    Calls `function` `number` times, timing each call with `perf_counter_ns`.
+    """
+    latencies = []
+    append = latencies.append
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    for _ in range(number):
+        begin = clock()
+        function()
+        append(clock() - begin)
+    return summarize(latencies, time.perf_counter() - start)
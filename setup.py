@@ -17,11 +17,18 @@ setuptools.setup(
     url = 'https://asklora.ai',
     license='MIT',
     install_requires=required,
+    extras_require={
+        'fast-json': ['orjson'],
+        'numpy': ['numpy'],
+    },
     author = 'LORA Tech',
     author_email = 'asklora@loratechai.com',
     package_dir = {
             '': 'src'},
     packages=find_packages(where='src'),
     include_package_data=True,
+    entry_points={
+        'console_scripts': ['droidrpc = DroidRpc.cli:main'],
+    },
     zip_safe = False
 )
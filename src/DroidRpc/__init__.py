@@ -1,3 +1,6 @@
 from .client import Client
+from .async_client import AsyncClient
+from .results import CreateResult, HedgeResult, StopResult
+from .handle import BotHandle
 
-__all__ = ["Client"]
+__all__ = ["Client", "AsyncClient", "CreateResult", "HedgeResult", "StopResult", "BotHandle"]
@@ -0,0 +1,140 @@
+# Asyncio client for connecting to LORA Technologies' bot services
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from typing import Mapping, Optional
+from grpc import aio
+from .grpc_interface import bot_pb2_grpc, bot_pb2
+from .client import _BaseClient
+from .results import CreateResult, HedgeResult, StopResult
+
+
+class AsyncClient(_BaseClient):
+    """
+    Asyncio flavour of `Client` built on a `grpc.aio` channel.
+
+    Every method is a coroutine, so thousands of calls can be awaited concurrently
+    on one event loop without a thread per request, e.g.
+
+        async with AsyncClient(address='<HOST>') as client:
+            replies = await asyncio.gather(*(client.hedge(**p) for p in positions))
+
+    The channel is bound to the running event loop, so the client must be created
+    from inside the loop that awaits it.
+    """
+    def __init__(self, address: str = "guardian", port: str = "50065",
+                 json_backend: str = "auto", raw: bool = False, typed_results: bool = False,
+                 deadlines: Optional[Mapping[str, Optional[float]]] = None):
+        super().__init__(address, port, json_backend, raw, typed_results, deadlines)
+        self.channel = aio.insecure_channel(self.address + ":" + self.port)
+        # The generated stub is transport agnostic: over an aio channel its
+        # methods return awaitable calls.
+        self.stub = bot_pb2_grpc.EchoStub(self.channel)
+
+    async def close(self):
+        await self.channel.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def create_bot(
+        self,
+        ticker: str,
+        spot_date: str,
+        investment_amount: float,
+        bot_id: str,
+        margin: int = 1,
+        price: float = None,
+        fractionals: bool = False,
+        tp_multiplier: Optional[float] = None,
+        sl_multiplier: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        response = await self.stub.CreateBot(
+            self._create_request(
+                ticker, spot_date, investment_amount, bot_id, margin, price,
+                fractionals, tp_multiplier, sl_multiplier
+            ),
+            timeout=self._timeout("CreateBot", timeout)
+        )
+        return self._decode(response, CreateResult)
+
+    async def hedge(
+        self,
+        bot_id: str,
+        ticker: str,
+        current_price: float,
+        entry_price: float,
+        last_share_num: float,
+        last_hedge_delta: float,
+        investment_amount: float,
+        bot_cash_balance: float,
+        stop_loss_price: float,
+        take_profit_price: float,
+        expiry: str,
+        strike: Optional[float] = None,
+        strike_2: Optional[float] = None,
+        margin: Optional[int] = 1,
+        fractionals: Optional[bool] = False,
+        option_price: Optional[float] = None,
+        barrier: Optional[float] = None,
+        current_low_price: Optional[float] = None,
+        current_high_price: Optional[float] = None,
+        ask_price: Optional[float] = None,
+        bid_price: Optional[float] = None,
+        trading_day: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        response = await self.stub.HedgeBot(
+            self._position_request(
+                bot_pb2.Hedge, bot_id, ticker, current_price, entry_price,
+                last_share_num, last_hedge_delta, investment_amount, bot_cash_balance,
+                stop_loss_price, take_profit_price, expiry, strike, strike_2, margin,
+                fractionals, option_price, barrier, current_low_price, current_high_price,
+                ask_price, bid_price, trading_day
+            ),
+            timeout=self._timeout("HedgeBot", timeout)
+        )
+        return self._decode(response, HedgeResult)
+
+    async def stop(
+        self,
+        bot_id: str,
+        ticker: str,
+        current_price: float,
+        entry_price: float,
+        last_share_num: float,
+        last_hedge_delta: float,
+        investment_amount: float,
+        bot_cash_balance: float,
+        stop_loss_price: float,
+        take_profit_price: float,
+        expiry: str,
+        strike: Optional[float] = None,
+        strike_2: Optional[float] = None,
+        margin: Optional[int] = 1,
+        fractionals: Optional[bool] = False,
+        option_price: Optional[float] = None,
+        barrier: Optional[float] = None,
+        current_low_price: Optional[float] = None,
+        current_high_price: Optional[float] = None,
+        ask_price: Optional[float] = None,
+        bid_price: Optional[float] = None,
+        trading_day: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        response = await self.stub.StopBot(
+            self._position_request(
+                bot_pb2.Stop, bot_id, ticker, current_price, entry_price,
+                last_share_num, last_hedge_delta, investment_amount, bot_cash_balance,
+                stop_loss_price, take_profit_price, expiry, strike, strike_2, margin,
+                fractionals, option_price, barrier, current_low_price, current_high_price,
+                ask_price, bid_price, trading_day
+            ),
+            timeout=self._timeout("StopBot", timeout)
+        )
+        return self._decode(response, StopResult)
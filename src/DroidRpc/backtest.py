@@ -0,0 +1,186 @@
+# Backtests replaying historical prices through the bot service
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from collections.abc import Mapping
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from .batch import BatchItem, fan_out
+from .handle import BotHandle, _reply_field
+
+__all__ = ["Bar", "TimelineRow", "BacktestResult", "backtest", "backtest_many"]
+
+ACTIVE = "active"
+
+
+class Bar(NamedTuple):
+    """
+    Prices of one trading day, named like the `Client.hedge` arguments.
+    """
+    trading_day: str
+    current_price: float
+    current_low_price: Optional[float] = None
+    current_high_price: Optional[float] = None
+    ask_price: Optional[float] = None
+    bid_price: Optional[float] = None
+
+
+class TimelineRow(NamedTuple):
+    """
+    State of a backtested bot after one call.
+    """
+    trading_day: str
+    action: str
+    price: float
+    share_num: float
+    share_change: float
+    delta: float
+    option_price: float
+    bot_cash_balance: float
+    position_value: float
+    equity: float
+    pnl: float
+    status: str
+
+
+class BacktestResult:
+    """
+    Timeline of one backtested bot.
+
+    Attributes:
+        ticker (str): Ticker of the bot.
+        bot_id (str): Bot type.
+        investment_amount (float): Cash the bot started with.
+        timeline (list): One `TimelineRow` per call, starting with the creation.
+        exit_reason (str): "expired", "stop_loss", "take_profit", "stopped" (ended by the
+            bot service) or "end_of_data".
+    """
+    __slots__ = ("ticker", "bot_id", "investment_amount", "timeline", "exit_reason")
+
+    def __init__(self, ticker: str, bot_id: str, investment_amount: float):
+        self.ticker = ticker
+        self.bot_id = bot_id
+        self.investment_amount = investment_amount
+        self.timeline: List[TimelineRow] = []
+        self.exit_reason = None
+
+    @property
+    def pnl(self) -> float:
+        return self.timeline[-1].pnl if self.timeline else 0.0
+
+    def to_dicts(self) -> List[dict]:
+        return [row._asdict() for row in self.timeline]
+
+    def __repr__(self):
+        return "BacktestResult(%s %s, %d rows, exit_reason=%r, pnl=%.2f)" % (
+            self.ticker, self.bot_id, len(self.timeline), self.exit_reason, self.pnl)
+
+
+def _as_bar(bar) -> Bar:
+    if isinstance(bar, Bar):
+        return bar
+    if isinstance(bar, Mapping):
+        return Bar(**bar)
+    return Bar(*bar)
+
+
+def _record(result: BacktestResult, handle: BotHandle, bar: Bar, action: str, reply, status: str):
+    price = bar.current_price
+    position_value = handle.share_num * price
+    equity = handle.bot_cash_balance + position_value
+    share_change = _reply_field(reply, "share_change", handle.share_num if action == "create" else 0)
+    result.timeline.append(TimelineRow(
+        bar.trading_day, action, price, handle.share_num, share_change, handle.delta,
+        handle.option_price, handle.bot_cash_balance, position_value, equity,
+        equity - result.investment_amount, status,
+    ))
+
+
+def backtest(
+    client,
+    ticker: str,
+    bot_id: str,
+    bars: Iterable,
+    investment_amount: float,
+    margin: int = 1,
+    fractionals: bool = False,
+    tp_multiplier: Optional[float] = None,
+    sl_multiplier: Optional[float] = None
+) -> BacktestResult:
+    """
+    Creates a bot at the first bar and hedges it at every following one until it ends.
+
+    The bot is stopped at the bar's price on its expiry date, or once the bar's low
+    (or price) reaches the stop loss or its high (or price) the take profit. It also
+    ends when a hedge reply is no longer "active". Each hedge depends on the previous
+    reply, so one bot's calls are sequential; use `backtest_many` to run bots in parallel.
+
+    Args:
+        client (Client): Client sending the calls. Must not be in raw mode.
+        ticker (str): Ticker of the bot.
+        bot_id (str): Bot type, e.g. "CLASSIC_classic_025".
+        bars (Iterable): Daily prices in date order, as `Bar`s, tuples in `Bar` field order,
+            or mappings with `Bar` field names. `trading_day` is a "%Y-%m-%d" string.
+        investment_amount (float): Cash the bot starts with.
+        margin, fractionals, tp_multiplier, sl_multiplier: As in `Client.create_bot`.
+    """
+    bars = iter(bars)
+    first = next(bars, None)
+    result = BacktestResult(ticker, bot_id, investment_amount)
+    if first is None:
+        result.exit_reason = "end_of_data"
+        return result
+
+    first = _as_bar(first)
+    create_reply = client.create_bot(
+        ticker, first.trading_day, investment_amount, bot_id, margin, first.current_price,
+        fractionals, tp_multiplier, sl_multiplier,
+    )
+    handle = BotHandle(client, create_reply, investment_amount, margin=margin, fractionals=fractionals)
+    _record(result, handle, first, "create", create_reply, ACTIVE)
+    expiry = _reply_field(create_reply, "expiry")
+    stop_loss = _reply_field(create_reply, "max_loss_price", 0)
+    take_profit = _reply_field(create_reply, "target_profit_price", 0)
+
+    for bar in bars:
+        bar = _as_bar(bar)
+        low = bar.current_price if bar.current_low_price is None else bar.current_low_price
+        high = bar.current_price if bar.current_high_price is None else bar.current_high_price
+        if bar.trading_day >= expiry:
+            result.exit_reason = "expired"
+        elif stop_loss and low <= stop_loss:
+            result.exit_reason = "stop_loss"
+        elif take_profit and high >= take_profit:
+            result.exit_reason = "take_profit"
+        if result.exit_reason is not None:
+            reply = handle.stop(*bar[1:], trading_day=bar.trading_day)
+            _record(result, handle, bar, "stop", reply, _reply_field(reply, "status", "stopped"))
+            return result
+
+        reply = handle.hedge(*bar[1:], trading_day=bar.trading_day)
+        status = _reply_field(reply, "status", ACTIVE)
+        _record(result, handle, bar, "hedge", reply, status)
+        if status != ACTIVE:
+            result.exit_reason = "stopped"
+            return result
+
+    result.exit_reason = "end_of_data"
+    return result
+
+
+def backtest_many(client, runs: Iterable[Mapping], concurrency: int = 16,
+                  ordered: bool = True) -> Iterator[BatchItem]:
+    """
+    Runs many backtests with up to `concurrency` bots' calls in flight at once.
+
+    Args:
+        client (Client): Client sending the calls.
+        runs (Iterable[Mapping]): Keyword arguments of `backtest` (without `client`), one mapping per bot.
+        concurrency (int): Maximum number of bots backtested at once. Defaults to 16.
+        ordered (bool): Yield results in input order if True, otherwise as they complete. Defaults to True.
+
+    Yields:
+        BatchItem: The `BacktestResult`, or the error raised, for each run.
+    """
+    return fan_out(lambda run: backtest(client, **run), runs, concurrency, ordered)
@@ -0,0 +1,132 @@
+# Backup requests: duplicate slow idempotent calls to a second connection
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+import time
+from collections import Counter
+from typing import Any, Optional, Tuple
+
+import grpc
+
+from .metrics import LatencyHistogram
+
+__all__ = ["BackupPolicy"]
+
+
+class BackupPolicy:
+    """
+    Sends a duplicate of an idempotent call to a second stub when the first has not
+    answered within the `percentile` of recently observed latencies, uses whichever
+    reply arrives first and cancels the other.
+
+    Until `warmup` calls have been observed the delay is `initial_delay`. The delay is
+    always clamped to [`min_delay`, `max_delay`] seconds, so a burst of slow calls
+    cannot turn every call into two.
+    """
+    REFRESH_EVERY = 32
+
+    def __init__(self, percentile: float = 0.95, initial_delay: float = 0.05,
+                 min_delay: float = 0.001, max_delay: float = 1.0, warmup: int = 100):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1, got %r" % (percentile,))
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.warmup = warmup
+        self._lock = threading.Lock()
+        self._latency = LatencyHistogram()
+        self._initial_delay = initial_delay
+        self._delay = self._clamp(initial_delay)
+        self._stats = Counter()
+
+    def _clamp(self, delay: float) -> float:
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    @property
+    def delay(self) -> float:
+        """
+        Seconds to wait for the first reply before sending the duplicate.
+        """
+        return self._delay
+
+    def _observe(self, latency_ns: int):
+        with self._lock:
+            latency = self._latency
+            latency.record(latency_ns // 1000)
+            if latency.count >= self.warmup and latency.count % self.REFRESH_EVERY == 0:
+                self._delay = self._clamp(latency.percentile(self.percentile) / 1e6)
+
+    def call(self, primary: grpc.UnaryUnaryMultiCallable, backup: grpc.UnaryUnaryMultiCallable,
+             request, timeout: Optional[float] = None) -> Tuple[Any, bool, float]:
+        """
+        Calls `primary`, duplicating the call on `backup` if it is slow. Errors are only
+        raised once both calls failed; the first call's error is raised.
+
+        Returns:
+            (response, bool, float): The first reply, whether the backup sent it, and the
+            answering call's own latency in seconds, from when that call was sent.
+
+        The backup only gets the time left of `timeout`, so the pair never runs past the
+        call's deadline, and is not sent at all once none is left.
+        """
+        start = time.perf_counter_ns()
+        done = threading.Event()
+        first = primary.future(request, timeout=timeout)
+        first.add_done_callback(lambda _: done.set())
+        calls = [first]
+        sent = [start]
+        if not done.wait(self._delay):
+            now = time.perf_counter_ns()
+            remaining = None if timeout is None else timeout - (now - start) / 1e9
+            if remaining is None or remaining > 0:
+                second = backup.future(request, timeout=remaining)
+                second.add_done_callback(lambda _: done.set())
+                calls.append(second)
+                sent.append(now)
+        while True:
+            done.wait()
+            done.clear()
+            finished = [call for call in calls if call.done()]
+            winner = next((call for call in finished if call.exception() is None), None)
+            if winner is not None or len(finished) == len(calls):
+                break
+        for call in calls:
+            if call is not winner and not call.done():
+                call.cancel()
+        with self._lock:
+            stats = self._stats
+            stats["calls"] += 1
+            if len(calls) > 1:
+                stats["backups_sent"] += 1
+                if winner is calls[1]:
+                    stats["backup_wins"] += 1
+        if winner is None:
+            return first.result()
+        # The winner's own latency: a backup's does not include the delay waited before it.
+        latency_ns = time.perf_counter_ns() - sent[calls.index(winner)]
+        self._observe(latency_ns)
+        return winner.result(), winner is not first, latency_ns / 1e9
+
+    def stats(self) -> dict:
+        """
+        Returns how many calls were made, how many needed a backup and how many the
+        backup won, with the current delay in seconds.
+        """
+        with self._lock:
+            stats = self._stats
+            calls = stats["calls"]
+            return {
+                "calls": calls,
+                "backups_sent": stats["backups_sent"],
+                "backup_wins": stats["backup_wins"],
+                "backup_rate": stats["backups_sent"] / calls if calls else 0.0,
+                "delay": self._delay,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._latency = LatencyHistogram()
+            self._delay = self._clamp(self._initial_delay)
+            self._stats = Counter()
@@ -0,0 +1,135 @@
+# Bounded concurrent fan-out of bot service calls
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+__all__ = ["BatchItem", "BudgetExceeded", "fan_out"]
+
+
+class BudgetExceeded(TimeoutError):
+    """
+    A record of a batch did not finish within the batch's time budget.
+    """
+    def __init__(self, budget: float):
+        super().__init__("not finished within the batch budget of %gs" % (budget,))
+        self.budget = budget
+
+
+class BatchItem:
+    """
+    Outcome of one call in a batch.
+
+    Attributes:
+        index (int): Position of the record in the input iterable.
+        record: The input record the call was made with.
+        result: Parsed bot service response, or None if the call failed.
+        error (Exception): The exception raised by the call, or None if it succeeded.
+    """
+    __slots__ = ("index", "record", "result", "error")
+
+    def __init__(self, index: int, record: Any, result: Any = None, error: Exception = None):
+        self.index = index
+        self.record = record
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def missed(self) -> bool:
+        """
+        True if the call was skipped or cut off because the batch's time budget ran out.
+        """
+        return isinstance(self.error, BudgetExceeded)
+
+    def __repr__(self):
+        outcome = "error=%r" % (self.error,) if self.error is not None else "result=%r" % (self.result,)
+        return "BatchItem(index=%d, %s)" % (self.index, outcome)
+
+
+def _collect(index, record, future):
+    try:
+        return BatchItem(index, record, result=future.result())
+    except Exception as exc:
+        return BatchItem(index, record, error=exc)
+
+
+def _with_budget(call, budget: float):
+    """
+    Wraps `call` so every call gets the time left of `budget` as its timeout, and
+    failures once it is spent are reported as `BudgetExceeded`.
+    """
+    deadline = time.monotonic() + budget
+
+    def budgeted_call(record):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise BudgetExceeded(budget)
+        try:
+            return call(record, remaining)
+        except Exception as exc:
+            if time.monotonic() >= deadline:
+                raise BudgetExceeded(budget) from exc
+            raise
+    return budgeted_call
+
+
+def fan_out(
+    call: Callable[[Any], Any],
+    records: Iterable[Any],
+    concurrency: int = 16,
+    ordered: bool = True,
+    budget: Optional[float] = None,
+) -> Iterator[BatchItem]:
+    """
+    Runs `call` on every record with at most `concurrency` calls in flight.
+
+    Records are pulled from the iterable lazily, so arbitrarily long inputs run in
+    constant memory. A failing call is reported on its `BatchItem` and does not
+    abort the rest of the batch.
+
+    Args:
+        call (Callable): Function making one blocking call for a record.
+        records (Iterable): Input records.
+        concurrency (int): Maximum number of calls in flight. Defaults to 16.
+        ordered (bool): Yield items in input order if True, otherwise as they complete. Defaults to True.
+        budget (float): Seconds the whole batch may take. `call` is then called as
+            `call(record, timeout)` with the time left, and records that have not finished
+            when it runs out fail with `BudgetExceeded`. Defaults to None (no budget).
+
+    Yields:
+        BatchItem: One item per input record.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1, got %r" % (concurrency,))
+    if budget is not None:
+        call = _with_budget(call, budget)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if ordered:
+            window = deque()
+            for index, record in enumerate(records):
+                if len(window) >= concurrency:
+                    yield _collect(*window.popleft())
+                window.append((index, record, executor.submit(call, record)))
+            while window:
+                yield _collect(*window.popleft())
+        else:
+            in_flight = {}
+            for index, record in enumerate(records):
+                if len(in_flight) >= concurrency:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield _collect(*in_flight.pop(future), future)
+                in_flight[executor.submit(call, record)] = (index, record)
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _collect(*in_flight.pop(future), future)
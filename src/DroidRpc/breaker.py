@@ -0,0 +1,237 @@
+# Client-side circuit breakers and load shedding
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, Tuple
+
+import grpc
+
+__all__ = ["CircuitBreaker", "CircuitBreakers", "CircuitOpen", "LoadShedder", "Overloaded"]
+
+# Status codes meaning the service, not the request, is at fault.
+FAILURE_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.UNKNOWN,
+})
+
+
+class CircuitOpen(RuntimeError):
+    """
+    A call was rejected without being sent because its circuit is open.
+    """
+    def __init__(self, key: Tuple[str, str], retry_in: float):
+        super().__init__("circuit for %s %s is open, retry in %.2fs" % (key[0], key[1], retry_in))
+        self.key = key
+        self.retry_in = retry_in
+
+
+class Overloaded(RuntimeError):
+    """
+    A low-priority call was shed because too many calls were in flight.
+    """
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of recent calls to one method of one endpoint.
+
+    Closed, it lets every call through and opens once at least `min_calls` of the
+    last `window` calls were made and `failure_rate` of them failed or `slow_rate`
+    of them took longer than `slow_call` seconds. Open, it rejects calls with
+    `CircuitOpen` for `open_for` seconds and then turns half-open: up to `probes`
+    calls go through at a time, and `probes` good ones close the circuit again with
+    a clean window, while a failed or slow one reopens it.
+
+    Every change of state starts a new generation. `before` returns the generation a
+    call was admitted in and `after` takes it back, so a call admitted while closed
+    that finishes after the circuit turned half-open is not counted as a probe.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, key: Tuple[str, str] = ("", ""), failure_rate: float = 0.5,
+                 slow_rate: float = 0.8, slow_call: float = 2.0, window: int = 50,
+                 min_calls: int = 20, open_for: float = 5.0, probes: int = 3,
+                 time_source: Callable[[], float] = time.monotonic):
+        self.key = key
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate
+        self.slow_call = slow_call
+        self.min_calls = min_calls
+        self.open_for = open_for
+        self.probes = probes
+        self._time = time_source
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._failures = 0
+        self._slow = 0
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        self._generation = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.stats = Counter()
+
+    def before(self) -> int:
+        """
+        Admits a call, or raises `CircuitOpen`.
+
+        Returns:
+            int: Generation the call was admitted in, to pass to `after`.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return self._generation
+            if self.state == self.OPEN:
+                retry_in = self._opened_at + self.open_for - self._time()
+                if retry_in > 0:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpen(self.key, retry_in)
+                self.state = self.HALF_OPEN
+                self._generation += 1
+                self._probes_in_flight = 0
+                self._probe_successes = 0
+            if self._probes_in_flight >= self.probes:
+                self.stats["rejected"] += 1
+                raise CircuitOpen(self.key, 0.0)
+            self._probes_in_flight += 1
+            return self._generation
+
+    def after(self, generation: int, latency: float, failed: bool):
+        """
+        Records the outcome of a call admitted by `before` in `generation`. Calls admitted
+        before the last change of state are ignored.
+        """
+        slow = latency >= self.slow_call
+        with self._lock:
+            if generation != self._generation:
+                return
+            if self.state == self.HALF_OPEN:
+                self._probes_in_flight -= 1
+                if failed or slow:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.probes:
+                        self._close()
+                return
+            self._record(failed, slow)
+
+    def release(self, generation: int):
+        """
+        Lets go of a call admitted by `before` whose outcome is unknown, e.g. one cancelled
+        because a backup request answered first, without recording anything.
+        """
+        with self._lock:
+            if generation == self._generation and self.state == self.HALF_OPEN:
+                self._probes_in_flight -= 1
+
+    def record(self, latency: float, failed: bool):
+        """
+        Records the outcome of a call sent without `before`, e.g. a backup request. Only
+        counted while the circuit is closed, since it was never admitted as a probe.
+        """
+        slow = latency >= self.slow_call
+        with self._lock:
+            if self.state == self.CLOSED:
+                self._record(failed, slow)
+
+    def _record(self, failed: bool, slow: bool):
+        # Called with the lock held, while closed.
+        outcomes = self._outcomes
+        if len(outcomes) == outcomes.maxlen:
+            old_failed, old_slow = outcomes[0]
+            self._failures -= old_failed
+            self._slow -= old_slow
+        outcomes.append((failed, slow))
+        self._failures += failed
+        self._slow += slow
+        calls = len(outcomes)
+        if calls >= self.min_calls and (self._failures >= self.failure_rate * calls
+                                        or self._slow >= self.slow_rate * calls):
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self._generation += 1
+        self._opened_at = self._time()
+        self.stats["opened"] += 1
+
+    def _close(self):
+        self.state = self.CLOSED
+        self._generation += 1
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": self._failures / calls if calls else 0.0,
+                "slow_rate": self._slow / calls if calls else 0.0,
+                "opened": self.stats["opened"],
+                "rejected": self.stats["rejected"],
+            }
+
+
+class CircuitBreakers:
+    """
+    One `CircuitBreaker` per endpoint and method, created on first use with `settings`
+    (keyword arguments of `CircuitBreaker`). Can be shared by several clients.
+    """
+    def __init__(self, **settings):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, endpoint: str, method: str) -> CircuitBreaker:
+        key = (endpoint, method)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = self._breakers[key] = CircuitBreaker(key, **self.settings)
+        return breaker
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Returns the state and recent failure and slow call rates per "endpoint method".
+        """
+        return {"%s %s" % key: breaker.snapshot() for key, breaker in list(self._breakers.items())}
+
+
+class LoadShedder:
+    """
+    Counts calls in flight and sheds low-priority ones once `max_in_flight` are.
+    High-priority calls are never shed.
+    """
+    def __init__(self, max_in_flight: int):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1, got %r" % (max_in_flight,))
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, low_priority: bool):
+        with self._lock:
+            if low_priority and self.in_flight >= self.max_in_flight:
+                self.shed += 1
+                raise Overloaded("%d calls in flight, shedding low-priority call" % self.in_flight)
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
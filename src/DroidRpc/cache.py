@@ -0,0 +1,80 @@
+# Bounded TTL/LRU cache of bot service replies
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+__all__ = ["TTLCache"]
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe mapping of at most `maxsize` entries, each kept for `ttl` seconds.
+
+    The least recently used entry is evicted when the cache is full. Expired entries
+    are dropped when they are looked up.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0,
+                 time_source: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1, got %r" % (maxsize,))
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._time = time_source
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires, value = entry
+                if expires > self._time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            entries = self._entries
+            entries[key] = (self._time() + self.ttl, value)
+            entries.move_to_end(key)
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        Returns hit, miss, eviction and expiration counts, the hit rate and the size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,198 @@
+# Command line tool running create/hedge/stop calls in bulk
+#
+# Usage:
+#     droidrpc {create,hedge,stop} [INPUT] [--format csv|jsonl] [--address HOST] [--port PORT]
+#              [--concurrency N] [--ordered] [--output FILE] [--include-input]
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import argparse
+import csv
+import inspect
+import json
+import sys
+import typing
+from typing import Callable, Dict, Iterator, Optional
+
+import grpc
+
+from .batch import fan_out
+from .client import Client
+
+__all__ = ["main"]
+
+METHODS = {"create": "create_bot", "hedge": "hedge", "stop": "stop"}
+
+_TRUE = {"1", "true", "yes", "y", "t"}
+_FALSE = {"", "0", "false", "no", "n", "f"}
+
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError("not a boolean: %r" % (value,))
+
+
+def _field_parsers(function) -> Dict[str, Callable[[str], object]]:
+    """
+    Maps each argument of a `Client` method to a parser of its CSV text, from its annotation.
+    """
+    parsers = {}
+    hints = typing.get_type_hints(function)
+    for name in inspect.signature(function).parameters:
+        hint = hints.get(name, str)
+        # Optional[X] is Union[X, None].
+        args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        if args:
+            hint = args[0]
+        parsers[name] = {float: float, int: int, bool: _parse_bool}.get(hint, str)
+    return parsers
+
+
+def _csv_arguments(parsers: Dict[str, Callable]) -> Callable[[dict], dict]:
+    """
+    Returns a function converting a CSV row to the method's argument types. Empty cells
+    are left out, so the method's default applies.
+    """
+    def arguments(row: dict) -> dict:
+        return {
+            name: parsers.get(name, str)(value)
+            for name, value in row.items() if value is not None and value != ""
+        }
+    return arguments
+
+
+def _jsonl_arguments(line: str) -> dict:
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object: %s" % line.strip())
+    return record
+
+
+def _jsonl_lines(file) -> Iterator[str]:
+    for line in file:
+        if line.strip():
+            yield line
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, grpc.RpcError) and hasattr(error, "code"):
+        return "%s: %s" % (error.code().name, error.details())
+    return "%s: %s" % (type(error).__name__, error)
+
+
+def _input_json(record) -> str:
+    """
+    JSON of an input record: a JSONL line as it is (or as a string if it is not valid
+    JSON), a CSV row as an object of its cells.
+    """
+    if isinstance(record, str):
+        line = record.strip()
+        try:
+            json.loads(line)
+        except ValueError:
+            return json.dumps(line)
+        return line
+    return json.dumps(record)
+
+
+def _reply_json(text: str) -> str:
+    """
+    JSON of a raw reply for an output line: the reply as it is if it is one line of valid
+    JSON, otherwise a "reply_text" key holding it as a string.
+    """
+    if "\n" not in text and "\r" not in text:
+        try:
+            json.loads(text)
+        except ValueError:
+            pass
+        else:
+            return '"reply": %s' % text
+    return '"reply_text": %s' % json.dumps(text)
+
+
+def _format(path: Optional[str], requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def run(client: Client, method: str, records, arguments: Callable, output, concurrency: int = 16,
+        ordered: bool = False, include_input: bool = False) -> tuple:
+    """
+    Calls `method` for every record and writes one JSON line per reply as it completes.
+
+    Records are converted to keyword arguments by `arguments` on the worker threads, so
+    a malformed record fails on its own line instead of stopping the run.
+
+    Replies are written as they are under "reply", or as a string under "reply_text" if
+    they are not one line of JSON.
+
+    Returns:
+        (int, int): Number of successful and failed calls.
+    """
+    call = getattr(client, METHODS[method])
+    ok = failed = 0
+    for item in fan_out(lambda record: call(**arguments(record)), records, concurrency, ordered):
+        if item.ok:
+            ok += 1
+            line = '{"index": %d, "ok": true, %s' % (item.index, _reply_json(item.result))
+        else:
+            failed += 1
+            line = '{"index": %d, "ok": false, "error": %s' % (
+                item.index, json.dumps(_describe(item.error)))
+        if include_input:
+            line += ', "input": %s' % _input_json(item.record)
+        output.write(line + "}\n")
+    output.flush()
+    return ok, failed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="droidrpc",
+        description="Run create/hedge/stop calls for every CSV row or JSONL object of the input "
+                    "and stream the replies out as JSON lines, in completion order.")
+    parser.add_argument("method", choices=sorted(METHODS), help="Call to make for each record.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="CSV or JSONL file of keyword arguments, '-' for stdin (default).")
+    parser.add_argument("--format", choices=("csv", "jsonl"),
+                        help="Input format. Defaults to csv for *.csv files and jsonl otherwise.")
+    parser.add_argument("--address", default="guardian", help="Host of the bot service.")
+    parser.add_argument("--port", default="50065", help="Port of the bot service.")
+    parser.add_argument("--pool-size", type=int, default=1, help="Number of channels to spread calls over.")
+    parser.add_argument("--concurrency", "-c", type=int, default=16, help="Maximum number of calls in flight.")
+    parser.add_argument("--ordered", action="store_true", help="Write replies in input order.")
+    parser.add_argument("--output", "-o", default="-", help="File to write the JSON lines to, '-' for stdout.")
+    parser.add_argument("--include-input", action="store_true", help="Add each record to its output line.")
+    args = parser.parse_args(argv)
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        with Client(args.address, args.port, pool_size=args.pool_size, raw=True) as client:
+            if _format(None if args.input == "-" else args.input, args.format) == "csv":
+                records = csv.DictReader(input_file)
+                arguments = _csv_arguments(_field_parsers(getattr(Client, METHODS[args.method])))
+            else:
+                records = _jsonl_lines(input_file)
+                arguments = _jsonl_arguments
+            ok, failed = run(client, args.method, records, arguments, output, args.concurrency,
+                             args.ordered, args.include_input)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output is not sys.stdout:
+            output.close()
+    print("%d ok, %d failed" % (ok, failed), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
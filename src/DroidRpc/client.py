@@ -3,30 +3,76 @@
 __author__ = "LORA Technologies"
 __email__ = "asklora@loratechai.com"
 
-from typing import Optional
+from typing import Iterable, Iterator, Mapping, Optional, Union
 import grpc
 from .grpc_interface import bot_pb2_grpc, bot_pb2
-from datetime import datetime
-from .converter import datetime_to_timestamp
-import json
+from .batch import BatchItem, fan_out
+from .json_backend import get_decoder
+from .results import CreateResult, HedgeResult, StopResult
+from .dates import date_to_timestamp, trading_day_clock
+from .metrics import ClientMetrics, MetricsInterceptor
+from .profiling import CallProfiler
+from .backup import BackupPolicy
+from .breaker import FAILURE_CODES, CircuitBreakers, LoadShedder
+from .coalesce import SingleFlight, request_key
+from .cache import TTLCache
+import copy
+import itertools
+import time
 
 # TODO use pydantic dataclass to validate field types.
 
-class Client:
-    def __init__(self, address: str = "guardian", port: str = "50065"):
+class _BaseClient:
+    """
+    Request building shared by the blocking and the asyncio clients.
+    """
+    # Seconds each method may take unless overridden per client or per call. Creating
+    # a bot prices its option, so it gets longer than hedging or stopping one.
+    DEFAULT_DEADLINES = {"CreateBot": 30.0, "HedgeBot": 10.0, "StopBot": 10.0, "HedgeStream": None}
+
+    def __init__(self, address: str = "guardian", port: str = "50065",
+                 json_backend: str = "auto", raw: bool = False, typed_results: bool = False,
+                 deadlines: Optional[Mapping[str, Optional[float]]] = None):
         self.address = address
         self.port = port
-        self.channel = grpc.insecure_channel(self.address + ":" + self.port)
-        self.stub = bot_pb2_grpc.EchoStub(self.channel)
+        self.raw = raw
+        self.typed_results = typed_results
+        self._loads = get_decoder(json_backend)
+        self.profiler = None
+        self.deadlines = dict(self.DEFAULT_DEADLINES)
+        if deadlines:
+            unknown = set(deadlines) - set(self.DEFAULT_DEADLINES)
+            if unknown:
+                raise ValueError("unknown methods in deadlines: %s" % ", ".join(sorted(unknown)))
+            self.deadlines.update(deadlines)
 
-    def __string_to_datetime(self, date: str):
-        date = datetime.strptime(date, "%Y-%m-%d")
-        time = datetime.now().time()
+    def _timeout(self, method: str, timeout: Optional[float]) -> Optional[float]:
+        """
+        Returns the timeout of a call: `timeout` if given, otherwise the method's deadline.
+        """
+        return self.deadlines.get(method) if timeout is None else timeout
 
-        date_class = datetime_to_timestamp(datetime.combine(date, time))
-        return date_class
+    def _start_profile(self, method: str):
+        if self.profiler is None:
+            return None
+        return self.profiler.start(method)
 
-    def create_bot(
+    def _decode(self, response, result_class):
+        """
+        Parses the JSON payload of an `EchoReply` into a dict, or into `result_class` with
+        typed results. Raw mode returns the payload untouched.
+        """
+        if self.raw:
+            return response.message
+        reply = self._loads(response.message)
+        if self.typed_results:
+            return result_class.from_reply(reply)
+        return reply
+
+    def __string_to_datetime(self, date: str):
+        return date_to_timestamp(date)
+
+    def _create_request(
         self,
         ticker: str,
         spot_date: str,
@@ -38,10 +84,14 @@ class Client:
         tp_multiplier: Optional[float] = None,
         sl_multiplier: Optional[float] = None
     ):
-        response = self.stub.CreateBot(
-            bot_pb2.Create(
+        profile = self._start_profile("CreateBot")
+        try:
+            spot_date = self.__string_to_datetime(spot_date)
+            if profile is not None:
+                profile.mark("argument_conversion")
+            request = bot_pb2.Create(
                 ticker=ticker,
-                spot_date=self.__string_to_datetime(spot_date),
+                spot_date=spot_date,
                 investment_amount=investment_amount,
                 price=price,
                 bot_id=bot_id,
@@ -50,11 +100,17 @@ class Client:
                 tp_multiplier=tp_multiplier,
                 sl_multiplier=sl_multiplier
             )
-        )
-        return json.loads(response.message)
+        except BaseException:
+            if profile is not None:
+                self.profiler.abandon()
+            raise
+        if profile is not None:
+            profile.mark("proto_construction")
+        return request
 
-    def hedge(
+    def _position_request(
         self,
+        message_class,
         bot_id: str,
         ticker: str,
         current_price: float,
@@ -76,12 +132,23 @@ class Client:
         current_high_price: Optional[float] = None,
         ask_price: Optional[float] = None,
         bid_price: Optional[float] = None,
-        trading_day: Optional[str] = datetime.strftime(datetime.now().date(), "%Y-%m-%d")
+        trading_day: Optional[str] = None
     ):
-        response = self.stub.HedgeBot(
-            bot_pb2.Hedge(
+        """
+        Builds a `bot_pb2.Hedge` or `bot_pb2.Stop` message, which share the same fields.
+        The trading day defaults to today, read when the request is built.
+        """
+        profile = self._start_profile("HedgeBot" if message_class is bot_pb2.Hedge else "StopBot")
+        try:
+            if trading_day is None:
+                trading_day = trading_day_clock.today()
+            expiry = self.__string_to_datetime(expiry)
+            trading_day = self.__string_to_datetime(trading_day)
+            if profile is not None:
+                profile.mark("argument_conversion")
+            request = message_class(
                 ric=ticker,
-                expiry=self.__string_to_datetime(expiry),
+                expiry=expiry,
                 investment_amount=investment_amount,
                 current_price=current_price,
                 bot_id=bot_id,
@@ -101,10 +168,337 @@ class Client:
                 ask_price=ask_price,
                 bid_price=bid_price,
                 fraction=fractionals,
-                trading_day=self.__string_to_datetime(trading_day)
+                trading_day=trading_day
+            )
+        except BaseException:
+            if profile is not None:
+                self.profiler.abandon()
+            raise
+        if profile is not None:
+            profile.mark("proto_construction")
+        return request
+
+
+class Client(_BaseClient):
+    # Methods safe to send twice: hedging a bot with the same inputs gives the same reply.
+    BACKUP_METHODS = frozenset({"HedgeBot"})
+    # Methods shed first under load: a skipped hedge is retried on the next rebalance.
+    LOW_PRIORITY_METHODS = frozenset({"HedgeBot"})
+    # Unary method and result class of each request message, for `send`.
+    REQUEST_METHODS = {
+        bot_pb2.Create: ("CreateBot", CreateResult),
+        bot_pb2.Hedge: ("HedgeBot", HedgeResult),
+        bot_pb2.Stop: ("StopBot", StopResult),
+    }
+
+    def __init__(
+        self,
+        address: str = "guardian",
+        port: str = "50065",
+        pool_size: int = 1,
+        json_backend: str = "auto",
+        raw: bool = False,
+        typed_results: bool = False,
+        metrics: bool = False,
+        profile: bool = False,
+        backup_after: Optional[float] = None,
+        backup_address: Optional[str] = None,
+        deadlines: Optional[Mapping[str, Optional[float]]] = None,
+        circuit_breaker: Union[bool, CircuitBreakers] = False,
+        max_in_flight: Optional[int] = None,
+        coalesce: bool = False,
+        quote_cache: Union[bool, TTLCache] = False
+    ):
+        """
+        Args:
+            address (str): Host of the bot service. Defaults to "guardian".
+            port (str): Port of the bot service. Defaults to "50065".
+            pool_size (int): Number of channels, each with its own HTTP/2 connection, that
+                calls are spread over round-robin. Defaults to 1.
+            json_backend (str): Library decoding replies: "orjson", "ujson", "json", or "auto"
+                for the fastest one installed. Defaults to "auto".
+            raw (bool): Return the undecoded JSON payload of replies instead of a dict.
+                Defaults to False.
+            typed_results (bool): Return replies as `CreateResult`, `HedgeResult` and
+                `StopResult` objects, which hold large result sets in much less memory
+                than dicts. Defaults to False.
+            metrics (bool): Record per-method latency histograms, status codes and message
+                sizes, read with `metrics_snapshot()`. Defaults to False, which adds no
+                overhead to calls.
+            profile (bool): Time each phase of every call (argument conversion, request
+                construction, serialization, wire, deserialization, JSON decoding) into
+                `profiler`, a `CallProfiler`. Defaults to False.
+            backup_after (float): Percentile of recent `HedgeBot` latencies (e.g. 0.95) after
+                which an unanswered hedge is sent again over a second connection. The first
+                reply wins and the other call is cancelled. Defaults to None (disabled).
+            backup_address (str): Host receiving the backup hedges, e.g. another replica.
+                Defaults to `address`.
+            deadlines (Mapping[str, float]): Seconds a call may take per method name, merged
+                over `DEFAULT_DEADLINES`; None disables a method's deadline. A call that
+                runs out fails with `grpc.StatusCode.DEADLINE_EXCEEDED`.
+            circuit_breaker (bool | CircuitBreakers): Stop sending calls to a method that
+                keeps failing or is slow, raising `CircuitOpen` instead until probe calls
+                succeed again. Pass a `CircuitBreakers` to tune or share the breakers.
+                Defaults to False.
+            max_in_flight (int): Number of calls in flight above which hedges are shed with
+                `Overloaded`. Creating and stopping bots is never shed. Defaults to None
+                (no limit).
+            coalesce (bool): Send concurrent calls with identical requests (dates compared
+                by day) as one call whose reply they all share, counted in `coalescer`. Shared replies are the
+                same object, so they should not be modified. Defaults to False.
+            quote_cache (bool | TTLCache): Cache `create_bot` replies by request (dates
+                compared by day), so repeated quotes skip the round trip. True keeps up to
+                1024 quotes for 60 seconds; pass a `TTLCache` to size it. Defaults to False.
+        """
+        super().__init__(address, port, json_backend, raw, typed_results, deadlines)
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1, got %r" % (pool_size,))
+        # Channels to the same target share one connection through gRPC's global
+        # subchannel pool unless each channel keeps its own.
+        options = [("grpc.use_local_subchannel_pool", 1)] if pool_size > 1 else None
+        self.channels = [
+            grpc.insecure_channel(self.address + ":" + self.port, options=options)
+            for _ in range(pool_size)
+        ]
+        self.metrics = None
+        intercepted = self.channels
+        if metrics:
+            self.metrics = ClientMetrics()
+            self._interceptor = MetricsInterceptor(self.metrics)
+            intercepted = [grpc.intercept_channel(channel, self._interceptor) for channel in self.channels]
+        if profile:
+            self.profiler = CallProfiler()
+        self.stubs = [self._make_stub(channel) for channel in intercepted]
+        self.channel = self.channels[0]
+        self.stub = self.stubs[0]
+        self.__stub_cycle = itertools.cycle(self.stubs)
+        self.target = self.address + ":" + self.port
+        self.breakers = None
+        if circuit_breaker:
+            self.breakers = circuit_breaker if isinstance(circuit_breaker, CircuitBreakers) else CircuitBreakers()
+        self.shedder = None if max_in_flight is None else LoadShedder(max_in_flight)
+        self.coalescer = SingleFlight() if coalesce else None
+        self.quote_cache = None
+        if quote_cache:
+            self.quote_cache = quote_cache if isinstance(quote_cache, TTLCache) else TTLCache()
+        self.backup = None
+        if backup_after is not None:
+            self.backup = BackupPolicy(percentile=backup_after)
+            # A channel of its own, so a backup never queues behind the slow call.
+            self._backup_target = (backup_address or self.address) + ":" + self.port
+            backup_channel = grpc.insecure_channel(
+                self._backup_target,
+                options=[("grpc.use_local_subchannel_pool", 1)],
             )
+            self.channels.append(backup_channel)
+            if self.metrics is not None:
+                backup_channel = grpc.intercept_channel(backup_channel, self._interceptor)
+            self._backup_stub = self._make_stub(backup_channel)
+
+    def _make_stub(self, channel) -> bot_pb2_grpc.EchoStub:
+        if self.profiler is not None:
+            return self.profiler.stub(channel)
+        return bot_pb2_grpc.EchoStub(channel)
+
+    def _next_stub(self):
+        """
+        Picks the stub for the next call, round-robin over the channel pool.
+        """
+        return next(self.__stub_cycle)
+
+    def _call(self, method: str, request, result_class, timeout: Optional[float] = None):
+        """
+        Sends a prebuilt request to a unary method ("CreateBot", "HedgeBot" or "StopBot")
+        and decodes the reply. `timeout` overrides the method's deadline.
+        """
+        if self.coalescer is not None:
+            key = (method, request_key(request))
+            try:
+                # A caller sharing another's call still waits no longer than its own deadline.
+                return self.coalescer.do(key, self._invoke, method, request, result_class, timeout,
+                                         timeout=self._timeout(method, timeout))
+            finally:
+                if self.profiler is not None:
+                    # A follower shares the leader's call, so its own profile never finishes.
+                    self.profiler.abandon()
+        return self._invoke(method, request, result_class, timeout)
+
+    def _invoke(self, method: str, request, result_class, timeout: Optional[float]):
+        timeout = self._timeout(method, timeout)
+        if self.profiler is None:
+            return self._decode(self._send(method, request, timeout), result_class)
+
+        profile = self.profiler.current()
+        if profile is None or profile.method != method:
+            # Prebuilt requests (e.g. from a BotHandle) start timing here.
+            profile = self.profiler.start(method)
+        try:
+            response = self._send(method, request, timeout)
+            profile.mark("grpc_overhead")
+            result = self._decode(response, result_class)
+            profile.mark("json_decode")
+        except BaseException:
+            self.profiler.abandon()
+            raise
+        self.profiler.finish(profile)
+        return result
+
+    def _send(self, method: str, request, timeout: Optional[float]):
+        if self.breakers is None and self.shedder is None:
+            return self._dispatch(method, request, timeout)[0]
+
+        shedder = self.shedder
+        if shedder is not None:
+            shedder.acquire(method in self.LOW_PRIORITY_METHODS)
+        try:
+            if self.breakers is None:
+                return self._dispatch(method, request, timeout)[0]
+            breaker = self.breakers.get(self.target, method)
+            generation = breaker.before()
+            start = time.perf_counter()
+            try:
+                response, target, latency = self._dispatch(method, request, timeout)
+            except grpc.RpcError as error:
+                breaker.after(generation, time.perf_counter() - start, error.code() in FAILURE_CODES)
+                raise
+            except BaseException:
+                breaker.after(generation, time.perf_counter() - start, False)
+                raise
+            if target == self.target:
+                breaker.after(generation, latency, False)
+            else:
+                # The backup replica answered, so the outcome is its own; the primary's is unknown.
+                breaker.release(generation)
+                self.breakers.get(target, method).record(latency, False)
+            return response
+        finally:
+            if shedder is not None:
+                shedder.release()
+
+    def _dispatch(self, method: str, request, timeout: Optional[float]):
+        """
+        Sends `request` and returns the response, the endpoint that answered it and that
+        call's own latency in seconds.
+        """
+        stub = self._next_stub()
+        if self.backup is not None and method in self.BACKUP_METHODS:
+            response, backup_won, latency = self.backup.call(
+                getattr(stub, method), getattr(self._backup_stub, method), request, timeout)
+            return response, self._backup_target if backup_won else self.target, latency
+        start = time.perf_counter()
+        response = getattr(stub, method)(request, timeout=timeout)
+        return response, self.target, time.perf_counter() - start
+
+    def backup_stats(self) -> dict:
+        """
+        Returns how many hedges were sent, how many needed a backup request and how many
+        of those the backup answered first. Empty if backups are disabled.
+        """
+        if self.backup is None:
+            return {}
+        return self.backup.stats()
+
+    def metrics_snapshot(self) -> dict:
+        """
+        Returns the recorded metrics per method, e.g.
+
+            {"/echo.Echo/HedgeBot": {"latency": {"count": 1000, "p50_us": 850, "p99_us": 2047, ...},
+                                     "status_codes": {"OK": 1000},
+                                     "request_bytes": 96000, "response_bytes": 310000}}
+
+        Empty if the client was created without `metrics=True`.
+        """
+        if self.metrics is None:
+            return {}
+        return self.metrics.snapshot()
+
+    def close(self):
+        for channel in self.channels:
+            channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def create_bot(
+        self,
+        ticker: str,
+        spot_date: str,
+        investment_amount: float,
+        bot_id: str,
+        margin: int = 1,
+        price: float = None,
+        fractionals: bool = False,
+        tp_multiplier: Optional[float] = None,
+        sl_multiplier: Optional[float] = None,
+        timeout: Optional[float] = None,
+        bypass_cache: bool = False
+    ):
+        """
+        Creates a bot. With a `quote_cache`, a cached reply for the same request is
+        returned without calling the service, unless `bypass_cache` is set, in which case
+        the service is called and the cache refreshed with its reply.
+        """
+        request = self._create_request(
+            ticker, spot_date, investment_amount, bot_id, margin, price,
+            fractionals, tp_multiplier, sl_multiplier
+        )
+        cache = self.quote_cache
+        if cache is None:
+            return self._call("CreateBot", request, CreateResult, timeout)
+
+        key = request_key(request)
+        if not bypass_cache:
+            reply = cache.get(key)
+            if reply is not None:
+                if self.profiler is not None:
+                    self.profiler.abandon()
+                # Callers may modify their reply, so the cached one is never handed out.
+                return copy.copy(reply)
+        reply = self._call("CreateBot", request, CreateResult, timeout)
+        cache.put(key, copy.copy(reply))
+        return reply
+
+    def hedge(
+        self,
+        bot_id: str,
+        ticker: str,
+        current_price: float,
+        entry_price: float,
+        last_share_num: float,
+        last_hedge_delta: float,
+        investment_amount: float,
+        bot_cash_balance: float,
+        stop_loss_price: float,
+        take_profit_price: float,
+        expiry: str,
+        strike: Optional[float] = None,
+        strike_2: Optional[float] = None,
+        margin: Optional[int] = 1,
+        fractionals: Optional[bool] = False,
+        option_price: Optional[float] = None,
+        barrier: Optional[float] = None,
+        current_low_price: Optional[float] = None,
+        current_high_price: Optional[float] = None,
+        ask_price: Optional[float] = None,
+        bid_price: Optional[float] = None,
+        trading_day: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        return self._call(
+            "HedgeBot",
+            self._position_request(
+                bot_pb2.Hedge, bot_id, ticker, current_price, entry_price,
+                last_share_num, last_hedge_delta, investment_amount, bot_cash_balance,
+                stop_loss_price, take_profit_price, expiry, strike, strike_2, margin,
+                fractionals, option_price, barrier, current_low_price, current_high_price,
+                ask_price, bid_price, trading_day
+            ),
+            HedgeResult,
+            timeout
         )
-        return json.loads(response.message)
     
     def stop(
         self,
@@ -129,33 +523,132 @@ class Client:
         current_high_price: Optional[float] = None,
         ask_price: Optional[float] = None,
         bid_price: Optional[float] = None,
-        trading_day: Optional[str] = datetime.strftime(datetime.now().date(), "%Y-%m-%d")
+        trading_day: Optional[str] = None,
+        timeout: Optional[float] = None
     ):
-        response = self.stub.StopBot(
-            bot_pb2.Stop(
-                ric=ticker,
-                expiry=self.__string_to_datetime(expiry),
-                investment_amount=investment_amount,
-                current_price=current_price,
-                bot_id=bot_id,
-                margin=margin,
-                entry_price=entry_price,
-                last_share_num=last_share_num,
-                last_hedge_delta=last_hedge_delta,
-                bot_cash_balance=bot_cash_balance,
-                stop_loss_price=stop_loss_price,
-                take_profit_price=take_profit_price,
-                option_price=option_price,
-                strike=strike,
-                strike_2=strike_2,
-                barrier=barrier,
-                current_low_price=current_low_price,
-                current_high_price=current_high_price,
-                ask_price=ask_price,
-                bid_price=bid_price,
-                fraction=fractionals,
-                trading_day=self.__string_to_datetime(trading_day)
-            )
+        return self._call(
+            "StopBot",
+            self._position_request(
+                bot_pb2.Stop, bot_id, ticker, current_price, entry_price,
+                last_share_num, last_hedge_delta, investment_amount, bot_cash_balance,
+                stop_loss_price, take_profit_price, expiry, strike, strike_2, margin,
+                fractionals, option_price, barrier, current_low_price, current_high_price,
+                ask_price, bid_price, trading_day
+            ),
+            StopResult,
+            timeout
         )
-        return json.loads(response.message)
-        
+
+    def send(self, request, timeout: Optional[float] = None):
+        """
+        Sends a prebuilt `bot_pb2.Create`, `bot_pb2.Hedge` or `bot_pb2.Stop` request, e.g.
+        from a `BotHandle`, and returns the reply as `create_bot`, `hedge` or `stop` would.
+        Creates sent this way do not go through the quote cache.
+        """
+        try:
+            method, result_class = self.REQUEST_METHODS[type(request)]
+        except KeyError:
+            raise TypeError("cannot send a %s request" % type(request).__name__) from None
+        return self._call(method, request, result_class, timeout)
+
+    def _fan_out(self, call, method, positions, concurrency, ordered, budget):
+        if budget is None:
+            return fan_out(lambda position: call(**position), positions, concurrency, ordered)
+
+        def budgeted_call(position, remaining):
+            # Never wait past the budget, nor longer than the call would without it.
+            timeout = self._timeout(method, position.get("timeout"))
+            timeout = remaining if timeout is None else min(timeout, remaining)
+            return call(**dict(position, timeout=timeout))
+        return fan_out(budgeted_call, positions, concurrency, ordered, budget)
+
+    def hedge_many(
+        self,
+        positions: Iterable[Mapping],
+        concurrency: int = 16,
+        ordered: bool = True,
+        budget: Optional[float] = None
+    ) -> Iterator[BatchItem]:
+        """
+        Hedges many bots with a bounded number of `HedgeBot` calls in flight.
+
+        Args:
+            positions (Iterable[Mapping]): Keyword arguments for `Client.hedge`, one mapping per bot.
+            concurrency (int): Maximum number of calls in flight. Defaults to 16.
+            ordered (bool): Yield results in input order if True, otherwise as they complete. Defaults to True.
+            budget (float): Seconds the whole batch may take. Bots not done by then are
+                reported with `BatchItem.missed` set instead of delaying the batch further.
+                Defaults to None (no budget).
+
+        Yields:
+            BatchItem: The parsed response, or the error raised, for each position.
+        """
+        return self._fan_out(self.hedge, "HedgeBot", positions, concurrency, ordered, budget)
+
+    def stop_many(
+        self,
+        positions: Iterable[Mapping],
+        concurrency: int = 16,
+        ordered: bool = True,
+        budget: Optional[float] = None
+    ) -> Iterator[BatchItem]:
+        """
+        Stops many bots with a bounded number of `StopBot` calls in flight.
+
+        Args:
+            positions (Iterable[Mapping]): Keyword arguments for `Client.stop`, one mapping per bot.
+            concurrency (int): Maximum number of calls in flight. Defaults to 16.
+            ordered (bool): Yield results in input order if True, otherwise as they complete. Defaults to True.
+            budget (float): Seconds the whole batch may take. Bots not done by then are
+                reported with `BatchItem.missed` set instead of delaying the batch further.
+                Defaults to None (no budget).
+
+        Yields:
+            BatchItem: The parsed response, or the error raised, for each position.
+        """
+        return self._fan_out(self.stop, "StopBot", positions, concurrency, ordered, budget)
+
+    def hedge_stream(self, positions: Iterable[Mapping], timeout: Optional[float] = None) -> Iterator[dict]:
+        """
+        Hedges many bots over one long-lived bidirectional `HedgeStream` call.
+
+        Positions are read lazily from the iterable (e.g. a generator fed by a
+        rebalancer) and sent as they are produced, so every hedge shares one
+        HTTP/2 stream instead of paying per-call setup.
+
+        A position that cannot be turned into a request (or an error raised by the
+        iterable itself) ends the stream: the replies to every earlier position are
+        still yielded, and then the original error is raised.
+
+        Args:
+            positions (Iterable[Mapping]): Keyword arguments for `Client.hedge`, one mapping
+                per bot, without `timeout`.
+            timeout (Optional[float]): Seconds the whole stream may last. Defaults to the
+                "HedgeStream" deadline, which is None (no deadline) unless set through
+                `deadlines`, since the stream lasts as long as positions keep coming.
+
+        Yields:
+            dict: Parsed bot service response, one per position and in the same order.
+        """
+        # gRPC reads the requests on its own thread and would replace any error raised
+        # there by a bare UNKNOWN status, so errors are kept here and raised on ours.
+        errors = []
+
+        def requests():
+            try:
+                for position in positions:
+                    if "timeout" in position:
+                        raise TypeError("hedge_stream positions share one call, pass timeout to hedge_stream instead")
+                    request = self._position_request(bot_pb2.Hedge, **position)
+                    if self.profiler is not None:
+                        # Streamed hedges share one call, so they are not profiled one by one.
+                        self.profiler.abandon()
+                    yield request
+            except Exception as exc:
+                errors.append(exc)
+
+        responses = self._next_stub().HedgeStream(requests(), timeout=self._timeout("HedgeStream", timeout))
+        for response in responses:
+            yield self._decode(response, HedgeResult)
+        if errors:
+            raise errors[0]
@@ -0,0 +1,126 @@
+# Single-flight coalescing of identical concurrent calls
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import grpc
+from google.protobuf.message import Message
+
+__all__ = ["DeadlineExceeded", "SingleFlight", "request_key"]
+
+_DAY = 86400
+_TIMESTAMP_FIELDS: Dict[Any, Tuple[str, ...]] = {}
+
+
+def request_key(request: Message) -> bytes:
+    """
+    Serialized `request` with its Timestamp fields truncated to the day.
+
+    Dates are sent at the current time of day, so two requests built from the same
+    "%Y-%m-%d" arguments a microsecond apart differ in their bytes but not in meaning.
+    """
+    descriptor = request.DESCRIPTOR
+    fields = _TIMESTAMP_FIELDS.get(descriptor)
+    if fields is None:
+        fields = _TIMESTAMP_FIELDS[descriptor] = tuple(
+            field.name for field in descriptor.fields
+            if field.message_type is not None and field.message_type.full_name == "google.protobuf.Timestamp"
+        )
+    normalized = None
+    for name in fields:
+        if request.HasField(name):
+            if normalized is None:
+                normalized = type(request)()
+                normalized.CopyFrom(request)
+            timestamp = getattr(normalized, name)
+            timestamp.seconds -= timestamp.seconds % _DAY
+            timestamp.nanos = 0
+    return (normalized or request).SerializeToString()
+
+
+class DeadlineExceeded(grpc.RpcError):
+    """
+    A coalesced call ran out of time waiting for the call it shares. Reports
+    `grpc.StatusCode.DEADLINE_EXCEEDED`, like a call of its own would have.
+    """
+    def __init__(self, timeout: float):
+        super().__init__("Deadline Exceeded after %gs waiting for a coalesced call" % (timeout,))
+        self.timeout = timeout
+
+    def code(self) -> grpc.StatusCode:
+        return grpc.StatusCode.DEADLINE_EXCEEDED
+
+    def details(self) -> str:
+        return "Deadline Exceeded"
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time: callers arriving while a call with the same key
+    is in flight wait for it and share its result, or its exception.
+
+    Only concurrent calls are merged. Once a call returns, the next one with the same
+    key runs again, so results are never served stale.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, call: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """
+        Runs `call(*args)`, or waits for the call in flight with the same key. A waiting
+        caller gives up after `timeout` seconds with `DeadlineExceeded`, leaving the
+        call in flight to the others.
+        """
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                leader = True
+
+        if not leader:
+            if not flight.done.wait(timeout):
+                raise DeadlineExceeded(timeout)
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = call(*args)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def stats(self) -> dict:
+        """
+        Returns the number of calls made and how many of them shared another's call.
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            }
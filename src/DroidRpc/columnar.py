@@ -0,0 +1,163 @@
+# Columnar NumPy storage of hedge replies for vectorized aggregation
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+from .batch import BatchItem
+
+__all__ = ["HedgeResultColumns"]
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for columnar results: pip install DroidRpc[numpy]")
+
+
+class _Categories:
+    """
+    Interns strings (tickers, statuses) to small integer codes.
+    """
+    __slots__ = ("labels", "codes")
+
+    def __init__(self):
+        self.labels = []
+        self.codes = {}
+
+    def code(self, label) -> int:
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class HedgeResultColumns:
+    """
+    Collects `HedgeBot` replies into NumPy columns, one row per reply.
+
+    Numeric reply fields are copied into float64 arrays and the ticker and status
+    strings into integer codes, so aggregating thousands of replies is vectorized.
+    Replies must be parsed, as dicts or `HedgeResult`; raw JSON strings from
+    `Client(raw=True)` are rejected. Failed calls take a row with `ok` False and NaN
+    values, which keeps rows aligned with the input positions.
+
+        columns = HedgeResultColumns.collect(client.hedge_many(positions))
+        columns.sum_by_ticker("share_change")
+
+    Attributes:
+        tickers (list): Ticker of each ticker code.
+        statuses (list): Status string of each status code.
+    """
+    NUMERIC_FIELDS = ("share_num", "delta", "share_change", "current_price", "option_price")
+
+    def __init__(self, capacity: int = 1024):
+        _require_numpy()
+        self._size = 0
+        self._capacity = max(int(capacity), 1)
+        self._numeric = {name: np.empty(self._capacity, dtype=np.float64) for name in self.NUMERIC_FIELDS}
+        self._ticker = np.empty(self._capacity, dtype=np.int32)
+        self._status = np.empty(self._capacity, dtype=np.int16)
+        self._ok = np.empty(self._capacity, dtype=np.bool_)
+        self._tickers = _Categories()
+        self._statuses = _Categories()
+
+    @classmethod
+    def collect(cls, items: Iterable[BatchItem], capacity: int = 1024) -> "HedgeResultColumns":
+        """
+        Builds the columns from the items yielded by `Client.hedge_many`.
+        """
+        columns = cls(capacity)
+        columns.extend(items)
+        return columns
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, column in self._numeric.items():
+            self._numeric[name] = np.resize(column, self._capacity)
+        self._ticker = np.resize(self._ticker, self._capacity)
+        self._status = np.resize(self._status, self._capacity)
+        self._ok = np.resize(self._ok, self._capacity)
+
+    def append(self, reply: Optional[Any], ticker: Optional[str] = None):
+        """
+        Appends one reply, a dict or `HedgeResult`, or None for a failed call.
+        """
+        if isinstance(reply, (str, bytes)):
+            raise TypeError("cannot collect raw replies; use a client with raw=False")
+        if self._size == self._capacity:
+            self._grow()
+        row = self._size
+        if reply is None:
+            for column in self._numeric.values():
+                column[row] = np.nan
+            status = None
+        else:
+            get = reply.get if isinstance(reply, Mapping) else lambda name: getattr(reply, name)
+            for name, column in self._numeric.items():
+                value = get(name)
+                column[row] = np.nan if value is None else value
+            status = get("status")
+        self._ticker[row] = self._tickers.code(ticker)
+        self._status[row] = self._statuses.code(status)
+        self._ok[row] = reply is not None
+        self._size = row + 1
+
+    def extend(self, items: Iterable[BatchItem]):
+        """
+        Appends the items yielded by `Client.hedge_many`, taking tickers from their records.
+        """
+        for item in items:
+            self.append(item.result if item.error is None else None, item.record.get("ticker"))
+
+    @property
+    def tickers(self) -> list:
+        return self._tickers.labels
+
+    @property
+    def statuses(self) -> list:
+        return self._statuses.labels
+
+    def column(self, name: str):
+        """
+        Returns a view of a numeric column, or of the "ticker", "status" or "ok" codes.
+        """
+        if name == "ticker":
+            return self._ticker[:self._size]
+        if name == "status":
+            return self._status[:self._size]
+        if name == "ok":
+            return self._ok[:self._size]
+        return self._numeric[name][:self._size]
+
+    def columns(self) -> Dict[str, Any]:
+        """
+        Returns views of every column, keyed by name.
+        """
+        names = self.NUMERIC_FIELDS + ("ticker", "status", "ok")
+        return {name: self.column(name) for name in names}
+
+    def sum_by_ticker(self, name: str = "share_change") -> Dict[str, float]:
+        """
+        Sums a numeric column per ticker over the successful replies.
+        """
+        ok = self.column("ok")
+        totals = np.bincount(self.column("ticker")[ok], weights=self.column(name)[ok],
+                             minlength=len(self._tickers.labels))
+        return dict(zip(self._tickers.labels, totals.tolist()))
+
+    def status_counts(self) -> Dict[Optional[str], int]:
+        """
+        Counts rows per reply status. Failed calls are counted under None.
+        """
+        counts = np.bincount(self.column("status"), minlength=len(self._statuses.labels))
+        return dict(zip(self._statuses.labels, counts.tolist()))
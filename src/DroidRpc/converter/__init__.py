@@ -1,13 +1,14 @@
 # -*- coding:utf-8 -*-
 import six
 import datetime
+import threading
 
 from google.protobuf.message import Message
 from google.protobuf.descriptor import FieldDescriptor
 from google.protobuf.timestamp_pb2 import Timestamp
 
 __all__ = ["protobuf_to_dict", "TYPE_CALLABLE_MAP", "dict_to_protobuf",
-           "REVERSE_TYPE_CALLABLE_MAP"]
+           "dicts_to_protobufs", "REVERSE_TYPE_CALLABLE_MAP"]
 
 Timestamp_type_name = 'Timestamp'
 
@@ -63,7 +64,18 @@ def _is_map_entry(field):
 
 
 def protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False,
-                     including_default_value_fields=False, lowercase_enum_lables=False):
+                     including_default_value_fields=False, lowercase_enum_lables=False,
+                     compiled=False):
+    """Converts a protobuf message to a dictionary.
+
+    :param bool compiled: reuse a conversion plan built once per message type and set of
+       options instead of inspecting every field of every message. Worth it when many
+       messages of the same type are converted. Plans are cached by `type_callable_map`
+       identity, so mutate a map only before it is first used in compiled mode.
+    """
+    if compiled:
+        return _get_to_dict_plan(pb.DESCRIPTOR, type_callable_map, use_enum_labels,
+                                 including_default_value_fields, lowercase_enum_lables).convert(pb)
     result_dict = {}
     extensions = {}
     for field, value in pb.ListFields():
@@ -139,12 +151,152 @@ def _get_field_value_adaptor(pb, field, type_callable_map=TYPE_CALLABLE_MAP, use
         pb.__class__.__name__, field.name, field.type))
 
 
+_PLANS_LOCK = threading.RLock()
+# Plans being compiled by the thread holding `_PLANS_LOCK`. Recursive message types
+# find their unfinished plan here; the whole set is published once the outermost
+# plan is compiled, so other threads only ever see finished plans.
+_PENDING_PLANS = {}
+
+
+def _cached_plan(plans, key, plan_class, *args):
+    plan = plans.get(key)
+    if plan is not None:
+        return plan
+    with _PLANS_LOCK:
+        plan = plans.get(key)
+        if plan is not None:
+            return plan
+        pending = _PENDING_PLANS.get((id(plans), key))
+        if pending is not None:
+            return pending[2]
+        outermost = not _PENDING_PLANS
+        plan = plan_class(*args)
+        _PENDING_PLANS[(id(plans), key)] = (plans, key, plan)
+        try:
+            plan.compile()
+            if outermost:
+                for cache, cache_key, compiled in _PENDING_PLANS.values():
+                    cache[cache_key] = compiled
+        finally:
+            if outermost:
+                _PENDING_PLANS.clear()
+    return plan
+
+
+_TO_DICT_PLANS = {}
+
+
+def _get_to_dict_plan(descriptor, type_callable_map, use_enum_labels,
+                      including_default_value_fields, lowercase_enum_lables):
+    key = (descriptor, id(type_callable_map), use_enum_labels,
+           including_default_value_fields, lowercase_enum_lables)
+    return _cached_plan(_TO_DICT_PLANS, key, _ToDictPlan, descriptor, type_callable_map,
+                        use_enum_labels, including_default_value_fields, lowercase_enum_lables)
+
+
+class _ToDictPlan(object):
+    """Conversion plan for one message type and set of `protobuf_to_dict` options.
+
+    Field adaptors, repeated/map wrappers and nested plans are resolved once, so
+    converting a message only walks `ListFields()` and applies the stored callables.
+    """
+
+    def __init__(self, descriptor, type_callable_map, use_enum_labels,
+                 including_default_value_fields, lowercase_enum_lables):
+        self.descriptor = descriptor
+        # Holding the map keeps its id, which is part of the cache key, from being reused.
+        self.type_callable_map = type_callable_map
+        self.use_enum_labels = use_enum_labels
+        self.including_default_value_fields = including_default_value_fields
+        self.lowercase_enum_lables = lowercase_enum_lables
+        self.fields = {}
+        self.defaults = ()
+
+    def compile(self):
+        for field in self.descriptor.fields:
+            try:
+                self._add_field(field)
+            except TypeError:
+                # A type the map cannot convert is left to `convert`, which raises like the
+                # legacy path, but only for messages that actually have the field set.
+                pass
+        if self.including_default_value_fields:
+            self.defaults = tuple(self._default_entry(field) for field in self.descriptor.fields
+                                  if not (field.label != FieldDescriptor.LABEL_REPEATED and
+                                          field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE)
+                                  and not field.containing_oneof)
+
+    def _adaptor(self, field):
+        if field.message_type and field.message_type.name == Timestamp_type_name:
+            return timestamp_to_datetime
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            return _get_to_dict_plan(field.message_type, self.type_callable_map, self.use_enum_labels,
+                                     self.including_default_value_fields,
+                                     self.lowercase_enum_lables).convert
+
+        if self.use_enum_labels and field.type == FieldDescriptor.TYPE_ENUM:
+            lowercase_enum_lables = self.lowercase_enum_lables
+            return lambda value: enum_label_name(field, value, lowercase_enum_lables)
+
+        if field.type in self.type_callable_map:
+            return self.type_callable_map[field.type]
+
+        raise TypeError("Field %s.%s has unrecognised type id %d" % (
+            self.descriptor.name, field.name, field.type))
+
+    def _add_field(self, field):
+        if _is_map_entry(field):
+            value_adaptor = self._adaptor(field.message_type.fields_by_name['value'])
+            adaptor = lambda value: {k: value_adaptor(v) for k, v in value.items()}
+        else:
+            adaptor = self._adaptor(field)
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                adaptor = repeated(adaptor)
+        entry = (field.name, adaptor, field.is_extension)
+        self.fields[field] = entry
+        return entry
+
+    def _default_entry(self, field):
+        if _is_map_entry(field):
+            return field.name, dict, True
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            return field.name, list, True
+        if field.type == FieldDescriptor.TYPE_ENUM and self.use_enum_labels:
+            return field.name, enum_label_name(field, field.default_value, self.lowercase_enum_lables), False
+        return field.name, field.default_value, False
+
+    def convert(self, pb):
+        result_dict = {}
+        extensions = None
+        fields = self.fields
+        for field, value in pb.ListFields():
+            entry = fields.get(field)
+            if entry is None:
+                # Extensions are not known up front; compile them on first sight.
+                entry = self._add_field(field)
+            name, adaptor, is_extension = entry
+            if is_extension:
+                if extensions is None:
+                    extensions = {}
+                extensions[str(field.number)] = adaptor(value)
+                continue
+            result_dict[name] = adaptor(value)
+
+        for name, default, is_factory in self.defaults:
+            if name not in result_dict:
+                result_dict[name] = default() if is_factory else default
+
+        if extensions:
+            result_dict[EXTENSION_CONTAINER] = extensions
+        return result_dict
+
+
 REVERSE_TYPE_CALLABLE_MAP = {
 }
 
 
 def dict_to_protobuf(pb_klass_or_instance, values, type_callable_map=REVERSE_TYPE_CALLABLE_MAP,
-                     strict=True, ignore_none=False):
+                     strict=True, ignore_none=False, compiled=False):
     """Populates a protobuf model from a dictionary.
 
     :param pb_klass_or_instance: a protobuf message class, or an protobuf instance
@@ -156,14 +308,190 @@ def dict_to_protobuf(pb_klass_or_instance, values, type_callable_map=REVERSE_TYP
     :param bool strict: complain if keys in the map are not fields on the message.
     :param bool strict: ignore None-values of fields, treat them as empty field
     :param bool strict: when false: accept enums both in lowercase and uppercase
+    :param bool compiled: reuse a setter table built once per message type and set of
+       options instead of mapping every key of every dict. Plans are cached for the life
+       of the process by `type_callable_map` identity (the plan holds the map, so its id
+       is never reused), so mutate a map only before it is first used in compiled mode.
     """
     if isinstance(pb_klass_or_instance, Message):
         instance = pb_klass_or_instance
     else:
         instance = pb_klass_or_instance()
+    if compiled:
+        _get_setter_plan(instance.DESCRIPTOR, type_callable_map, strict, ignore_none).apply(instance, values)
+        return instance
     return _dict_to_protobuf(instance, values, type_callable_map, strict, ignore_none)
 
 
+def dicts_to_protobufs(pb_klass, values_iterable, type_callable_map=REVERSE_TYPE_CALLABLE_MAP,
+                       strict=True, ignore_none=False, compiled=False):
+    """Lazily builds one protobuf message per dictionary of an iterable.
+
+    With `compiled=True` the setter plan for `pb_klass` is looked up once for the whole
+    stream, so no descriptor work is repeated per message. Options are as for
+    `dict_to_protobuf`.
+
+    :param pb_klass: a protobuf message class
+    :param values_iterable: an iterable of dictionaries of values
+    :return: a generator of `pb_klass` instances
+    """
+    if not compiled:
+        for values in values_iterable:
+            yield _dict_to_protobuf(pb_klass(), values, type_callable_map, strict, ignore_none)
+        return
+    plan = _get_setter_plan(pb_klass.DESCRIPTOR, type_callable_map, strict, ignore_none)
+    for values in values_iterable:
+        instance = pb_klass()
+        plan.apply(instance, values)
+        yield instance
+
+
+def _dict_to_protobuf(pb, value, type_callable_map, strict, ignore_none):
+    fields = _get_field_mapping(pb, value, strict)
+    return _set_fields(pb, fields, type_callable_map, strict, ignore_none)
+
+
+_SETTER_PLANS = {}
+
+
+def _get_setter_plan(descriptor, type_callable_map, strict, ignore_none):
+    key = (descriptor, id(type_callable_map), strict, ignore_none)
+    return _cached_plan(_SETTER_PLANS, key, _SetterPlan, descriptor, type_callable_map,
+                        strict, ignore_none)
+
+
+class _SetterPlan(object):
+    """Setter table for one message type and set of `dict_to_protobuf` options.
+
+    Maps every field name to a callable `setter(pb, value)` with the label, type,
+    map-entry and conversion checks already resolved, so populating a message only
+    costs a dictionary lookup and one call per key.
+    """
+
+    def __init__(self, descriptor, type_callable_map, strict, ignore_none):
+        self.descriptor = descriptor
+        # Holding the map keeps its id, which is part of the cache key, from being reused.
+        self.type_callable_map = type_callable_map
+        self.strict = strict
+        self.ignore_none = ignore_none
+        self.setters = {}
+
+    def compile(self):
+        for field in self.descriptor.fields:
+            self.setters[field.name] = self._setter(field)
+
+    def _sub_plan(self, message_type):
+        return _get_setter_plan(message_type, self.type_callable_map, self.strict, self.ignore_none)
+
+    def _setter(self, field):
+        name = field.name
+        type_callable_map = self.type_callable_map
+        strict = self.strict
+        ignore_none = self.ignore_none
+
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            if _is_map_entry(field):
+                key_field = field.message_type.fields_by_name['key']
+                value_field = field.message_type.fields_by_name['value']
+                if value_field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+                    value_plan = self._sub_plan(value_field.message_type)
+
+                    def set_message_map(pb, input_value):
+                        container = getattr(pb, name)
+                        for key, value in input_value.items():
+                            value_plan.apply(container[key], value)
+                    return set_message_map
+
+                key_callable = type_callable_map.get(key_field.type)
+                value_callable = type_callable_map.get(value_field.type)
+
+                def set_scalar_map(pb, input_value):
+                    container = getattr(pb, name)
+                    for key, value in input_value.items():
+                        if ignore_none and value is None:
+                            continue
+                        try:
+                            if key_callable is not None:
+                                key = key_callable(key)
+                            if value_callable is not None:
+                                value = value_callable(value)
+                            container[key] = value
+                        except Exception as exc:
+                            raise RuntimeError(f"type: {type(pb)}, field: {name}, value: {value}") from exc
+                return set_scalar_map
+
+            if field.type == FieldDescriptor.TYPE_MESSAGE:
+                item_plan = self._sub_plan(field.message_type)
+
+                def set_repeated_message(pb, input_value):
+                    container = getattr(pb, name)
+                    for item in input_value:
+                        item_plan.apply(container.add(), item)
+                return set_repeated_message
+
+            if field.type == FieldDescriptor.TYPE_ENUM:
+                def set_repeated_enum(pb, input_value):
+                    container = getattr(pb, name)
+                    for item in input_value:
+                        if isinstance(item, six.string_types):
+                            item = _string_to_enum(field, item, strict)
+                        container.append(item)
+                return set_repeated_enum
+
+            def set_repeated_scalar(pb, input_value):
+                getattr(pb, name).extend(input_value)
+            return set_repeated_scalar
+
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            sub_plan = self._sub_plan(field.message_type)
+
+            def set_message(pb, input_value):
+                if isinstance(input_value, datetime.datetime):
+                    # Composite fields cannot be assigned, they have to be copied into.
+                    getattr(pb, name).CopyFrom(datetime_to_timestamp(input_value))
+                    return
+                sub_plan.apply(getattr(pb, name), input_value)
+            return set_message
+
+        type_callable = type_callable_map.get(field.type)
+        is_enum = field.type == FieldDescriptor.TYPE_ENUM
+
+        def set_scalar(pb, input_value):
+            if isinstance(input_value, datetime.datetime):
+                getattr(pb, name).CopyFrom(datetime_to_timestamp(input_value))
+                return
+            if type_callable is not None:
+                input_value = type_callable(input_value)
+            if is_enum and isinstance(input_value, six.string_types):
+                input_value = _string_to_enum(field, input_value, strict)
+            try:
+                setattr(pb, name, input_value)
+            except Exception as exc:
+                raise RuntimeError(f"type: {type(pb)}, field: {name}, value: {input_value}") from exc
+        return set_scalar
+
+    def apply(self, pb, values):
+        setters = self.setters
+        ignore_none = self.ignore_none
+        if self.strict:
+            # Check every key before setting any, so a bad dict leaves `pb` untouched.
+            for key in values:
+                if key not in setters and key != EXTENSION_CONTAINER:
+                    raise KeyError("%s does not have a field called %s" % (type(pb), key))
+        for key, input_value in values.items():
+            setter = setters.get(key)
+            if setter is None:
+                continue
+            if ignore_none and input_value is None:
+                continue
+            setter(pb, input_value)
+
+        if EXTENSION_CONTAINER in values:
+            # Extensions depend on what has been imported, so they are not planned.
+            fields = _get_field_mapping(pb, {EXTENSION_CONTAINER: values[EXTENSION_CONTAINER]}, self.strict)
+            _set_fields(pb, fields, self.type_callable_map, self.strict, self.ignore_none)
+
+
 def _get_field_mapping(pb, dict_value, strict):
     field_mapping = []
     for key, value in dict_value.items():
@@ -192,8 +520,8 @@ def _get_field_mapping(pb, dict_value, strict):
     return field_mapping
 
 
-def _dict_to_protobuf(pb, value, type_callable_map, strict, ignore_none):
-    fields = _get_field_mapping(pb, value, strict)
+def _set_fields(pb, fields, type_callable_map, strict, ignore_none):
+    """Sets the `(field, value, current value)` triples returned by `_get_field_mapping`."""
 
     for field, input_value, pb_value in fields:
         if ignore_none and input_value is None:
@@ -0,0 +1,70 @@
+# Cached conversion of request dates to protobuf Timestamps
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import calendar
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from google.protobuf.timestamp_pb2 import Timestamp
+
+__all__ = ["date_to_timestamp", "TradingDayClock", "trading_day_clock"]
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+@lru_cache(maxsize=4096)
+def _date_seconds(date_string: str) -> int:
+    """
+    Seconds from the epoch to midnight of a "%Y-%m-%d" date, with the naive date read
+    as UTC like `Timestamp.FromDatetime` does.
+    """
+    return calendar.timegm(datetime.strptime(date_string, DATE_FORMAT).timetuple())
+
+
+def date_to_timestamp(date_string: str, now: Optional[datetime] = None) -> Timestamp:
+    """
+    Converts a "%Y-%m-%d" date to a Timestamp at the current local time of day.
+
+    Equivalent to `datetime_to_timestamp(datetime.combine(strptime(date_string), now.time()))`,
+    but dates are parsed once and memoized, so repeated expiries and trading days skip
+    `strptime` and the datetime arithmetic.
+
+    Args:
+        date_string (str): Date formatted as "%Y-%m-%d".
+        now (Optional[datetime]): Time of day to use. Defaults to the current local time.
+    """
+    if now is None:
+        now = datetime.now()
+    seconds = _date_seconds(date_string) + now.hour * 3600 + now.minute * 60 + now.second
+    return Timestamp(seconds=seconds, nanos=now.microsecond * 1000)
+
+
+class TradingDayClock:
+    """
+    Today's date as a "%Y-%m-%d" string, cached until the next local midnight.
+
+    Unlike a default computed once at import, the clock rolls over with the date, so
+    workers running for days keep sending the correct trading day.
+    """
+    def __init__(self, time_source=time.time):
+        self._time_source = time_source
+        # (day, rollover) is swapped as one tuple so readers on other threads never
+        # see a day paired with the wrong rollover time.
+        self._state = (None, 0.0)
+
+    def today(self) -> str:
+        day, rollover = self._state
+        now = self._time_source()
+        if now >= rollover:
+            current = date.fromtimestamp(now)
+            rollover = time.mktime((current + timedelta(days=1)).timetuple())
+            day = current.strftime(DATE_FORMAT)
+            self._state = (day, rollover)
+        return day
+
+
+trading_day_clock = TradingDayClock()
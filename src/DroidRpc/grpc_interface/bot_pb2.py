@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\tbot.proto\x12\x04\x65\x63ho\x1a\x1fgoogle/protobuf/timestamp.proto\"\xff\x01\n\x06\x43reate\x12\x0e\n\x06ticker\x18\x01 \x01(\t\x12-\n\tspot_date\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x19\n\x11investment_amount\x18\x03 \x01(\x02\x12\r\n\x05price\x18\x04 \x01(\x02\x12\x0e\n\x06\x62ot_id\x18\x05 \x01(\t\x12\x0e\n\x06margin\x18\x06 \x01(\x05\x12\x10\n\x08\x66raction\x18\x07 \x01(\x08\x12\x1a\n\rtp_multiplier\x18\x08 \x01(\x02H\x00\x88\x01\x01\x12\x1a\n\rsl_multiplier\x18\t \x01(\x02H\x01\x88\x01\x01\x42\x10\n\x0e_tp_multiplierB\x10\n\x0e_sl_multiplier\"\xed\x05\n\x05Hedge\x12\x0e\n\x06\x62ot_id\x18\x01 \x01(\t\x12\x0b\n\x03ric\x18\x02 \x01(\t\x12\x15\n\rcurrent_price\x18\x03 \x01(\x02\x12\x13\n\x0b\x65ntry_price\x18\x04 \x01(\x02\x12\x16\n\x0elast_share_num\x18\x05 \x01(\x02\x12\x18\n\x10last_hedge_delta\x18\x06 \x01(\x02\x12\x19\n\x11investment_amount\x18\x07 \x01(\x02\x12\x18\n\x10\x62ot_cash_balance\x18\x08 \x01(\x02\x12\x17\n\x0fstop_loss_price\x18\t \x01(\x02\x12\x19\n\x11take_profit_price\x18\n \x01(\x02\x12*\n\x06\x65xpiry\x18\x0b \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x13\n\x06strike\x18\x0c \x01(\x02H\x00\x88\x01\x01\x12\x15\n\x08strike_2\x18\r \x01(\x02H\x01\x88\x01\x01\x12\x13\n\x06margin\x18\x0e \x01(\x02H\x02\x88\x01\x01\x12\x15\n\x08\x66raction\x18\x0f \x01(\x02H\x03\x88\x01\x01\x12\x19\n\x0coption_price\x18\x10 \x01(\x02H\x04\x88\x01\x01\x12\x14\n\x07\x62\x61rrier\x18\x11 \x01(\x02H\x05\x88\x01\x01\x12\x1e\n\x11\x63urrent_low_price\x18\x12 \x01(\x02H\x06\x88\x01\x01\x12\x1f\n\x12\x63urrent_high_price\x18\x13 \x01(\x02H\x07\x88\x01\x01\x12\x16\n\task_price\x18\x14 \x01(\x02H\x08\x88\x01\x01\x12\x16\n\tbid_price\x18\x15 \x01(\x02H\t\x88\x01\x01\x12\x34\n\x0btrading_day\x18\x16 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\n\x88\x01\x01\x42\t\n\x07_strikeB\x0b\n\t_strike_2B\t\n\x07_marginB\x0b\n\t_fractionB\x0f\n\r_option_priceB\n\n\x08_barrierB\x14\n\x12_current_low_priceB\x15\n\x13_current_high_priceB\x0c\n\n_ask_priceB\x0c\n\n_bid_priceB\x0e\n\x0c_trading_day\"\xec\x05\n\x04Stop\x12\x0e\n\x06\x62ot_id\x18\x01 \x01(\t\x12\x0b\n\x03ric\x18\x02 \x01(\t\x12\x15\n\rcurrent_price\x18\x03 \x01(\x02\x12\x13\n\x0b\x65ntry_price\x18\x04 \x01(\x02\x12\x16\n\x0elast_share_num\x18\x05 \x01(\x02\x12\x18\n\x10last_hedge_delta\x18\x06 \x01(\x02\x12\x19\n\x11investment_amount\x18\x07 \x01(\x02\x12\x18\n\x10\x62ot_cash_balance\x18\x08 \x01(\x02\x12\x17\n\x0fstop_loss_price\x18\t \x01(\x02\x12\x19\n\x11take_profit_price\x18\n \x01(\x02\x12*\n\x06\x65xpiry\x18\x0b \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x13\n\x06strike\x18\x0c \x01(\x02H\x00\x88\x01\x01\x12\x15\n\x08strike_2\x18\r \x01(\x02H\x01\x88\x01\x01\x12\x13\n\x06margin\x18\x0e \x01(\x02H\x02\x88\x01\x01\x12\x15\n\x08\x66raction\x18\x0f \x01(\x02H\x03\x88\x01\x01\x12\x19\n\x0coption_price\x18\x10 \x01(\x02H\x04\x88\x01\x01\x12\x14\n\x07\x62\x61rrier\x18\x11 \x01(\x02H\x05\x88\x01\x01\x12\x1e\n\x11\x63urrent_low_price\x18\x12 \x01(\x02H\x06\x88\x01\x01\x12\x1f\n\x12\x63urrent_high_price\x18\x13 \x01(\x02H\x07\x88\x01\x01\x12\x16\n\task_price\x18\x14 \x01(\x02H\x08\x88\x01\x01\x12\x16\n\tbid_price\x18\x15 \x01(\x02H\t\x88\x01\x01\x12\x34\n\x0btrading_day\x18\x16 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\n\x88\x01\x01\x42\t\n\x07_strikeB\x0b\n\t_strike_2B\t\n\x07_marginB\x0b\n\t_fractionB\x0f\n\r_option_priceB\n\n\x08_barrierB\x14\n\x12_current_low_priceB\x15\n\x13_current_high_priceB\x0c\n\n_ask_priceB\x0c\n\n_bid_priceB\x0e\n\x0c_trading_day\"\x1c\n\tEchoReply\x12\x0f\n\x07message\x18\x01 \x01(\t2\x8a\x01\n\x04\x45\x63ho\x12,\n\tCreateBot\x12\x0c.echo.Create\x1a\x0f.echo.EchoReply\"\x00\x12*\n\x08HedgeBot\x12\x0b.echo.Hedge\x1a\x0f.echo.EchoReply\"\x00\x12(\n\x07StopBot\x12\n.echo.Stop\x1a\x0f.echo.EchoReply\"\x00\x62\x06proto3'
+  serialized_pb=b'\n\tbot.proto\x12\x04\x65\x63ho\x1a\x1fgoogle/protobuf/timestamp.proto\"\xff\x01\n\x06\x43reate\x12\x0e\n\x06ticker\x18\x01 \x01(\t\x12-\n\tspot_date\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x19\n\x11investment_amount\x18\x03 \x01(\x02\x12\r\n\x05price\x18\x04 \x01(\x02\x12\x0e\n\x06\x62ot_id\x18\x05 \x01(\t\x12\x0e\n\x06margin\x18\x06 \x01(\x05\x12\x10\n\x08\x66raction\x18\x07 \x01(\x08\x12\x1a\n\rtp_multiplier\x18\x08 \x01(\x02H\x00\x88\x01\x01\x12\x1a\n\rsl_multiplier\x18\t \x01(\x02H\x01\x88\x01\x01\x42\x10\n\x0e_tp_multiplierB\x10\n\x0e_sl_multiplier\"\xed\x05\n\x05Hedge\x12\x0e\n\x06\x62ot_id\x18\x01 \x01(\t\x12\x0b\n\x03ric\x18\x02 \x01(\t\x12\x15\n\rcurrent_price\x18\x03 \x01(\x02\x12\x13\n\x0b\x65ntry_price\x18\x04 \x01(\x02\x12\x16\n\x0elast_share_num\x18\x05 \x01(\x02\x12\x18\n\x10last_hedge_delta\x18\x06 \x01(\x02\x12\x19\n\x11investment_amount\x18\x07 \x01(\x02\x12\x18\n\x10\x62ot_cash_balance\x18\x08 \x01(\x02\x12\x17\n\x0fstop_loss_price\x18\t \x01(\x02\x12\x19\n\x11take_profit_price\x18\n \x01(\x02\x12*\n\x06\x65xpiry\x18\x0b \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x13\n\x06strike\x18\x0c \x01(\x02H\x00\x88\x01\x01\x12\x15\n\x08strike_2\x18\r \x01(\x02H\x01\x88\x01\x01\x12\x13\n\x06margin\x18\x0e \x01(\x02H\x02\x88\x01\x01\x12\x15\n\x08\x66raction\x18\x0f \x01(\x02H\x03\x88\x01\x01\x12\x19\n\x0coption_price\x18\x10 \x01(\x02H\x04\x88\x01\x01\x12\x14\n\x07\x62\x61rrier\x18\x11 \x01(\x02H\x05\x88\x01\x01\x12\x1e\n\x11\x63urrent_low_price\x18\x12 \x01(\x02H\x06\x88\x01\x01\x12\x1f\n\x12\x63urrent_high_price\x18\x13 \x01(\x02H\x07\x88\x01\x01\x12\x16\n\task_price\x18\x14 \x01(\x02H\x08\x88\x01\x01\x12\x16\n\tbid_price\x18\x15 \x01(\x02H\t\x88\x01\x01\x12\x34\n\x0btrading_day\x18\x16 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\n\x88\x01\x01\x42\t\n\x07_strikeB\x0b\n\t_strike_2B\t\n\x07_marginB\x0b\n\t_fractionB\x0f\n\r_option_priceB\n\n\x08_barrierB\x14\n\x12_current_low_priceB\x15\n\x13_current_high_priceB\x0c\n\n_ask_priceB\x0c\n\n_bid_priceB\x0e\n\x0c_trading_day\"\xec\x05\n\x04Stop\x12\x0e\n\x06\x62ot_id\x18\x01 \x01(\t\x12\x0b\n\x03ric\x18\x02 \x01(\t\x12\x15\n\rcurrent_price\x18\x03 \x01(\x02\x12\x13\n\x0b\x65ntry_price\x18\x04 \x01(\x02\x12\x16\n\x0elast_share_num\x18\x05 \x01(\x02\x12\x18\n\x10last_hedge_delta\x18\x06 \x01(\x02\x12\x19\n\x11investment_amount\x18\x07 \x01(\x02\x12\x18\n\x10\x62ot_cash_balance\x18\x08 \x01(\x02\x12\x17\n\x0fstop_loss_price\x18\t \x01(\x02\x12\x19\n\x11take_profit_price\x18\n \x01(\x02\x12*\n\x06\x65xpiry\x18\x0b \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x13\n\x06strike\x18\x0c \x01(\x02H\x00\x88\x01\x01\x12\x15\n\x08strike_2\x18\r \x01(\x02H\x01\x88\x01\x01\x12\x13\n\x06margin\x18\x0e \x01(\x02H\x02\x88\x01\x01\x12\x15\n\x08\x66raction\x18\x0f \x01(\x02H\x03\x88\x01\x01\x12\x19\n\x0coption_price\x18\x10 \x01(\x02H\x04\x88\x01\x01\x12\x14\n\x07\x62\x61rrier\x18\x11 \x01(\x02H\x05\x88\x01\x01\x12\x1e\n\x11\x63urrent_low_price\x18\x12 \x01(\x02H\x06\x88\x01\x01\x12\x1f\n\x12\x63urrent_high_price\x18\x13 \x01(\x02H\x07\x88\x01\x01\x12\x16\n\task_price\x18\x14 \x01(\x02H\x08\x88\x01\x01\x12\x16\n\tbid_price\x18\x15 \x01(\x02H\t\x88\x01\x01\x12\x34\n\x0btrading_day\x18\x16 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\n\x88\x01\x01\x42\t\n\x07_strikeB\x0b\n\t_strike_2B\t\n\x07_marginB\x0b\n\t_fractionB\x0f\n\r_option_priceB\n\n\x08_barrierB\x14\n\x12_current_low_priceB\x15\n\x13_current_high_priceB\x0c\n\n_ask_priceB\x0c\n\n_bid_priceB\x0e\n\x0c_trading_day\"\x1c\n\tEchoReply\x12\x0f\n\x07message\x18\x01 \x01(\t2\xbd\x01\n\x04\x45\x63ho\x12,\n\tCreateBot\x12\x0c.echo.Create\x1a\x0f.echo.EchoReply\"\x00\x12*\n\x08HedgeBot\x12\x0b.echo.Hedge\x1a\x0f.echo.EchoReply\"\x00\x12(\n\x07StopBot\x12\n.echo.Stop\x1a\x0f.echo.EchoReply\"\x00\x12\x31\n\x0bHedgeStream\x12\x0b.echo.Hedge\x1a\x0f.echo.EchoReply\"\x00(\x01\x30\x01\x62\x06proto3'
   ,
   dependencies=[google_dot_protobuf_dot_timestamp__pb2.DESCRIPTOR,])
 
@@ -745,7 +745,7 @@ _ECHO = _descriptor.ServiceDescriptor(
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
   serialized_start=1844,
-  serialized_end=1982,
+  serialized_end=2033,
   methods=[
   _descriptor.MethodDescriptor(
     name='CreateBot',
@@ -777,6 +777,16 @@ _ECHO = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='HedgeStream',
+    full_name='echo.Echo.HedgeStream',
+    index=3,
+    containing_service=None,
+    input_type=_HEDGE,
+    output_type=_ECHOREPLY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_ECHO)
 
@@ -30,6 +30,11 @@ class EchoStub(object):
                 request_serializer=bot__pb2.Stop.SerializeToString,
                 response_deserializer=bot__pb2.EchoReply.FromString,
                 )
+        self.HedgeStream = channel.stream_stream(
+                '/echo.Echo/HedgeStream',
+                request_serializer=bot__pb2.Hedge.SerializeToString,
+                response_deserializer=bot__pb2.EchoReply.FromString,
+                )
 
 
 class EchoServicer(object):
@@ -55,6 +60,13 @@ class EchoServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def HedgeStream(self, request_iterator, context):
+        """Hedge many positions over one long-lived stream, one reply per request.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_EchoServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -73,6 +85,11 @@ def add_EchoServicer_to_server(servicer, server):
                     request_deserializer=bot__pb2.Stop.FromString,
                     response_serializer=bot__pb2.EchoReply.SerializeToString,
             ),
+            'HedgeStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.HedgeStream,
+                    request_deserializer=bot__pb2.Hedge.FromString,
+                    response_serializer=bot__pb2.EchoReply.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'echo.Echo', rpc_method_handlers)
@@ -134,3 +151,20 @@ class Echo(object):
             bot__pb2.EchoReply.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def HedgeStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/echo.Echo/HedgeStream',
+            bot__pb2.Hedge.SerializeToString,
+            bot__pb2.EchoReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,205 @@
+# Per-bot handle reusing a prebuilt request across hedges
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from .grpc_interface import bot_pb2
+from .dates import date_to_timestamp, trading_day_clock
+
+__all__ = ["BotHandle"]
+
+
+def _reply_field(reply, name: str, default: Any = None):
+    """
+    Reads a field from a reply dict or result object.
+    """
+    if isinstance(reply, Mapping):
+        value = reply.get(name, default)
+    else:
+        value = getattr(reply, name, default)
+    return default if value is None else value
+
+
+class BotHandle:
+    """
+    A live bot, created once from its `create_bot` reply.
+
+    The fields that never change over the bot's life (bot_id, ric, entry price, expiry,
+    strikes, barrier, stop loss and take profit levels, margin) are written once into a
+    prototype request. Each `hedge` copies the prototype and only sets the per-tick
+    fields, and the handle carries share_num, delta, option_price and cash balance over
+    from one reply into the next request.
+
+        handle = BotHandle(client, client.create_bot(...), investment_amount=100000)
+        for price in prices:
+            handle.hedge(price)
+
+    Attributes:
+        share_num (float): Shares held, sent as `last_share_num`.
+        delta (float): Last hedge delta, sent as `last_hedge_delta`.
+        bot_cash_balance (float): Cash left, reduced by `share_change * current_price` after each hedge.
+        option_price (float): Last option price returned by the bot service. Only sent
+            once a reply has returned a non-zero one, like `Client.hedge` leaves the
+            optional fields it is not given unset.
+    """
+    def __init__(
+        self,
+        client,
+        create_reply,
+        investment_amount: float,
+        bot_cash_balance: Optional[float] = None,
+        margin: Optional[int] = None,
+        fractionals: Optional[bool] = None
+    ):
+        """
+        Args:
+            client (Client): Client used to send the requests, through `Client.send`. Must
+                not be in raw mode. `AsyncClient` is not supported.
+            create_reply (dict | CreateResult): Reply of `Client.create_bot` for this bot.
+            investment_amount (float): Total cash value the bot is allowed to manage.
+            bot_cash_balance (Optional[float]): Remaining cash. Defaults to the investment
+                amount minus the cost of the shares bought at creation.
+            margin (Optional[int]): Margin the bot can use. Defaults to the margin in the reply, or 1.
+            fractionals (Optional[bool]): Whether the bot may use fractional shares.
+                Defaults to the reply's `fraction`, or False.
+        """
+        if client.raw:
+            raise ValueError("BotHandle needs decoded replies, the client is in raw mode")
+        self.client = client
+        entry_price = _reply_field(create_reply, "entry_price")
+        self.share_num = _reply_field(create_reply, "share_num", 0)
+        self.delta = _reply_field(create_reply, "delta", 0)
+        self.option_price = _reply_field(create_reply, "option_price", 0)
+        self._option_priced = bool(self.option_price)
+        if bot_cash_balance is None:
+            bot_cash_balance = investment_amount - self.share_num * entry_price
+        self.bot_cash_balance = bot_cash_balance
+        if margin is None:
+            margin = _reply_field(create_reply, "margin", 1)
+        if fractionals is None:
+            fractionals = _reply_field(create_reply, "fraction", False)
+
+        self._hedge_prototype = bot_pb2.Hedge(
+            bot_id=_reply_field(create_reply, "bot_id"),
+            ric=_reply_field(create_reply, "ticker"),
+            entry_price=entry_price,
+            investment_amount=investment_amount,
+            stop_loss_price=_reply_field(create_reply, "max_loss_price", 0),
+            take_profit_price=_reply_field(create_reply, "target_profit_price", 0),
+            expiry=date_to_timestamp(_reply_field(create_reply, "expiry")),
+            margin=margin,
+            fraction=fractionals,
+        )
+        # Optional levels are only set for bots that have them, as `Client.hedge` does.
+        for name in ("strike", "strike_2", "barrier"):
+            value = _reply_field(create_reply, name, 0)
+            if value:
+                setattr(self._hedge_prototype, name, value)
+        # Hedge and Stop share field numbers, so the wire form converts directly.
+        self._stop_prototype = bot_pb2.Stop.FromString(self._hedge_prototype.SerializeToString())
+
+    @property
+    def bot_id(self) -> str:
+        return self._hedge_prototype.bot_id
+
+    @property
+    def ticker(self) -> str:
+        return self._hedge_prototype.ric
+
+    def _request(
+        self,
+        prototype,
+        current_price: float,
+        current_low_price: Optional[float],
+        current_high_price: Optional[float],
+        ask_price: Optional[float],
+        bid_price: Optional[float],
+        trading_day: Optional[str]
+    ):
+        request = type(prototype)()
+        request.CopyFrom(prototype)
+        request.current_price = current_price
+        request.last_share_num = self.share_num
+        request.last_hedge_delta = self.delta
+        request.bot_cash_balance = self.bot_cash_balance
+        if self._option_priced:
+            request.option_price = self.option_price
+        if current_low_price is not None:
+            request.current_low_price = current_low_price
+        if current_high_price is not None:
+            request.current_high_price = current_high_price
+        if ask_price is not None:
+            request.ask_price = ask_price
+        if bid_price is not None:
+            request.bid_price = bid_price
+        request.trading_day.CopyFrom(date_to_timestamp(trading_day or trading_day_clock.today()))
+        return request
+
+    def _update(self, reply, current_price: float):
+        self.share_num = _reply_field(reply, "share_num", self.share_num)
+        self.delta = _reply_field(reply, "delta", self.delta)
+        self.option_price = _reply_field(reply, "option_price", self.option_price)
+        self._option_priced = self._option_priced or bool(self.option_price)
+        self.bot_cash_balance -= _reply_field(reply, "share_change", 0) * current_price
+
+    def hedge_request(
+        self,
+        current_price: float,
+        current_low_price: Optional[float] = None,
+        current_high_price: Optional[float] = None,
+        ask_price: Optional[float] = None,
+        bid_price: Optional[float] = None,
+        trading_day: Optional[str] = None
+    ) -> bot_pb2.Hedge:
+        """
+        Builds the next `bot_pb2.Hedge` request from the prototype and the current state.
+        """
+        return self._request(self._hedge_prototype, current_price, current_low_price,
+                             current_high_price, ask_price, bid_price, trading_day)
+
+    def hedge(
+        self,
+        current_price: float,
+        current_low_price: Optional[float] = None,
+        current_high_price: Optional[float] = None,
+        ask_price: Optional[float] = None,
+        bid_price: Optional[float] = None,
+        trading_day: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Hedges the bot at the current price and carries the reply over into the handle.
+
+        Returns:
+            The reply, as returned by `Client.hedge`.
+        """
+        request = self.hedge_request(current_price, current_low_price, current_high_price,
+                                     ask_price, bid_price, trading_day)
+        reply = self.client.send(request, timeout)
+        self._update(reply, current_price)
+        return reply
+
+    def stop(
+        self,
+        current_price: float,
+        current_low_price: Optional[float] = None,
+        current_high_price: Optional[float] = None,
+        ask_price: Optional[float] = None,
+        bid_price: Optional[float] = None,
+        trading_day: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Stops the bot at the current price.
+
+        Returns:
+            The reply, as returned by `Client.stop`.
+        """
+        request = self._request(self._stop_prototype, current_price, current_low_price,
+                                current_high_price, ask_price, bid_price, trading_day)
+        reply = self.client.send(request, timeout)
+        self._update(reply, current_price)
+        return reply
@@ -0,0 +1,56 @@
+# Selection of the JSON decoder used for bot service replies
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import json
+from typing import Any, Callable
+
+__all__ = ["get_decoder", "JSON_BACKENDS"]
+
+JSON_BACKENDS = ("auto", "orjson", "ujson", "json")
+
+
+def _load_backend(name: str) -> Callable[[str], Any]:
+    if name == "orjson":
+        import orjson
+        return orjson.loads
+    if name == "ujson":
+        import ujson
+        return ujson.loads
+    return json.loads
+
+
+def _with_fallback(loads: Callable[[str], Any]) -> Callable[[str], Any]:
+    def decode(payload):
+        try:
+            return loads(payload)
+        except ValueError:
+            # The stdlib decoder is laxer (e.g. it accepts NaN and Infinity).
+            return json.loads(payload)
+    return decode
+
+
+def get_decoder(name: str = "auto") -> Callable[[str], Any]:
+    """
+    Returns a function decoding a JSON payload.
+
+    Args:
+        name (str): One of "orjson", "ujson" or "json" for that library, or "auto" for
+            the fastest one installed. Decoding with "auto" falls back to the stdlib for
+            payloads the faster library rejects. Defaults to "auto".
+
+    Raises:
+        ValueError: If `name` is not a known backend.
+        ImportError: If the requested library is not installed.
+    """
+    if name not in JSON_BACKENDS:
+        raise ValueError("Unknown JSON backend %r, expected one of %s" % (name, ", ".join(JSON_BACKENDS)))
+    if name != "auto":
+        return _load_backend(name)
+    for candidate in ("orjson", "ujson"):
+        try:
+            return _with_fallback(_load_backend(candidate))
+        except ImportError:
+            continue
+    return json.loads
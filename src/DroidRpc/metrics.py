@@ -0,0 +1,164 @@
+# Per-method latency histograms recorded by a client interceptor
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+import grpc
+
+__all__ = ["LatencyHistogram", "ClientMetrics", "MetricsInterceptor"]
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of integer values (microseconds) with bounded relative error.
+
+    Values below 128 get a bucket each. Above that, every power of two is split into
+    64 linear sub-buckets, so each recorded value is kept within 1/64 (~1.6%) of
+    its true value. Recording is a few integer operations, and memory grows with the
+    log of the largest value, not the number of values.
+    """
+    SUB_BUCKET_BITS = 7
+    _HALF = 1 << (SUB_BUCKET_BITS - 1)
+    _FIRST = 1 << SUB_BUCKET_BITS
+
+    def __init__(self):
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def _bucket(cls, value: int) -> int:
+        if value < cls._FIRST:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        return cls._HALF * shift + (value >> shift)
+
+    @classmethod
+    def _bucket_upper_bound(cls, bucket: int) -> int:
+        if bucket < cls._FIRST:
+            return bucket
+        shift, offset = divmod(bucket - cls._FIRST, cls._HALF)
+        shift += 1
+        return ((cls._HALF + offset + 1) << shift) - 1
+
+    def record(self, value: int):
+        value = max(int(value), 0)
+        bucket = self._bucket(value)
+        counts = self.counts
+        if bucket >= len(counts):
+            counts.extend([0] * (bucket + 1 - len(counts)))
+        counts[bucket] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> Optional[int]:
+        """
+        Value at or below which `fraction` of the recorded values lie, within the
+        histogram's precision. None if nothing was recorded.
+        """
+        if not self.count:
+            return None
+        threshold = max(fraction * self.count, 1)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return min(self._bucket_upper_bound(bucket), self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count if self.count else None,
+            "min_us": self.min,
+            "p50_us": self.percentile(0.50),
+            "p90_us": self.percentile(0.90),
+            "p99_us": self.percentile(0.99),
+            "p999_us": self.percentile(0.999),
+            "max_us": self.max,
+        }
+
+
+class _MethodMetrics:
+    __slots__ = ("latency", "status_codes", "request_bytes", "response_bytes")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.status_codes = Counter()
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class ClientMetrics:
+    """
+    Thread-safe metrics of a client's calls, keyed by full method name
+    (e.g. "/echo.Echo/HedgeBot").
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods: Dict[str, _MethodMetrics] = {}
+
+    def record(self, method: str, latency_ns: int, code: grpc.StatusCode,
+               request_bytes: int, response_bytes: int):
+        with self._lock:
+            metrics = self._methods.get(method)
+            if metrics is None:
+                metrics = self._methods[method] = _MethodMetrics()
+            metrics.latency.record(latency_ns // 1000)
+            metrics.status_codes[code.name] += 1
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Returns latency percentiles (microseconds), status code counts and byte totals per method.
+        """
+        with self._lock:
+            return {
+                method: {
+                    "latency": metrics.latency.snapshot(),
+                    "status_codes": dict(metrics.status_codes),
+                    "request_bytes": metrics.request_bytes,
+                    "response_bytes": metrics.response_bytes,
+                }
+                for method, metrics in self._methods.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._methods = {}
+
+
+class MetricsInterceptor(grpc.UnaryUnaryClientInterceptor):
+    """
+    Records the latency, status code and message sizes of every unary call into a
+    `ClientMetrics`. Latency is measured from the call until its outcome is known,
+    so it covers serialization, the wire and the bot service.
+    """
+    def __init__(self, metrics: ClientMetrics):
+        self.metrics = metrics
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        request_bytes = request.ByteSize()
+        start = time.perf_counter_ns()
+        call = continuation(client_call_details, request)
+
+        def done(call):
+            latency = time.perf_counter_ns() - start
+            code = call.code()
+            response_bytes = call.result().ByteSize() if code == grpc.StatusCode.OK else 0
+            self.metrics.record(client_call_details.method, latency, code, request_bytes, response_bytes)
+
+        call.add_done_callback(done)
+        return call
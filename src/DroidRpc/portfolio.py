@@ -0,0 +1,326 @@
+# Columnar store of live bots chaining each hedge reply into the next request
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from collections.abc import Mapping
+from typing import Any, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import BatchItem, fan_out
+from .columnar import np, _require_numpy, _Categories
+from .dates import date_to_timestamp, trading_day_clock
+from .grpc_interface import bot_pb2
+from .handle import _reply_field
+from .results import HedgeResult, StopResult
+
+__all__ = ["Portfolio"]
+
+ACTIVE = "active"
+
+
+class Portfolio:
+    """
+    Every live bot as one row of NumPy columns.
+
+    Rows are added from `create_bot` replies. Each round of hedges is built straight
+    from the columns, and each reply is written back into its row in place (shares,
+    delta, option price, cash), so the next round picks up where the last one left off
+    without any per-bot dict of hedge arguments.
+
+        portfolio = Portfolio()
+        for reply in creates:
+            portfolio.add(reply, investment_amount=100000)
+        failed = portfolio.rebalance(client, {"IBM": 160.2, "AAPL": 171.3})
+
+    Rows are keyed by `(bot_id, ticker)` unless another key is given, since `bot_id`
+    names the bot type and is shared by every bot of that type. Bots whose last reply
+    had a status other than "active" are left out of later rounds.
+
+    Attributes:
+        keys (list): Key of each row.
+        bot_ids (list): Bot id of each row.
+    """
+    FLOAT_FIELDS = (
+        "entry_price", "investment_amount", "bot_cash_balance", "stop_loss_price",
+        "take_profit_price", "strike", "strike_2", "barrier", "option_price",
+        "share_num", "delta", "last_price",
+    )
+
+    def __init__(self, capacity: int = 1024):
+        _require_numpy()
+        self._size = 0
+        self._capacity = max(int(capacity), 1)
+        self._float = {name: np.zeros(self._capacity, dtype=np.float64) for name in self.FLOAT_FIELDS}
+        self._margin = np.zeros(self._capacity, dtype=np.int32)
+        self._fractionals = np.zeros(self._capacity, dtype=np.bool_)
+        self._ticker = np.zeros(self._capacity, dtype=np.int32)
+        self._expiry = np.zeros(self._capacity, dtype=np.int32)
+        self._status = np.zeros(self._capacity, dtype=np.int16)
+        self._tickers = _Categories()
+        self._expiries = _Categories()
+        self._statuses = _Categories()
+        self._statuses.code(ACTIVE)
+        self.keys: List[Hashable] = []
+        self.bot_ids: List[str] = []
+        self._rows = {}
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key: Hashable):
+        return key in self._rows
+
+    def row(self, key: Hashable) -> int:
+        return self._rows[key]
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, column in self._float.items():
+            self._float[name] = np.resize(column, self._capacity)
+        self._margin = np.resize(self._margin, self._capacity)
+        self._fractionals = np.resize(self._fractionals, self._capacity)
+        self._ticker = np.resize(self._ticker, self._capacity)
+        self._expiry = np.resize(self._expiry, self._capacity)
+        self._status = np.resize(self._status, self._capacity)
+
+    def add(
+        self,
+        create_reply,
+        investment_amount: float,
+        bot_cash_balance: Optional[float] = None,
+        margin: Optional[int] = None,
+        fractionals: Optional[bool] = None,
+        key: Optional[Hashable] = None,
+        replace: bool = False
+    ) -> int:
+        """
+        Adds a bot from its `create_bot` reply, with the same defaults as `BotHandle`,
+        and returns its row.
+
+        Rows are keyed by `key`, or by `(bot_id, ticker)` by default. As bot ids name a
+        strategy, not one bot, two bots on the same strategy and ticker share the default
+        key: adding the second raises `KeyError` unless `replace` is True, in which case
+        it replaces the first row. An explicit `key` already held always replaces its row.
+        """
+        bot_id = _reply_field(create_reply, "bot_id")
+        ticker = _reply_field(create_reply, "ticker")
+        explicit = key is not None
+        if not explicit:
+            key = (bot_id, ticker)
+        row = self._rows.get(key)
+        if row is not None and not (explicit or replace):
+            raise KeyError("portfolio already holds bot %r; pass a key to add it separately, "
+                           "or replace=True to replace it" % (key,))
+        if row is None:
+            if self._size == self._capacity:
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._rows[key] = row
+            self.keys.append(key)
+            self.bot_ids.append(bot_id)
+        else:
+            self.bot_ids[row] = bot_id
+
+        values = self._float
+        entry_price = _reply_field(create_reply, "entry_price")
+        share_num = _reply_field(create_reply, "share_num", 0)
+        if bot_cash_balance is None:
+            bot_cash_balance = investment_amount - share_num * entry_price
+        values["entry_price"][row] = entry_price
+        values["investment_amount"][row] = investment_amount
+        values["bot_cash_balance"][row] = bot_cash_balance
+        values["stop_loss_price"][row] = _reply_field(create_reply, "max_loss_price", 0)
+        values["take_profit_price"][row] = _reply_field(create_reply, "target_profit_price", 0)
+        values["strike"][row] = _reply_field(create_reply, "strike", 0)
+        values["strike_2"][row] = _reply_field(create_reply, "strike_2", 0)
+        values["barrier"][row] = _reply_field(create_reply, "barrier", 0)
+        values["option_price"][row] = _reply_field(create_reply, "option_price", 0)
+        values["share_num"][row] = share_num
+        values["delta"][row] = _reply_field(create_reply, "delta", 0)
+        values["last_price"][row] = entry_price
+        self._margin[row] = _reply_field(create_reply, "margin", 1) if margin is None else margin
+        self._fractionals[row] = (_reply_field(create_reply, "fraction", False)
+                                  if fractionals is None else fractionals)
+        self._ticker[row] = self._tickers.code(ticker)
+        self._expiry[row] = self._expiries.code(_reply_field(create_reply, "expiry"))
+        self._status[row] = 0
+        return row
+
+    def extend(self, create_replies: Iterable, investment_amount: float):
+        for reply in create_replies:
+            self.add(reply, investment_amount)
+
+    @property
+    def tickers(self) -> list:
+        return self._tickers.labels
+
+    @property
+    def statuses(self) -> list:
+        return self._statuses.labels
+
+    @property
+    def active(self):
+        """
+        Boolean mask of the rows still hedged, i.e. whose last status was "active".
+        """
+        return self._status[:self._size] == 0
+
+    def column(self, name: str):
+        """
+        Returns a view of a float column, or of the "margin", "fractionals", "ticker",
+        "expiry" or "status" columns (the last three as codes).
+        """
+        if name in self._float:
+            return self._float[name][:self._size]
+        return getattr(self, "_" + name)[:self._size]
+
+    def _per_row(self, values, rows) -> Optional[list]:
+        """
+        Selects `values`, an array with one value per row or a mapping of ticker to value,
+        for `rows`, as a list of Python floats.
+        """
+        if values is None:
+            return None
+        if isinstance(values, Mapping):
+            by_code = np.array([values.get(ticker, np.nan) for ticker in self._tickers.labels],
+                               dtype=np.float64)
+            selected = by_code[self._ticker[rows]]
+        else:
+            selected = np.asarray(values, dtype=np.float64)[rows]
+        if np.isnan(selected).any():
+            missing = rows[np.isnan(selected)][0]
+            raise KeyError("no value for bot %r (%s)" % (
+                self.keys[missing], self._tickers.labels[self._ticker[missing]]))
+        return selected.tolist()
+
+    def requests(
+        self,
+        message_class,
+        prices,
+        trading_day: Optional[str] = None,
+        rows=None,
+        low_prices=None,
+        high_prices=None,
+        ask_prices=None,
+        bid_prices=None
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        Builds the next `message_class` (`bot_pb2.Hedge` or `bot_pb2.Stop`) request of each
+        row from the columns.
+
+        Args:
+            prices: Current price per row (array of `len(portfolio)`) or per ticker (mapping).
+            trading_day (Optional[str]): Date of the round. Defaults to today.
+            rows: Rows to build requests for. Defaults to the active rows.
+            low_prices, high_prices, ask_prices, bid_prices: Optional, like `prices`.
+
+        Yields:
+            (int, message): Row and request.
+        """
+        for row, _, request in self._requests(message_class, prices, trading_day, rows, low_prices,
+                                              high_prices, ask_prices, bid_prices):
+            yield row, request
+
+    def _requests(self, message_class, prices, trading_day=None, rows=None, low_prices=None,
+                  high_prices=None, ask_prices=None, bid_prices=None) -> Iterator[Tuple[int, float, Any]]:
+        """
+        Like `requests`, also yielding each row's price as given, since the request's
+        `current_price` only holds it as a float32.
+        """
+        if rows is None:
+            rows = np.flatnonzero(self.active)
+        rows = np.asarray(rows, dtype=np.intp)
+        current = self._per_row(prices, rows)
+        extra = {
+            field: self._per_row(values, rows)
+            for field, values in (("current_low_price", low_prices), ("current_high_price", high_prices),
+                                  ("ask_price", ask_prices), ("bid_price", bid_prices))
+            if values is not None
+        }
+        columns = {name: column[rows].tolist() for name, column in self._float.items()}
+        margins = self._margin[rows].tolist()
+        fractionals = self._fractionals[rows].tolist()
+        tickers = self._ticker[rows].tolist()
+        expiries = self._expiry[rows].tolist()
+        # Timestamps are built once per expiry, not once per bot.
+        expiry_timestamps = [date_to_timestamp(expiry) for expiry in self._expiries.labels]
+        trading_day = date_to_timestamp(trading_day or trading_day_clock.today())
+        ticker_labels = self._tickers.labels
+        bot_ids = self.bot_ids
+
+        for index, row in enumerate(rows.tolist()):
+            request = message_class(
+                bot_id=bot_ids[row],
+                ric=ticker_labels[tickers[index]],
+                current_price=current[index],
+                entry_price=columns["entry_price"][index],
+                last_share_num=columns["share_num"][index],
+                last_hedge_delta=columns["delta"][index],
+                investment_amount=columns["investment_amount"][index],
+                bot_cash_balance=columns["bot_cash_balance"][index],
+                stop_loss_price=columns["stop_loss_price"][index],
+                take_profit_price=columns["take_profit_price"][index],
+                expiry=expiry_timestamps[expiries[index]],
+                strike=columns["strike"][index],
+                strike_2=columns["strike_2"][index],
+                margin=margins[index],
+                fraction=fractionals[index],
+                option_price=columns["option_price"][index],
+                barrier=columns["barrier"][index],
+                trading_day=trading_day,
+            )
+            for field, values in extra.items():
+                setattr(request, field, values[index])
+            yield row, current[index], request
+
+    def apply(self, row: int, reply, current_price: float):
+        """
+        Writes a `HedgeBot` or `StopBot` reply (dict or result object) into its row.
+        """
+        values = self._float
+        values["share_num"][row] = _reply_field(reply, "share_num", values["share_num"][row])
+        values["delta"][row] = _reply_field(reply, "delta", values["delta"][row])
+        values["option_price"][row] = _reply_field(reply, "option_price", values["option_price"][row])
+        values["bot_cash_balance"][row] -= _reply_field(reply, "share_change", 0) * current_price
+        values["last_price"][row] = current_price
+        self._status[row] = self._statuses.code(_reply_field(reply, "status", ACTIVE))
+
+    def _run(self, client, method, result_class, requests, concurrency, budget) -> List[BatchItem]:
+        if client.raw:
+            raise ValueError("Portfolio needs decoded replies, the client is in raw mode")
+        call = lambda record: client._call(method, record[2], result_class)
+        if budget is not None:
+            call = lambda record, timeout: client._call(method, record[2], result_class, timeout)
+        failed = []
+        for item in fan_out(call, requests, concurrency, ordered=False, budget=budget):
+            row, price, _ = item.record
+            if item.ok:
+                self.apply(row, item.result, price)
+            else:
+                item.record = self.keys[row]
+                failed.append(item)
+        return failed
+
+    def rebalance(self, client, prices, trading_day: Optional[str] = None, rows=None,
+                  concurrency: int = 16, budget: Optional[float] = None, **price_columns) -> List[BatchItem]:
+        """
+        Hedges every active bot (or `rows`) at `prices` and applies the replies in place.
+
+        Takes the arguments of `requests`, plus `concurrency` and `budget` as in
+        `Client.hedge_many`.
+
+        Returns:
+            list: A `BatchItem` per failed hedge, with the bot's key as its record. Failed
+            rows keep their state and are retried by the next round.
+        """
+        requests = self._requests(bot_pb2.Hedge, prices, trading_day, rows, **price_columns)
+        return self._run(client, "HedgeBot", HedgeResult, requests, concurrency, budget)
+
+    def stop(self, client, prices, trading_day: Optional[str] = None, rows=None,
+             concurrency: int = 16, budget: Optional[float] = None, **price_columns) -> List[BatchItem]:
+        """
+        Stops every active bot (or `rows`) at `prices`, like `rebalance`.
+        """
+        requests = self._requests(bot_pb2.Stop, prices, trading_day, rows, **price_columns)
+        return self._run(client, "StopBot", StopResult, requests, concurrency, budget)
@@ -0,0 +1,189 @@
+# Opt-in phase-level timing of client calls
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .grpc_interface import bot_pb2, bot_pb2_grpc
+
+__all__ = ["CallProfile", "CallProfiler", "PHASES"]
+
+# Phases of a call, in the order they happen. "grpc_overhead" is the time spent in
+# the gRPC client library itself, between building the request and serializing it
+# and between parsing the reply and decoding its JSON.
+PHASES = (
+    "argument_conversion",
+    "proto_construction",
+    "serialization",
+    "wire",
+    "deserialization",
+    "json_decode",
+    "grpc_overhead",
+)
+
+
+class CallProfile:
+    """
+    Phase durations, in nanoseconds, of one call.
+    """
+    __slots__ = ("method", "phases", "start", "last")
+
+    def __init__(self, method: str):
+        self.method = method
+        self.phases = dict.fromkeys(PHASES, 0)
+        self.start = self.last = time.perf_counter_ns()
+
+    def mark(self, phase: str):
+        """
+        Charges the time since the previous mark to `phase`.
+        """
+        now = time.perf_counter_ns()
+        self.phases[phase] += now - self.last
+        self.last = now
+
+    @property
+    def total(self) -> int:
+        return self.last - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "total_us": self.total / 1e3,
+            "phases_us": {phase: duration / 1e3 for phase, duration in self.phases.items()},
+        }
+
+
+class _MethodTotals:
+    __slots__ = ("count", "total", "phases")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.phases = dict.fromkeys(PHASES, 0)
+
+
+class CallProfiler:
+    """
+    Aggregates `CallProfile`s per method and keeps the slowest calls.
+
+    The profile of the call in progress is kept per thread, so the client's request
+    builders, serializers and decoder can each mark their phase without passing it
+    around. Calls whose reply is parsed on another thread (e.g. futures) are only
+    partially broken down.
+    """
+    def __init__(self, worst_n: int = 10):
+        self.worst_n = worst_n
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._methods: Dict[str, _MethodTotals] = {}
+        self._worst = []
+        self._sequence = itertools.count()
+
+    def start(self, method: str) -> CallProfile:
+        profile = self._local.profile = CallProfile(method)
+        return profile
+
+    def current(self) -> Optional[CallProfile]:
+        return getattr(self._local, "profile", None)
+
+    def mark(self, phase: str):
+        profile = getattr(self._local, "profile", None)
+        if profile is not None:
+            profile.mark(phase)
+
+    def finish(self, profile: CallProfile):
+        self._local.profile = None
+        with self._lock:
+            totals = self._methods.get(profile.method)
+            if totals is None:
+                totals = self._methods[profile.method] = _MethodTotals()
+            totals.count += 1
+            totals.total += profile.total
+            for phase, duration in profile.phases.items():
+                totals.phases[phase] += duration
+            if self.worst_n:
+                entry = (profile.total, next(self._sequence), profile)
+                if len(self._worst) < self.worst_n:
+                    heapq.heappush(self._worst, entry)
+                elif entry > self._worst[0]:
+                    heapq.heapreplace(self._worst, entry)
+
+    def abandon(self):
+        """
+        Drops the profile of the current thread's call, e.g. after it failed.
+        """
+        self._local.profile = None
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Returns the call count, mean total and mean duration of each phase (microseconds)
+        and its share of the total, per method.
+        """
+        with self._lock:
+            result = {}
+            for method, totals in self._methods.items():
+                result[method] = {
+                    "count": totals.count,
+                    "mean_total_us": totals.total / totals.count / 1e3,
+                    "phases": {
+                        phase: {
+                            "mean_us": duration / totals.count / 1e3,
+                            "share": duration / totals.total if totals.total else 0.0,
+                        }
+                        for phase, duration in totals.phases.items()
+                    },
+                }
+            return result
+
+    def worst(self, n: Optional[int] = None) -> List[dict]:
+        """
+        Returns the breakdowns of the slowest calls seen, slowest first.
+        """
+        with self._lock:
+            entries = sorted(self._worst, reverse=True)
+        return [profile.to_dict() for _, _, profile in entries[:n]]
+
+    def reset(self):
+        with self._lock:
+            self._methods = {}
+            self._worst = []
+
+    def stub(self, channel) -> bot_pb2_grpc.EchoStub:
+        """
+        Builds an `EchoStub` whose unary methods mark serialization, wire time and
+        deserialization on the current call's profile.
+        """
+        stub = bot_pb2_grpc.EchoStub(channel)
+        for method, request_class in (("CreateBot", bot_pb2.Create), ("HedgeBot", bot_pb2.Hedge),
+                                      ("StopBot", bot_pb2.Stop)):
+            setattr(stub, method, channel.unary_unary(
+                "/echo.Echo/%s" % method,
+                request_serializer=self._serializer(request_class.SerializeToString),
+                response_deserializer=self._deserializer(bot_pb2.EchoReply.FromString),
+            ))
+        return stub
+
+    def _serializer(self, serialize):
+        mark = self.mark
+
+        def profiled_serialize(message):
+            mark("grpc_overhead")
+            data = serialize(message)
+            mark("serialization")
+            return data
+        return profiled_serialize
+
+    def _deserializer(self, deserialize):
+        mark = self.mark
+
+        def profiled_deserialize(data):
+            mark("wire")
+            message = deserialize(data)
+            mark("deserialization")
+            return message
+        return profiled_deserialize
@@ -0,0 +1,117 @@
+# Typed, memory-compact results of bot service calls
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from typing import Any, Dict
+
+__all__ = ["CreateResult", "HedgeResult", "StopResult"]
+
+
+class _Result:
+    """
+    Base of the reply classes. Each documented reply field is a slot, so an instance
+    costs a fraction of the equivalent dict. Fields missing from a reply read as None
+    and are left out of `to_dict()`. Undocumented fields are kept in `extra`.
+    """
+    __slots__ = ("extra",)
+    _fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Slot descriptors, looked up once so conversion does not go through getattr.
+        cls._members = tuple((name, getattr(cls, name)) for name in cls._fields)
+        cls._field_set = frozenset(cls._fields)
+
+    def __init__(self, **values):
+        self.extra = None
+        self._update(values)
+
+    @classmethod
+    def from_reply(cls, reply: Dict[str, Any]):
+        """
+        Builds a result from a decoded bot service reply.
+        """
+        result = cls.__new__(cls)
+        result.extra = None
+        result._update(reply)
+        return result
+
+    def _update(self, values):
+        field_set = self._field_set
+        for name, value in values.items():
+            if name in field_set:
+                setattr(self, name, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[name] = value
+
+    def __getattr__(self, name):
+        # Only reached for slots that were never set.
+        if name in self._field_set:
+            return None
+        raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the reply as a plain dict, as the client returns without typed results.
+        """
+        values = {}
+        cls = type(self)
+        for name, member in self._members:
+            try:
+                values[name] = member.__get__(self, cls)
+            except AttributeError:
+                continue
+        if self.extra:
+            values.update(self.extra)
+        return values
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, ", ".join("%s=%r" % item for item in self.to_dict().items()))
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.extra = None
+        self._update(state)
+
+
+class CreateResult(_Result):
+    """
+    Reply of `Client.create_bot`.
+    """
+    _fields = (
+        "barrier", "bot_id", "classic_vol", "created", "delta", "entry_price", "expiry",
+        "fraction", "margin", "max_loss_amount", "max_loss_pct", "max_loss_price",
+        "option_price", "q", "r", "share_num", "side", "spot_date", "status", "strike",
+        "strike_2", "t", "target_profit_amount", "target_profit_pct", "target_profit_price",
+        "ticker", "total_bot_share_num", "v1", "v2", "vol",
+    )
+    __slots__ = _fields
+
+
+class HedgeResult(_Result):
+    """
+    Reply of `Client.hedge`.
+    """
+    _fields = (
+        "barrier", "current_price", "delta", "entry_price", "last_hedge_delta",
+        "option_price", "q", "r", "share_change", "share_num", "side", "status", "strike",
+        "strike_2", "t", "total_bot_share_num", "v1", "v2",
+    )
+    __slots__ = _fields
+
+
+class StopResult(HedgeResult):
+    """
+    Reply of `Client.stop`, which has the same fields as a hedge reply.
+    """
+    __slots__ = ()
@@ -0,0 +1,137 @@
+# Memory-mapped binary price series for backtests
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+from .backtest import Bar
+from .columnar import np, _require_numpy
+from .dates import DATE_FORMAT
+
+__all__ = ["BAR_FIELDS", "bar_dtype", "write_bars", "open_bars", "iter_bars"]
+
+# Record layout of the binary format: 44 bytes per bar, little-endian, no padding and
+# no header. Prices are IEEE 754 doubles, with NaN for a price the bar does not have.
+#
+#   offset  size  type     field
+#        0     4  int32    trading_day (days since 1970-01-01)
+#        4     8  float64  current_price
+#       12     8  float64  current_low_price
+#       20     8  float64  current_high_price
+#       28     8  float64  ask_price
+#       36     8  float64  bid_price
+BAR_FIELDS = (
+    ("trading_day", "<i4"),
+    ("current_price", "<f8"),
+    ("current_low_price", "<f8"),
+    ("current_high_price", "<f8"),
+    ("ask_price", "<f8"),
+    ("bid_price", "<f8"),
+)
+
+_EPOCH = date(1970, 1, 1)
+
+
+def bar_dtype():
+    """
+    Structured NumPy dtype of one record of the binary format.
+    """
+    _require_numpy()
+    return np.dtype(list(BAR_FIELDS))
+
+
+@lru_cache(maxsize=8192)
+def _day_string(days: int) -> str:
+    return (_EPOCH + timedelta(days=days)).strftime(DATE_FORMAT)
+
+
+def _day_number(trading_day) -> int:
+    if isinstance(trading_day, str):
+        trading_day = date.fromisoformat(trading_day)
+    return (trading_day - _EPOCH).days
+
+
+def write_bars(path: str, bars: Iterable, chunk_size: int = 65536) -> int:
+    """
+    Writes bars (`Bar`s or tuples in `Bar` field order) to `path`, as a `.npy` file if
+    the path ends in ".npy" and in the raw binary format otherwise. Bars are written
+    `chunk_size` at a time, so any length of series is written in constant memory.
+
+    Returns:
+        int: Number of bars written.
+    """
+    dtype = bar_dtype()
+    nan = float("nan")
+
+    def chunks():
+        chunk = []
+        for bar in bars:
+            chunk.append((_day_number(bar[0]),) + tuple(nan if value is None else value for value in bar[1:])
+                         + (nan,) * (len(BAR_FIELDS) - len(bar)))
+            if len(chunk) == chunk_size:
+                yield np.array(chunk, dtype=dtype)
+                chunk = []
+        if chunk:
+            yield np.array(chunk, dtype=dtype)
+
+    if not path.endswith(".npy"):
+        count = 0
+        with open(path, "wb") as file:
+            for chunk in chunks():
+                chunk.tofile(file)
+                count += len(chunk)
+        return count
+
+    # A .npy header records the length up front, so the records go to a raw file
+    # first and are then copied, chunk by chunk, behind the header.
+    raw_path = path + ".tmp"
+    try:
+        count = write_bars(raw_path, bars, chunk_size)
+        source = np.memmap(raw_path, dtype=dtype, mode="r") if count else np.empty(0, dtype=dtype)
+        target = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(count,))
+        for start in range(0, count, chunk_size):
+            target[start:start + chunk_size] = source[start:start + chunk_size]
+        target.flush()
+        del source, target
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+    return count
+
+
+def open_bars(path: str):
+    """
+    Maps a file written by `write_bars` (or any `.npy` file of `bar_dtype()` records)
+    into memory read-only, without reading it.
+    """
+    dtype = bar_dtype()
+    if path.endswith(".npy"):
+        records = np.load(path, mmap_mode="r")
+        if records.dtype != dtype:
+            raise ValueError("%s holds %s records, expected %s" % (path, records.dtype, dtype))
+        return records
+    if os.path.getsize(path) == 0:
+        # mmap cannot map an empty file.
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def iter_bars(records, chunk_size: int = 4096) -> Iterator[Bar]:
+    """
+    Yields the records of `open_bars` (or any array of `bar_dtype()`) as `Bar`s, for
+    `backtest`.
+
+    Only one chunk of records is converted to Python values at a time, so memory
+    stays constant however long the series is, and pages of the file are read by
+    the OS as they are reached.
+    """
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        columns = [chunk[name].tolist() for name, _ in BAR_FIELDS]
+        for day, *prices in zip(*columns):
+            # NaN is the only value not equal to itself.
+            yield Bar(_day_string(day), *[price if price == price else None for price in prices])
@@ -0,0 +1,176 @@
+# Backtest sweeps spread over a process pool
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from .backtest import backtest
+from .columnar import np, _require_numpy, _Categories
+
+__all__ = ["SweepTable", "sweep"]
+
+# Client of the current worker process, created on its first job.
+_worker_settings = None
+_worker_client = None
+
+
+def _init_worker(address: str, port: str, client_options: dict):
+    global _worker_settings, _worker_client
+    _worker_settings = (address, port, client_options)
+    _worker_client = None
+
+
+def _client():
+    global _worker_client
+    if _worker_client is None:
+        from .client import Client
+        address, port, options = _worker_settings
+        _worker_client = Client(address, port, **options)
+    return _worker_client
+
+
+def _max_drawdown(timeline) -> float:
+    peak = None
+    drawdown = 0.0
+    for row in timeline:
+        if peak is None or row.equity > peak:
+            peak = row.equity
+        drawdown = max(drawdown, peak - row.equity)
+    return drawdown
+
+
+def _run_job(job: Tuple) -> Tuple:
+    """
+    Runs one backtest in a worker and returns its summary row.
+    """
+    ticker, bot_id, margin, fractionals, bars, investment_amount = job
+    if isinstance(bars, str):
+        from .series import iter_bars, open_bars
+        bars = iter_bars(open_bars(bars))
+    try:
+        result = backtest(_client(), ticker, bot_id, bars, investment_amount,
+                          margin=margin, fractionals=fractionals)
+    except Exception as exc:
+        return job[:4] + ("error", 0, float("nan"), float("nan"), "%s: %s" % (type(exc).__name__, exc))
+    return job[:4] + (result.exit_reason, len(result.timeline), result.pnl,
+                      _max_drawdown(result.timeline), None)
+
+
+class SweepTable:
+    """
+    Summary of every backtest of a sweep, one row per job, as NumPy columns.
+
+    Tickers, bot ids and exit reasons are stored as integer codes, with their labels in
+    `tickers`, `bot_ids` and `exit_reasons`. Failed backtests have exit reason "error",
+    NaN P&L, and their message in `errors`, keyed by row.
+    """
+    COLUMNS = ("ticker", "bot_id", "margin", "fractionals", "exit_reason", "bars", "pnl", "max_drawdown")
+
+    def __init__(self, rows: Iterable[Tuple]):
+        _require_numpy()
+        self._tickers = _Categories()
+        self._bot_ids = _Categories()
+        self._exit_reasons = _Categories()
+        self.errors: Dict[int, str] = {}
+        columns = ([], [], [], [], [], [], [], [])
+        for index, row in enumerate(rows):
+            ticker, bot_id, margin, fractionals, exit_reason, bars, pnl, drawdown, error = row
+            for column, value in zip(columns, (
+                    self._tickers.code(ticker), self._bot_ids.code(bot_id), margin, fractionals,
+                    self._exit_reasons.code(exit_reason), bars, pnl, drawdown)):
+                column.append(value)
+            if error is not None:
+                self.errors[index] = error
+        dtypes = (np.int32, np.int32, np.int32, np.bool_, np.int16, np.int32, np.float64, np.float64)
+        self._columns = {name: np.array(values, dtype=dtype)
+                         for name, values, dtype in zip(self.COLUMNS, columns, dtypes)}
+
+    def __len__(self):
+        return len(self._columns["pnl"])
+
+    @property
+    def tickers(self) -> list:
+        return self._tickers.labels
+
+    @property
+    def bot_ids(self) -> list:
+        return self._bot_ids.labels
+
+    @property
+    def exit_reasons(self) -> list:
+        return self._exit_reasons.labels
+
+    def column(self, name: str):
+        return self._columns[name]
+
+    def columns(self) -> dict:
+        return dict(self._columns)
+
+    def to_dicts(self) -> list:
+        """
+        Returns the rows as dicts with labels in place of codes, e.g. for `pandas.DataFrame`.
+        """
+        labels = {"ticker": self.tickers, "bot_id": self.bot_ids, "exit_reason": self.exit_reasons}
+        names = self.COLUMNS
+        rows = []
+        for values in zip(*(self._columns[name].tolist() for name in names)):
+            row = dict(zip(names, values))
+            for name, label in labels.items():
+                row[name] = label[row[name]]
+            rows.append(row)
+        return rows
+
+
+def sweep(
+    address: str,
+    port: str,
+    bars: Mapping[str, object],
+    bot_ids: Iterable[str],
+    investment_amount: float,
+    margins: Iterable[int] = (1,),
+    fractionals: Iterable[bool] = (False,),
+    processes: Optional[int] = None,
+    client_options: Optional[dict] = None,
+    mp_context=None,
+    chunksize: int = 1
+) -> SweepTable:
+    """
+    Backtests every ticker × bot id × margin × fractionals combination on a process pool.
+
+    Each worker creates its own `Client` on its first job, so no gRPC channel crosses
+    a process boundary, and returns only a summary row, so results stay small however
+    long the series are.
+
+    Args:
+        address (str): Host of the bot service.
+        port (str): Port of the bot service.
+        bars (Mapping): Price series per ticker, either a path to a file written by
+            `DroidRpc.series.write_bars` (memory-mapped by each worker) or a sequence of bars.
+        bot_ids (Iterable[str]): Bot types to backtest.
+        investment_amount (float): Cash each bot starts with.
+        margins (Iterable[int]): Margins to backtest. Defaults to (1,).
+        fractionals (Iterable[bool]): Fractional share settings to backtest. Defaults to (False,).
+        processes (Optional[int]): Number of worker processes. Defaults to the number of CPUs.
+        client_options (Optional[dict]): Keyword arguments for each worker's `Client`.
+        mp_context: Multiprocessing context of the pool. Defaults to "spawn", because gRPC
+            does not support forking a process with live channels.
+        chunksize (int): Jobs sent to a worker at a time. Defaults to 1.
+
+    Returns:
+        SweepTable: One row per combination, in ticker, bot id, margin, fractionals order.
+    """
+    _require_numpy()
+    if mp_context is None:
+        mp_context = multiprocessing.get_context("spawn")
+    jobs = [
+        (ticker, bot_id, margin, fractional, bars[ticker], investment_amount)
+        for ticker, bot_id, margin, fractional in itertools.product(
+            bars, list(bot_ids), list(margins), list(fractionals))
+    ]
+    with ProcessPoolExecutor(max_workers=processes, mp_context=mp_context, initializer=_init_worker,
+                             initargs=(address, port, dict(client_options or {}))) as executor:
+        return SweepTable(executor.map(_run_job, jobs, chunksize=chunksize))
@@ -0,0 +1,251 @@
+# In-process stand-in for the bot service, for offline tests and benchmarks
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import json
+import math
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent import futures
+from datetime import timedelta
+from typing import Optional, Tuple
+
+import grpc
+
+from .grpc_interface import bot_pb2, bot_pb2_grpc
+
+__all__ = ["FakeEchoServicer", "start_server", "LocalGuardian"]
+
+
+def _date(timestamp):
+    return timestamp.ToDatetime().date()
+
+
+def _round(value: float) -> float:
+    """
+    Rounds away the float32 noise of request fields.
+    """
+    return round(value, 4)
+
+
+class FakeEchoServicer(bot_pb2_grpc.EchoServicer):
+    """
+    Deterministic `EchoServicer` returning replies shaped like the bot service's.
+
+    Replies depend only on the request, so the same inputs always give the same
+    reply. It is not a pricing model: delta is the position of the price between
+    the stop loss and take profit levels, and the bot holds `delta` of its
+    investment in shares.
+
+    Attributes:
+        latency (float): Seconds each call sleeps before replying. Defaults to 0.
+        calls (Counter): Number of calls received per method name.
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _received(self, method: str):
+        with self._lock:
+            self.calls[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def reference_price(ticker: str) -> float:
+        """
+        Deterministic price used for a ticker when a request does not carry one.
+        """
+        return 50.0 + zlib.crc32(ticker.encode("utf-8")) % 20000 / 100.0
+
+    @staticmethod
+    def duration_days(bot_id: str) -> int:
+        """
+        Life of a bot type, read from the trailing digits of its id as a fraction of a
+        year (e.g. "CLASSIC_classic_025" lives a quarter of a year).
+        """
+        digits = bot_id.rsplit("_", 1)[-1]
+        years = int(digits) / 100.0 if digits.isdigit() else 0.25
+        return max(int(round(365 * years)), 1)
+
+    def create_reply(self, request: bot_pb2.Create) -> dict:
+        price = _round(request.price) if request.price else self.reference_price(request.ticker)
+        spot_date = request.spot_date.ToDatetime()
+        days = self.duration_days(request.bot_id)
+        tp_multiplier = request.tp_multiplier if request.HasField("tp_multiplier") else 1.0
+        sl_multiplier = request.sl_multiplier if request.HasField("sl_multiplier") else 1.0
+        target_profit_pct = round(0.1 * tp_multiplier, 4)
+        max_loss_pct = round(-0.05 * sl_multiplier, 4)
+        shares = request.investment_amount * 0.5 / price
+        share_num = round(shares, 2) if request.fraction else float(math.floor(shares))
+        max_loss_price = round(price * (1 + max_loss_pct), 4)
+        target_profit_price = round(price * (1 + target_profit_pct), 4)
+        return {
+            "ticker": request.ticker,
+            "share_num": share_num,
+            "expiry": (spot_date + timedelta(days=days)).strftime("%Y-%m-%d"),
+            "spot_date": spot_date.strftime("%Y-%m-%d"),
+            "created": spot_date.strftime("%Y-%m-%d"),
+            "total_bot_share_num": share_num,
+            "max_loss_pct": max_loss_pct,
+            "max_loss_price": max_loss_price,
+            "max_loss_amount": round(share_num * (max_loss_price - price), 4),
+            "target_profit_pct": target_profit_pct,
+            "target_profit_price": target_profit_price,
+            "target_profit_amount": round(share_num * (target_profit_price - price), 4),
+            "entry_price": price,
+            "margin": request.margin or 1,
+            "bot_id": request.bot_id,
+            "fraction": request.fraction,
+            "side": "buy",
+            "status": "active",
+            "vol": 0.25,
+            "classic_vol": 0.25,
+            "strike_2": 0,
+            "barrier": 0,
+            "delta": 0.5,
+            "option_price": 0,
+            "q": 0,
+            "r": 0,
+            "strike": 0,
+            "t": days,
+            "v1": 0,
+            "v2": 0,
+        }
+
+    def hedge_reply(self, request: bot_pb2.Hedge) -> dict:
+        price = _round(request.current_price)
+        expiry = _date(request.expiry)
+        trading_day = _date(request.trading_day) if request.HasField("trading_day") else expiry
+        expired = trading_day >= expiry
+        if expired or price <= request.stop_loss_price or price >= request.take_profit_price:
+            status = "expired" if expired else "stopped"
+            delta = 0.0
+            share_num = 0.0
+        else:
+            status = "active"
+            span = request.take_profit_price - request.stop_loss_price
+            delta = round((price - request.stop_loss_price) / span, 4) if span > 0 else 0.5
+            shares = request.investment_amount * delta / price
+            fractional = request.HasField("fraction") and bool(request.fraction)
+            share_num = round(shares, 2) if fractional else float(math.floor(shares))
+            # Cannot buy more than the remaining cash pays for.
+            affordable = request.last_share_num + max(request.bot_cash_balance, 0.0) / price
+            share_num = min(share_num, affordable if fractional else float(math.floor(affordable)))
+        share_change = _round(share_num - request.last_share_num)
+        return {
+            "barrier": _round(request.barrier),
+            "current_price": price,
+            "delta": delta,
+            "entry_price": _round(request.entry_price),
+            "last_hedge_delta": _round(request.last_hedge_delta),
+            "option_price": _round(request.option_price),
+            "q": 0,
+            "r": 0,
+            "share_change": share_change,
+            "share_num": share_num,
+            "side": "buy" if share_change >= 0 else "sell",
+            "status": status,
+            "strike": _round(request.strike),
+            "strike_2": _round(request.strike_2),
+            "t": max((expiry - trading_day).days, 0),
+            "total_bot_share_num": share_num,
+            "v1": 0,
+            "v2": 0,
+        }
+
+    def stop_reply(self, request: bot_pb2.Stop) -> dict:
+        reply = self.hedge_reply(request)
+        reply.update({
+            "delta": 0.0,
+            "share_num": 0.0,
+            "total_bot_share_num": 0.0,
+            "share_change": -_round(request.last_share_num),
+            "side": "sell",
+            "status": "stopped",
+        })
+        return reply
+
+    def CreateBot(self, request, context):
+        self._received("CreateBot")
+        return bot_pb2.EchoReply(message=json.dumps(self.create_reply(request)))
+
+    def HedgeBot(self, request, context):
+        self._received("HedgeBot")
+        return bot_pb2.EchoReply(message=json.dumps(self.hedge_reply(request)))
+
+    def StopBot(self, request, context):
+        self._received("StopBot")
+        return bot_pb2.EchoReply(message=json.dumps(self.stop_reply(request)))
+
+    def HedgeStream(self, request_iterator, context):
+        for request in request_iterator:
+            self._received("HedgeStream")
+            yield bot_pb2.EchoReply(message=json.dumps(self.hedge_reply(request)))
+
+
+def start_server(
+    servicer: Optional[bot_pb2_grpc.EchoServicer] = None,
+    address: str = "127.0.0.1",
+    port: int = 0,
+    max_workers: int = 16
+) -> Tuple[grpc.Server, int]:
+    """
+    Starts a gRPC server for `servicer`, a `FakeEchoServicer` by default.
+
+    Args:
+        servicer (Optional[EchoServicer]): Servicer to register. Defaults to a new `FakeEchoServicer`.
+        address (str): Interface to listen on. Defaults to "127.0.0.1".
+        port (int): Port to listen on, 0 for any free port. Defaults to 0.
+        max_workers (int): Threads serving calls. Defaults to 16.
+
+    Returns:
+        Tuple[grpc.Server, int]: The started server and the port it listens on. Call
+            `server.stop(None)` to shut it down.
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    bot_pb2_grpc.add_EchoServicer_to_server(servicer or FakeEchoServicer(), server)
+    bound_port = server.add_insecure_port("%s:%d" % (address, port))
+    server.start()
+    return server, bound_port
+
+
+class LocalGuardian:
+    """
+    A `FakeEchoServicer` served on a local port for the duration of a `with` block.
+
+        with LocalGuardian() as guardian:
+            client = Client(address=guardian.address, port=guardian.port)
+
+    Attributes:
+        servicer (FakeEchoServicer): The servicer answering calls.
+        address (str): Host the server listens on.
+        port (str): Port the server listens on, as `Client` expects it.
+    """
+    def __init__(self, servicer: Optional[bot_pb2_grpc.EchoServicer] = None,
+                 address: str = "127.0.0.1", max_workers: int = 16):
+        self.servicer = servicer or FakeEchoServicer()
+        self.address = address
+        self.max_workers = max_workers
+        self.server = None
+        self.port = None
+
+    def start(self):
+        self.server, port = start_server(self.servicer, self.address, max_workers=self.max_workers)
+        self.port = str(port)
+        return self
+
+    def stop(self, grace: Optional[float] = None):
+        if self.server is not None:
+            self.server.stop(grace)
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
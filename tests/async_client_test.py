@@ -0,0 +1,62 @@
+# Asyncio client test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import asyncio
+import pytest
+from grpc import aio
+from DroidRpc import AsyncClient
+from hedging_test import hedge_inputs
+
+
+def run(guardian, call):
+    """
+    Runs `call(async_client)` on a fresh event loop with a client bound to it.
+    """
+    async def main():
+        async with AsyncClient(address=guardian.address, port=guardian.port) as async_client:
+            return await call(async_client)
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def bot(client):
+    return client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+
+
+class TestAsyncClient:
+    def test_create(self, guardian, client):
+        """
+        Test that the asyncio client creates bots like the blocking one.
+        """
+        args = ("IBM", "2022-02-15", 100000, "CLASSIC_classic_025")
+        response = run(guardian, lambda async_client: async_client.create_bot(*args, price=156.5))
+        assert response == client.create_bot(*args, price=156.5)
+
+    def test_hedge(self, guardian, client, bot):
+        """
+        Test that the asyncio client gives the same replies as the blocking one.
+        """
+        positions = [hedge_inputs(bot, current_price=price) for price in range(150, 170)]
+
+        def hedge_all(async_client):
+            return asyncio.gather(*(async_client.hedge(**position) for position in positions))
+
+        assert run(guardian, hedge_all) == [client.hedge(**position) for position in positions]
+
+    def test_stop(self, guardian, client, bot):
+        response = run(guardian, lambda async_client: async_client.stop(**hedge_inputs(bot)))
+        assert response == client.stop(**hedge_inputs(bot))
+        assert response['status'] == "stopped"
+
+    def test_close(self, guardian, bot):
+        """
+        Test that leaving the context closes the channel, so later calls fail.
+        """
+        async def main():
+            async with AsyncClient(address=guardian.address, port=guardian.port) as async_client:
+                await async_client.hedge(**hedge_inputs(bot))
+            with pytest.raises(aio.UsageError):
+                await async_client.hedge(**hedge_inputs(bot))
+        asyncio.run(main())
@@ -0,0 +1,80 @@
+# Backtest test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from datetime import date, timedelta
+import pytest
+from DroidRpc.backtest import Bar, backtest, backtest_many
+
+
+def bars(prices, start=date(2022, 2, 15), **columns):
+    """
+    Returns one bar per price on consecutive days.
+    """
+    return [
+        Bar((start + timedelta(days=day)).strftime("%Y-%m-%d"), price,
+            **{name: values[day] for name, values in columns.items()})
+        for day, price in enumerate(prices)
+    ]
+
+
+class TestBacktest:
+    def test_end_of_data(self, client):
+        """
+        Test that every bar is hedged and the P&L follows cash and position value.
+        """
+        result = backtest(client, "IBM", "CLASSIC_classic_025", bars([100, 101, 103, 102, 104]), 100000)
+        assert result.exit_reason == "end_of_data"
+        assert [row.action for row in result.timeline] == ["create"] + ["hedge"] * 4
+        assert [row.trading_day for row in result.timeline] == [bar.trading_day for bar in bars([0] * 5)]
+        for row in result.timeline:
+            assert row.position_value == pytest.approx(row.share_num * row.price)
+            assert row.pnl == pytest.approx(row.bot_cash_balance + row.position_value - 100000)
+        assert result.pnl == result.timeline[-1].pnl > 0
+
+    def test_stop_loss(self, client):
+        result = backtest(client, "IBM", "CLASSIC_classic_025", bars([100, 98, 94, 90]), 100000)
+        assert result.exit_reason == "stop_loss"
+        assert [row.action for row in result.timeline] == ["create", "hedge", "stop"]
+        assert result.timeline[-1].share_num == 0
+        assert result.pnl < 0
+
+    def test_take_profit_on_high(self, client):
+        """
+        Test that an intraday high through the take profit level stops the bot.
+        """
+        series = bars([100, 101, 102], current_high_price=[100, 101, 111], current_low_price=[100, 100, 101])
+        result = backtest(client, "IBM", "CLASSIC_classic_025", series, 100000)
+        assert result.exit_reason == "take_profit"
+        assert result.timeline[-1].action == "stop"
+
+    def test_expiry(self, client):
+        result = backtest(client, "IBM", "CLASSIC_classic_001", bars([100] * 10), 100000)
+        assert result.exit_reason == "expired"
+        assert result.timeline[-1].trading_day == "2022-02-19"
+        assert len(result.timeline) == 5
+
+    def test_mapping_bars(self, client):
+        series = [bar._asdict() for bar in bars([100, 101], ask_price=[100.1, 101.1], bid_price=[99.9, 100.9])]
+        result = backtest(client, "IBM", "CLASSIC_classic_025", series, 100000)
+        assert len(result.timeline) == 2
+
+    def test_no_bars(self, client):
+        result = backtest(client, "IBM", "CLASSIC_classic_025", [], 100000)
+        assert result.exit_reason == "end_of_data" and result.timeline == []
+
+
+def test_backtest_many(client):
+    """
+    Test that many bots are backtested concurrently, in input order.
+    """
+    runs = [
+        {"ticker": ticker, "bot_id": "CLASSIC_classic_025", "bars": bars(prices), "investment_amount": 100000}
+        for ticker, prices in (("IBM", [100, 101, 102]), ("AAPL", [100, 90]), ("MSFT", [100, 99, 100, 101]))
+    ]
+    items = list(backtest_many(client, runs, concurrency=3))
+    assert all(item.ok for item in items)
+    assert [item.result.ticker for item in items] == ["IBM", "AAPL", "MSFT"]
+    assert [item.result.exit_reason for item in items] == ["end_of_data", "stop_loss", "end_of_data"]
+    assert items[1].result.to_dicts()[-1]["action"] == "stop"
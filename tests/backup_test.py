@@ -0,0 +1,131 @@
+# Backup request test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+import time
+from concurrent.futures import Future
+import pytest
+from DroidRpc import Client
+from DroidRpc.backup import BackupPolicy
+from DroidRpc.breaker import CircuitBreakers
+from DroidRpc.testing import FakeEchoServicer, LocalGuardian
+from hedging_test import hedge_inputs
+
+
+class StallingServicer(FakeEchoServicer):
+    """
+    Stalls the first `stalls` hedges until they are cancelled.
+    """
+    def __init__(self, stalls: int):
+        super().__init__()
+        self.stalls = stalls
+        self.cancelled = threading.Event()
+
+    def HedgeBot(self, request, context):
+        with self._lock:
+            stall = self.calls["HedgeBot"] < self.stalls
+        if stall:
+            self._received("HedgeBot")
+            deadline = time.monotonic() + 5
+            while context.is_active() and time.monotonic() < deadline:
+                time.sleep(0.005)
+            self.cancelled.set()
+            return None
+        return super().HedgeBot(request, context)
+
+
+class FakeMethod:
+    """
+    Stands in for a unary method: records the timeout of each call and answers after
+    `latency` seconds, or never if it is None.
+    """
+    def __init__(self, latency=None, reply="reply"):
+        self.latency = latency
+        self.reply = reply
+        self.timeouts = []
+
+    def future(self, request, timeout=None):
+        self.timeouts.append(timeout)
+        future = Future()
+        if self.latency is not None:
+            threading.Timer(self.latency, future.set_result, (self.reply,)).start()
+        return future
+
+
+@pytest.fixture
+def stalling_guardian():
+    with LocalGuardian(StallingServicer(stalls=1)) as server:
+        yield server
+
+
+def test_disabled_by_default(client):
+    assert client.backup is None and client.backup_stats() == {}
+
+
+def test_backup_answers_stalled_hedge(stalling_guardian):
+    """
+    Test that a stalled hedge is answered by its backup and then cancelled.
+    """
+    with Client(address=stalling_guardian.address, port=stalling_guardian.port, backup_after=0.95) as client:
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        start = time.monotonic()
+        hedge = client.hedge(**hedge_inputs(bot))
+        assert time.monotonic() - start < 1
+        assert hedge == client.hedge(**hedge_inputs(bot))
+        assert stalling_guardian.servicer.cancelled.wait(2)
+        stats = client.backup_stats()
+        assert stats["calls"] == 2
+        assert stats["backups_sent"] == 1 and stats["backup_wins"] == 1
+        assert stats["backup_rate"] == 0.5
+        assert stalling_guardian.servicer.calls["HedgeBot"] == 3
+
+
+def test_backup_gets_time_left():
+    """
+    Test that the backup is sent with what is left of the timeout, not all of it again.
+    """
+    policy = BackupPolicy(initial_delay=0.05)
+    primary, backup = FakeMethod(), FakeMethod(latency=0)
+    assert policy.call(primary, backup, "request", timeout=1.0)[:2] == ("reply", True)
+    assert primary.timeouts == [1.0]
+    assert 0.5 < backup.timeouts[0] <= 0.95
+
+
+def test_backup_latency_excludes_delay():
+    """
+    Test that a winning backup is timed from when it was sent, not from the first call.
+    """
+    policy = BackupPolicy(initial_delay=0.2)
+    response, backup_won, latency = policy.call(FakeMethod(), FakeMethod(latency=0), "request", timeout=1.0)
+    assert backup_won and latency < 0.1
+    assert policy._latency.count == 1 and policy._latency.percentile(0.5) < 100000
+
+
+def test_breaker_charges_the_answering_endpoint(stalling_guardian):
+    """
+    Test that a hedge answered by the backup replica is recorded against it, not the primary.
+    """
+    breakers = CircuitBreakers()
+    with Client(address="127.0.0.1", port=stalling_guardian.port, backup_after=0.95,
+                backup_address="localhost", circuit_breaker=breakers) as client:
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        client.hedge(**hedge_inputs(bot))
+        assert client.backup_stats()["backup_wins"] == 1
+    snapshot = breakers.snapshot()
+    assert snapshot["127.0.0.1:%s HedgeBot" % stalling_guardian.port]["calls"] == 0
+    assert snapshot["localhost:%s HedgeBot" % stalling_guardian.port]["calls"] == 1
+
+
+def test_delay_follows_observed_latency():
+    policy = BackupPolicy(percentile=0.9, initial_delay=0.05, warmup=BackupPolicy.REFRESH_EVERY)
+    assert policy.delay == 0.05
+    for _ in range(BackupPolicy.REFRESH_EVERY):
+        policy._observe(2000000)
+    assert policy.delay == pytest.approx(0.002, rel=0.02)
+
+
+def test_invalid_percentile():
+    with pytest.raises(ValueError):
+        BackupPolicy(percentile=95)
@@ -0,0 +1,111 @@
+# Batch fan-out test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+import time
+import pytest
+from DroidRpc.batch import BudgetExceeded, fan_out
+from hedging_test import hedge_inputs
+
+class TestFanOut:
+    def test_ordered_results(self):
+        """
+        Test that ordered batches yield results in input order.
+        """
+        items = list(fan_out(lambda x: (time.sleep(0.001 * (5 - x % 5)), x * 2)[1], range(20), concurrency=4))
+        assert [item.index for item in items] == list(range(20))
+        assert [item.result for item in items] == [x * 2 for x in range(20)]
+
+    def test_unordered_results(self):
+        """
+        Test that unordered batches yield every record exactly once.
+        """
+        items = list(fan_out(lambda x: x, range(50), concurrency=8, ordered=False))
+        assert sorted(item.index for item in items) == list(range(50))
+
+    def test_failure_does_not_abort(self):
+        """
+        Test that one failing call is reported without aborting the batch.
+        """
+        def call(x):
+            if x == 3:
+                raise ValueError("bad record")
+            return x
+
+        items = list(fan_out(call, range(6), concurrency=2))
+        assert [item.ok for item in items] == [True, True, True, False, True, True]
+        assert isinstance(items[3].error, ValueError)
+
+    def test_concurrency_bound(self):
+        """
+        Test that no more than `concurrency` calls are in flight at once.
+        """
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def call(x):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            time.sleep(0.002)
+            with lock:
+                state["in_flight"] -= 1
+
+        list(fan_out(call, range(40), concurrency=3, ordered=False))
+        assert state["peak"] <= 3
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            list(fan_out(lambda x: x, range(3), concurrency=0))
+
+    def test_budget(self):
+        """
+        Test that records not finished within the budget are reported as missed.
+        """
+        def call(x, timeout):
+            if x == 2:
+                time.sleep(timeout)
+                raise TimeoutError("stuck")
+            return x
+
+        start = time.monotonic()
+        items = list(fan_out(call, range(5), concurrency=1, budget=0.1))
+        assert time.monotonic() - start < 0.5
+        assert [item.result for item in items[:2]] == [0, 1]
+        assert all(item.missed for item in items[2:])
+        assert isinstance(items[2].error.__cause__, TimeoutError)
+        assert isinstance(items[4].error, BudgetExceeded)
+
+
+@pytest.fixture
+def bot(client):
+    return client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+
+
+class TestClientBatches:
+    def test_hedge_many(self, client, bot):
+        """
+        Test that a batch gives the same replies as one hedge at a time.
+        """
+        positions = [hedge_inputs(bot, current_price=price) for price in range(150, 170)]
+        items = list(client.hedge_many(positions, concurrency=4))
+        assert [item.result for item in items] == [client.hedge(**position) for position in positions]
+
+    def test_hedge_many_unordered(self, client, bot):
+        positions = [hedge_inputs(bot, current_price=price) for price in range(150, 170)]
+        items = list(client.hedge_many(positions, concurrency=4, ordered=False))
+        assert sorted(item.index for item in items) == list(range(20))
+        assert all(item.result == client.hedge(**positions[item.index]) for item in items)
+
+    @pytest.mark.parametrize("method", ["hedge_many", "stop_many"])
+    def test_bad_position_does_not_abort(self, client, bot, method):
+        """
+        Test that one malformed position is reported without aborting the rest of the batch.
+        """
+        positions = [hedge_inputs(bot, current_price=price) for price in range(150, 155)]
+        del positions[2]["expiry"]
+        items = list(getattr(client, method)(positions, concurrency=2))
+        assert [item.ok for item in items] == [True, True, False, True, True]
+        assert isinstance(items[2].error, TypeError)
@@ -0,0 +1,150 @@
+# Circuit breaker and load shedding test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+import grpc
+import pytest
+from DroidRpc import Client
+from DroidRpc.breaker import CircuitBreaker, CircuitBreakers, CircuitOpen, LoadShedder, Overloaded
+from DroidRpc.testing import FakeEchoServicer, LocalGuardian
+from hedging_test import hedge_inputs
+
+
+def breaker(clock, **settings):
+    settings = dict(dict(window=10, min_calls=4, open_for=5.0, probes=2, slow_call=1.0), **settings)
+    return CircuitBreaker(("guardian:50065", "HedgeBot"), time_source=clock, **settings)
+
+
+def call(breaker, failed=False, latency=0.01):
+    breaker.after(breaker.before(), latency, failed)
+
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_rate(self, clock):
+        """
+        Test that the circuit opens once enough recent calls failed, and then fails fast.
+        """
+        circuit = breaker(clock)
+        for failed in (False, True, False):
+            call(circuit, failed)
+        assert circuit.state == CircuitBreaker.CLOSED
+        call(circuit, failed=True)
+        assert circuit.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpen) as error:
+            circuit.before()
+        assert error.value.retry_in == pytest.approx(5.0)
+
+    def test_opens_on_slow_calls(self, clock):
+        circuit = breaker(clock, slow_rate=0.5)
+        for latency in (0.1, 3.0, 0.1, 3.0):
+            call(circuit, latency=latency)
+        assert circuit.state == CircuitBreaker.OPEN
+
+    def test_half_open_recovery(self, clock):
+        """
+        Test that probes are limited while half-open and enough good ones close the circuit.
+        """
+        circuit = breaker(clock)
+        for _ in range(4):
+            call(circuit, failed=True)
+        clock.now = 5.0
+        first = circuit.before()
+        second = circuit.before()
+        assert circuit.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpen):
+            circuit.before()
+        circuit.after(first, 0.01, False)
+        circuit.after(second, 0.01, False)
+        assert circuit.state == CircuitBreaker.CLOSED
+        assert circuit.snapshot()["calls"] == 0
+        call(circuit)
+
+    def test_call_admitted_while_closed_is_not_a_probe(self, clock):
+        """
+        Test that a call admitted before the circuit opened does not count as a probe
+        when it finishes half-open.
+        """
+        circuit = breaker(clock)
+        slow = circuit.before()
+        for _ in range(4):
+            call(circuit, failed=True)
+        clock.now = 5.0
+        probe = circuit.before()
+        circuit.after(slow, 0.01, False)
+        circuit.after(probe, 0.01, False)
+        assert circuit.state == CircuitBreaker.HALF_OPEN
+        assert circuit._probes_in_flight == 0
+        call(circuit)
+        assert circuit.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self, clock):
+        circuit = breaker(clock)
+        for _ in range(4):
+            call(circuit, failed=True)
+        clock.now = 6.0
+        call(circuit, failed=True)
+        assert circuit.state == CircuitBreaker.OPEN
+        assert circuit.snapshot()["opened"] == 2
+        with pytest.raises(CircuitOpen):
+            circuit.before()
+
+
+class TestLoadShedder:
+    def test_sheds_low_priority_only(self):
+        shedder = LoadShedder(max_in_flight=2)
+        shedder.acquire(low_priority=True)
+        shedder.acquire(low_priority=False)
+        with pytest.raises(Overloaded):
+            shedder.acquire(low_priority=True)
+        shedder.acquire(low_priority=False)
+        assert shedder.in_flight == 3 and shedder.shed == 1
+        shedder.release()
+        shedder.release()
+        shedder.acquire(low_priority=True)
+
+
+class TestClient:
+    def test_fails_fast_while_open(self, closed_port):
+        """
+        Test that a client stops calling an unreachable service once its circuit opens.
+        """
+        breakers = CircuitBreakers(window=3, min_calls=3, open_for=60)
+        with Client(address="127.0.0.1", port=closed_port, circuit_breaker=breakers) as client:
+            for _ in range(3):
+                with pytest.raises(grpc.RpcError):
+                    client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025")
+            with pytest.raises(CircuitOpen):
+                client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025")
+        snapshot = breakers.snapshot()["127.0.0.1:%s CreateBot" % closed_port]
+        assert snapshot["state"] == "open" and snapshot["rejected"] == 1
+
+    def test_sheds_hedges_under_load(self):
+        """
+        Test that hedges are shed while the in-flight limit is reached, but stops are not.
+        """
+        servicer = FakeEchoServicer()
+        release = threading.Event()
+        received = threading.Semaphore(0)
+        hedge = servicer.HedgeBot
+
+        def stalled_hedge(request, context):
+            received.release()
+            release.wait(5)
+            return hedge(request, context)
+
+        servicer.HedgeBot = stalled_hedge
+        with LocalGuardian(servicer) as guardian, \
+                Client(address=guardian.address, port=guardian.port, max_in_flight=1) as client:
+            bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+            first = threading.Thread(target=client.hedge, kwargs=hedge_inputs(bot))
+            first.start()
+            assert received.acquire(timeout=5)
+            with pytest.raises(Overloaded):
+                client.hedge(**hedge_inputs(bot))
+            assert client.stop(**hedge_inputs(bot))["status"] == "stopped"
+            release.set()
+            first.join()
+            assert client.shedder.shed == 1 and client.shedder.in_flight == 0
+            client.hedge(**hedge_inputs(bot))
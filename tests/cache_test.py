@@ -0,0 +1,76 @@
+# Quote cache test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import pytest
+from DroidRpc import Client, CreateResult
+from DroidRpc.cache import TTLCache
+from DroidRpc.testing import FakeEchoServicer, LocalGuardian
+
+QUOTE = ("IBM", "2022-02-15", 100000, "CLASSIC_classic_025")
+
+
+class TestTTLCache:
+    def test_expiry(self, clock):
+        cache = TTLCache(ttl=10, time_source=clock)
+        cache.put("a", 1)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a") is None
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "evictions": 0,
+                                 "expirations": 1, "size": 0}
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entry is evicted when the cache is full.
+        """
+        cache = TTLCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+        assert cache.stats()["evictions"] == 1 and len(cache) == 2
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            TTLCache(maxsize=0)
+
+
+@pytest.fixture(scope="module")
+def counting_guardian():
+    with LocalGuardian(FakeEchoServicer()) as server:
+        yield server
+
+
+@pytest.mark.parametrize("typed_results", [False, True])
+def test_repeated_quotes_are_cached(counting_guardian, typed_results):
+    """
+    Test that a repeated quote is served from the cache, and a bypass refreshes it.
+    """
+    calls = counting_guardian.servicer.calls
+    with Client(address=counting_guardian.address, port=counting_guardian.port,
+                quote_cache=True, typed_results=typed_results) as client:
+        before = calls["CreateBot"]
+        quote = client.create_bot(*QUOTE, price=156.5)
+        assert client.create_bot(*QUOTE, price=156.5) == quote
+        assert calls["CreateBot"] == before + 1
+        client.create_bot(*QUOTE, price=157)
+        assert calls["CreateBot"] == before + 2
+        client.create_bot(*QUOTE, price=156.5, bypass_cache=True)
+        assert calls["CreateBot"] == before + 3
+        assert client.quote_cache.stats()["hits"] == 1
+        assert client.quote_cache.stats()["misses"] == 2
+        if typed_results:
+            assert isinstance(client.create_bot(*QUOTE, price=156.5), CreateResult)
+
+
+def test_cached_quote_is_a_copy(counting_guardian):
+    with Client(address=counting_guardian.address, port=counting_guardian.port, quote_cache=True) as client:
+        quote = client.create_bot(*QUOTE, price=156.5)
+        expected = dict(quote)
+        quote["share_num"] = -1
+        assert client.create_bot(*QUOTE, price=156.5) == expected
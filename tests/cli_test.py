@@ -0,0 +1,94 @@
+# Command line tool test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import io
+import json
+from DroidRpc.cli import main
+from DroidRpc.grpc_interface import bot_pb2
+from DroidRpc.testing import FakeEchoServicer, LocalGuardian
+
+CREATES = [
+    {"ticker": "IBM", "spot_date": "2022-02-15", "investment_amount": 100000,
+     "bot_id": "CLASSIC_classic_025", "price": 156.5},
+    {"ticker": "AAPL", "spot_date": "2022-02-15", "investment_amount": 50000,
+     "bot_id": "CLASSIC_classic_025", "fractionals": True},
+]
+
+
+class OddReplyServicer(FakeEchoServicer):
+    """
+    Replies to creates with pretty-printed JSON, or with plain text for AAPL.
+    """
+    def CreateBot(self, request, context):
+        reply = json.loads(super().CreateBot(request, context).message)
+        if request.ticker == "AAPL":
+            return bot_pb2.EchoReply(message="not json")
+        return bot_pb2.EchoReply(message=json.dumps(reply, indent=2))
+
+
+def run(guardian, capsys, *args):
+    code = main(list(args) + ["--address", guardian.address, "--port", guardian.port])
+    captured = capsys.readouterr()
+    return code, [json.loads(line) for line in captured.out.splitlines()], captured.err
+
+
+def test_jsonl_from_stdin(guardian, capsys, monkeypatch):
+    """
+    Test that JSONL records on stdin are created and replies are written as JSON lines.
+    """
+    stdin = "".join(json.dumps(record) + "\n" for record in CREATES) + "\n"
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    code, lines, err = run(guardian, capsys, "create", "--ordered")
+    assert code == 0 and err.strip() == "2 ok, 0 failed"
+    assert [line["index"] for line in lines] == [0, 1]
+    assert [line["reply"]["ticker"] for line in lines] == ["IBM", "AAPL"]
+    assert lines[1]["reply"]["fraction"] is True
+
+
+def test_csv_file(guardian, capsys, tmp_path):
+    """
+    Test that CSV cells are converted to the method's argument types.
+    """
+    path = tmp_path / "creates.csv"
+    path.write_text(
+        "ticker,spot_date,investment_amount,bot_id,price,fractionals,margin\n"
+        "IBM,2022-02-15,100000,CLASSIC_classic_025,156.5,false,\n"
+        "AAPL,2022-02-15,50000,CLASSIC_classic_025,,yes,2\n"
+    )
+    code, lines, _ = run(guardian, capsys, "create", str(path), "-c", "2", "--include-input")
+    assert code == 0
+    replies = {line["reply"]["ticker"]: line for line in lines}
+    assert replies["IBM"]["reply"]["entry_price"] == 156.5
+    assert replies["AAPL"]["reply"]["fraction"] is True and replies["AAPL"]["reply"]["margin"] == 2
+    assert replies["IBM"]["input"]["price"] == "156.5"
+
+
+def test_bad_records_fail_alone(guardian, capsys, tmp_path):
+    """
+    Test that malformed records are reported on their own line without stopping the run.
+    """
+    path = tmp_path / "creates.jsonl"
+    path.write_text("\n".join([json.dumps(CREATES[0]), "{not json", "[1, 2]", json.dumps({"ticker": "IBM"})]))
+    output = tmp_path / "replies.jsonl"
+    code = main(["create", str(path), "--ordered", "--include-input", "-o", str(output),
+                 "--address", guardian.address, "--port", guardian.port])
+    assert code == 1
+    assert capsys.readouterr().err.strip() == "1 ok, 3 failed"
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["ok"] for line in lines] == [True, False, False, False]
+    assert lines[1]["input"] == "{not json" and lines[2]["input"] == [1, 2]
+    assert lines[3]["error"].startswith("TypeError")
+
+
+def test_replies_not_one_line_of_json(capsys, monkeypatch):
+    """
+    Test that replies spanning lines or not in JSON are written as strings.
+    """
+    monkeypatch.setattr("sys.stdin", io.StringIO("".join(json.dumps(record) + "\n" for record in CREATES)))
+    with LocalGuardian(OddReplyServicer()) as guardian:
+        code, lines, _ = run(guardian, capsys, "create", "--ordered")
+    assert code == 0 and len(lines) == 2
+    assert "reply" not in lines[0] and json.loads(lines[0]["reply_text"])["ticker"] == "IBM"
+    assert lines[1]["reply_text"] == "not json"
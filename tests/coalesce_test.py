@@ -0,0 +1,120 @@
+# Request coalescing test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import grpc
+import pytest
+from DroidRpc import Client
+from DroidRpc.coalesce import SingleFlight, request_key
+from DroidRpc.dates import date_to_timestamp
+from DroidRpc.grpc_interface import bot_pb2
+from DroidRpc.testing import FakeEchoServicer, LocalGuardian
+from hedging_test import hedge_inputs
+
+
+class GatedServicer(FakeEchoServicer):
+    """
+    Holds hedges until `gate` is set.
+    """
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+
+    def HedgeBot(self, request, context):
+        self.gate.wait(5)
+        return super().HedgeBot(request, context)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_identical_hedges_share_one_call():
+    """
+    Test that concurrent identical hedges send one RPC, while different ones do not.
+    """
+    servicer = GatedServicer()
+    with LocalGuardian(servicer) as guardian, \
+            Client(address=guardian.address, port=guardian.port, coalesce=True) as client, \
+            ThreadPoolExecutor(max_workers=6) as executor:
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        futures = [executor.submit(client.hedge, **hedge_inputs(bot)) for _ in range(5)]
+        other = executor.submit(client.hedge, **hedge_inputs(bot, current_price=161))
+        wait_for(lambda: client.coalescer.stats()["calls"] == 7)
+        servicer.gate.set()
+        replies = [future.result() for future in futures]
+        assert other.result() != replies[0]
+    assert all(reply is replies[0] for reply in replies)
+    assert servicer.calls["HedgeBot"] == 2
+    assert client.coalescer.stats() == {"calls": 7, "coalesced": 4, "in_flight": 0}
+
+
+def test_follower_keeps_its_own_deadline():
+    """
+    Test that a call sharing a slow call gives up at its own timeout, while the shared
+    call carries on.
+    """
+    servicer = GatedServicer()
+    with LocalGuardian(servicer) as guardian, \
+            Client(address=guardian.address, port=guardian.port, coalesce=True) as client, \
+            ThreadPoolExecutor(max_workers=1) as executor:
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        leader = executor.submit(client.hedge, **hedge_inputs(bot))
+        wait_for(lambda: client.coalescer.stats()["in_flight"] == 1)
+        start = time.monotonic()
+        with pytest.raises(grpc.RpcError) as error:
+            client.hedge(**hedge_inputs(bot), timeout=0.1)
+        assert time.monotonic() - start < 1
+        assert error.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+        assert client.coalescer.stats()["coalesced"] == 1
+        servicer.gate.set()
+        assert leader.result()["status"] == "active"
+    assert servicer.calls["HedgeBot"] == 1
+
+
+def test_sequential_calls_not_coalesced(guardian):
+    with Client(address=guardian.address, port=guardian.port, coalesce=True) as client:
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        first = client.hedge(**hedge_inputs(bot))
+        assert client.hedge(**hedge_inputs(bot)) == first
+        assert client.coalescer.stats()["coalesced"] == 0
+
+
+def test_error_is_shared():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("bad request")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", fail)
+        started.wait(5)
+        follower = executor.submit(flight.do, "key", fail)
+        wait_for(lambda: flight.stats()["coalesced"] == 1)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_request_key_ignores_time_of_day():
+    def hedge(now, day="2022-03-01"):
+        return bot_pb2.Hedge(ric="IBM", current_price=160, expiry=date_to_timestamp(day, now))
+
+    morning, evening = datetime(2022, 2, 16, 9, 30, 0, 1), datetime(2022, 2, 16, 17, 5, 59, 999)
+    assert hedge(morning).SerializeToString() != hedge(evening).SerializeToString()
+    assert request_key(hedge(morning)) == request_key(hedge(evening))
+    assert request_key(hedge(morning)) != request_key(hedge(morning, "2022-03-02"))
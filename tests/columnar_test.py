@@ -0,0 +1,51 @@
+# Columnar hedge results test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import pytest
+from DroidRpc import HedgeResult
+from DroidRpc.batch import BatchItem
+
+np = pytest.importorskip("numpy")
+from DroidRpc.columnar import HedgeResultColumns
+
+class TestHedgeResultColumns:
+    def items(self):
+        """
+        Returns batch items as yielded by `Client.hedge_many`, including one failure.
+        """
+        return [
+            BatchItem(0, {"ticker": "IBM"}, {"share_num": 10.0, "share_change": 2.0, "status": "active"}),
+            BatchItem(1, {"ticker": "AAPL"}, HedgeResult.from_reply({"share_num": 5.0, "share_change": -1.0, "status": "active"})),
+            BatchItem(2, {"ticker": "IBM"}, {"share_num": 7.0, "share_change": 3.0, "status": "stopped"}),
+            BatchItem(3, {"ticker": "IBM"}, error=RuntimeError("unavailable")),
+        ]
+
+    def test_collect(self):
+        """
+        Test that replies land in their columns, one row per item.
+        """
+        columns = HedgeResultColumns.collect(self.items(), capacity=1)
+        assert len(columns) == 4
+        np.testing.assert_array_equal(columns.column("share_num")[:3], [10.0, 5.0, 7.0])
+        assert np.isnan(columns.column("share_num")[3])
+        assert np.isnan(columns.column("delta")).all()
+        np.testing.assert_array_equal(columns.column("ok"), [True, True, True, False])
+
+    def test_sum_by_ticker(self):
+        """
+        Test that per-ticker sums skip failed calls.
+        """
+        columns = HedgeResultColumns.collect(self.items())
+        assert columns.sum_by_ticker("share_change") == {"IBM": 5.0, "AAPL": -1.0}
+
+    def test_status_counts(self):
+        columns = HedgeResultColumns.collect(self.items())
+        assert columns.status_counts() == {"active": 2, "stopped": 1, None: 1}
+
+    def test_rejects_raw_replies(self):
+        columns = HedgeResultColumns()
+        with pytest.raises(TypeError, match="raw"):
+            columns.append('{"share_num": 10.0}', "IBM")
+        assert len(columns) == 0
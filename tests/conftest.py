@@ -0,0 +1,48 @@
+# Shared fixtures
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import socket
+import pytest
+from DroidRpc import Client
+from DroidRpc.testing import LocalGuardian
+
+@pytest.fixture(scope="session")
+def guardian():
+    """
+    A deterministic stand-in for the bot service, served on a local port.
+    """
+    with LocalGuardian() as server:
+        yield server
+
+@pytest.fixture
+def client(guardian):
+    """
+    A client connected to the local stand-in bot service.
+    """
+    with Client(address=guardian.address, port=guardian.port) as client:
+        yield client
+
+@pytest.fixture
+def closed_port():
+    """
+    A local port nothing listens on, for calls that must fail with UNAVAILABLE.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return str(sock.getsockname()[1])
+
+class FakeTime:
+    """
+    A `time_source` that only moves when a test sets `now`.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeTime()
@@ -0,0 +1,166 @@
+# Converter test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pytest
+from google.protobuf import descriptor_pb2, struct_pb2
+from google.protobuf.descriptor import FieldDescriptor
+from DroidRpc.converter import (protobuf_to_dict, dict_to_protobuf, dicts_to_protobufs,
+                                datetime_to_timestamp, TYPE_CALLABLE_MAP, _TO_DICT_PLANS, _SETTER_PLANS)
+from DroidRpc.grpc_interface import bot_pb2
+
+def sample_messages():
+    """
+    Returns messages covering scalars, timestamps, optionals, nesting, maps and enums.
+    """
+    hedge = bot_pb2.Hedge(
+        bot_id="CLASSIC_classic_025",
+        ric="IBM",
+        current_price=170,
+        expiry=datetime_to_timestamp(datetime(2022, 3, 15)),
+        strike=156.5,
+    )
+    descriptor = descriptor_pb2.FileDescriptorProto()
+    bot_pb2.DESCRIPTOR.CopyToProto(descriptor)
+    # Empty sub-messages do not survive a dict round trip.
+    for method in descriptor.service[0].method:
+        method.ClearField("options")
+    struct = struct_pb2.Struct()
+    struct.update({"a": 1, "b": {"c": [1, "x", None, True]}})
+    return [hedge, bot_pb2.EchoReply(), descriptor, struct]
+
+
+class TestCompiledProtobufToDict:
+    @pytest.mark.parametrize("pb", sample_messages())
+    @pytest.mark.parametrize("options", [
+        {},
+        {"including_default_value_fields": True},
+        {"use_enum_labels": True, "lowercase_enum_lables": True},
+    ])
+    def test_matches_legacy(self, pb, options):
+        """
+        Test that the compiled conversion gives the same dict as the legacy one.
+        """
+        assert protobuf_to_dict(pb, compiled=True, **options) == protobuf_to_dict(pb, **options)
+
+    def test_map_missing_unset_type(self):
+        """
+        Test that a map without a type only unset fields have converts like the legacy
+        path, and fails like it once such a field is set.
+        """
+        type_callable_map = {key: value for key, value in TYPE_CALLABLE_MAP.items()
+                             if key != FieldDescriptor.TYPE_BOOL}
+        pb = bot_pb2.Create(ticker="IBM", margin=2)
+        assert (protobuf_to_dict(pb, type_callable_map, compiled=True)
+                == protobuf_to_dict(pb, type_callable_map) == {"ticker": "IBM", "margin": 2})
+        pb.fraction = True
+        for compiled in (False, True):
+            with pytest.raises(TypeError):
+                protobuf_to_dict(pb, type_callable_map, compiled=compiled)
+
+    def test_plan_reused(self):
+        """
+        Test that converting again reuses the cached plan.
+        """
+        pb = sample_messages()[0]
+        protobuf_to_dict(pb, compiled=True)
+        size = len(_TO_DICT_PLANS)
+        protobuf_to_dict(pb, compiled=True)
+        assert len(_TO_DICT_PLANS) == size
+
+    def test_cold_cache_threads(self):
+        """
+        Test that threads converting at once on a cold cache all get the defaults.
+        """
+        pb = bot_pb2.Hedge(ric="IBM")
+        expected = protobuf_to_dict(pb, including_default_value_fields=True)
+        _TO_DICT_PLANS.clear()
+        barrier = threading.Barrier(8)
+
+        def convert(_):
+            barrier.wait()
+            return protobuf_to_dict(pb, compiled=True, including_default_value_fields=True)
+
+        with ThreadPoolExecutor(8) as executor:
+            assert list(executor.map(convert, range(8))) == [expected] * 8
+
+
+class TestDictToProtobuf:
+    @pytest.fixture(params=[False, True], ids=["legacy", "compiled"])
+    def compiled(self, request):
+        return request.param
+
+    @pytest.mark.parametrize("pb", sample_messages())
+    def test_round_trip(self, pb, compiled):
+        """
+        Test that converting a dict to a message and back gives the same dict.
+        """
+        assert dict_to_protobuf(type(pb), protobuf_to_dict(pb), compiled=compiled) == pb
+
+    def test_datetime_field(self, compiled):
+        """
+        Test that datetimes are copied into Timestamp fields.
+        """
+        pb = dict_to_protobuf(bot_pb2.Hedge, {"ric": "IBM", "expiry": datetime(2022, 3, 15)}, compiled=compiled)
+        assert pb.expiry == datetime_to_timestamp(datetime(2022, 3, 15))
+
+    def test_strict(self, compiled):
+        """
+        Test that unknown keys raise in strict mode and are skipped otherwise.
+        """
+        with pytest.raises(KeyError):
+            dict_to_protobuf(bot_pb2.Hedge, {"ric": "IBM", "unknown": 1}, compiled=compiled)
+        pb = dict_to_protobuf(bot_pb2.Hedge, {"ric": "IBM", "unknown": 1}, strict=False, compiled=compiled)
+        assert pb.ric == "IBM"
+
+    def test_strict_leaves_instance_untouched(self, compiled):
+        """
+        Test that an unknown key in strict mode raises before any field of the instance is set.
+        """
+        pb = bot_pb2.Hedge(ric="IBM", current_price=170)
+        with pytest.raises(KeyError):
+            dict_to_protobuf(pb, {"ric": "AAPL", "current_price": 171, "unknown": 1}, compiled=compiled)
+        assert pb == bot_pb2.Hedge(ric="IBM", current_price=170)
+
+    def test_ignore_none(self, compiled):
+        pb = dict_to_protobuf(bot_pb2.Create, {"ticker": "IBM", "tp_multiplier": None}, ignore_none=True,
+                              compiled=compiled)
+        assert not pb.HasField("tp_multiplier")
+
+    def test_dicts_to_protobufs(self, compiled):
+        """
+        Test that the bulk entry point builds one message per dict, in order.
+        """
+        values = ({"ric": "IBM", "current_price": price} for price in range(100))
+        messages = list(dicts_to_protobufs(bot_pb2.Hedge, values, compiled=compiled))
+        assert [pb.current_price for pb in messages] == list(range(100))
+        assert all(isinstance(pb, bot_pb2.Hedge) for pb in messages)
+
+    def test_legacy_sees_map_changes(self):
+        """
+        Test that without `compiled` a change to the type callable map applies at once.
+        """
+        type_callable_map = {}
+        assert dict_to_protobuf(bot_pb2.Hedge, {"ric": "ibm"}, type_callable_map).ric == "ibm"
+        type_callable_map[FieldDescriptor.TYPE_STRING] = str.upper
+        assert dict_to_protobuf(bot_pb2.Hedge, {"ric": "ibm"}, type_callable_map).ric == "IBM"
+
+    def test_cold_cache_threads(self):
+        """
+        Test that threads converting at once on a cold cache all set every field.
+        """
+        values = {"ric": "IBM", "current_price": 170.0, "expiry": datetime(2022, 3, 15), "strike": 156.5}
+        expected = dict_to_protobuf(bot_pb2.Hedge, values)
+        _SETTER_PLANS.clear()
+        barrier = threading.Barrier(8)
+
+        def convert(_):
+            barrier.wait()
+            return dict_to_protobuf(bot_pb2.Hedge, values, strict=False, compiled=True)
+
+        with ThreadPoolExecutor(8) as executor:
+            assert list(executor.map(convert, range(8))) == [expected] * 8
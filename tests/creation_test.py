@@ -4,7 +4,6 @@ __author__ = "LORA Technologies"
 __email__ = "asklora@loratechai.com"
 
 import pytest
-from DroidRpc import Client
 
 class InputGenerator:
     """
@@ -59,7 +58,6 @@ class InputGenerator:
 
 class TestBotCreation:
     bots = [] # Holds created bots.
-    client = Client(address='47.242.41.160')
 
     def check_bot_valid(self, bot_response):
         """
@@ -111,26 +109,26 @@ class TestBotCreation:
 
         return True
 
-    def test_successful_creation(self):
+    def test_successful_creation(self, client):
         """
         Test that the creation succeeds
         """
         # TODO Test more valid inputs
-        bot1 = self.client.create_bot(**InputGenerator.create_inputs())
+        bot1 = client.create_bot(**InputGenerator.create_inputs())
         self.bots.append(bot1)
         for bot in self.bots:
             assert self.check_bot_valid(bot)
 
     @pytest.mark.parametrize("inputs, expected", InputGenerator.create_missing_field_inputs())
-    def test_missing_fields(self, inputs, expected):
+    def test_missing_fields(self, client, inputs, expected):
         """
         Test error handling for missing fields.
         """
         if expected == "PASS":
-            assert self.check_bot_valid(self.client.create_bot(**inputs['inputs']))
+            assert self.check_bot_valid(client.create_bot(**inputs['inputs']))
         else:
             with pytest.raises(expected):
-                self.client.create_bot(**inputs['inputs'])
+                client.create_bot(**inputs['inputs'])
 
     @pytest.mark.skip(reason="Test not yet written")
     def test_incorrect_field_type(self):
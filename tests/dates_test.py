@@ -0,0 +1,38 @@
+# Date conversion test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from datetime import datetime, date
+import pytest
+from DroidRpc.converter import datetime_to_timestamp
+from DroidRpc.dates import date_to_timestamp, TradingDayClock
+
+class TestDateToTimestamp:
+    @pytest.mark.parametrize("date_string", ["2022-02-15", "1999-12-31", "2030-06-01"])
+    def test_matches_datetime_conversion(self, date_string):
+        """
+        Test that the cached conversion matches combining the parsed date with the time of day.
+        """
+        now = datetime(2022, 5, 4, 13, 45, 12, 345678)
+        expected = datetime_to_timestamp(datetime.combine(datetime.strptime(date_string, "%Y-%m-%d"), now.time()))
+        assert date_to_timestamp(date_string, now) == expected
+
+    def test_invalid_date(self):
+        with pytest.raises(ValueError):
+            date_to_timestamp("15/02/2022")
+
+
+class TestTradingDayClock:
+    def test_today(self):
+        assert TradingDayClock().today() == date.today().strftime("%Y-%m-%d")
+
+    def test_rollover(self):
+        """
+        Test that the cached day changes at midnight.
+        """
+        now = [datetime(2022, 2, 15, 23, 59, 59).timestamp()]
+        clock = TradingDayClock(time_source=lambda: now[0])
+        assert clock.today() == "2022-02-15"
+        now[0] += 2
+        assert clock.today() == "2022-02-16"
@@ -0,0 +1,114 @@
+# Deadline and batch budget test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import asyncio
+import threading
+import time
+import grpc
+import pytest
+from DroidRpc import AsyncClient, Client
+from DroidRpc.testing import FakeEchoServicer, LocalGuardian
+from hedging_test import hedge_inputs
+
+STUCK_PRICE = 999
+
+
+class StuckServicer(FakeEchoServicer):
+    """
+    Never answers hedges at `STUCK_PRICE`, until they are cancelled.
+    """
+    def HedgeBot(self, request, context):
+        if request.current_price == STUCK_PRICE:
+            while context.is_active():
+                time.sleep(0.005)
+            return None
+        return super().HedgeBot(request, context)
+
+
+@pytest.fixture(scope="module")
+def stuck_guardian():
+    with LocalGuardian(StuckServicer()) as server:
+        yield server
+
+
+@pytest.fixture
+def bot(client):
+    return client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+
+
+def test_default_deadlines(client):
+    assert client.deadlines == Client.DEFAULT_DEADLINES
+
+
+def test_stream_has_no_default_deadline(client):
+    assert client._timeout("HedgeStream", None) is None
+    with Client(deadlines={"HedgeStream": 60}) as stream_client:
+        assert stream_client._timeout("HedgeStream", None) == 60
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        Client(deadlines={"Hedge": 1})
+
+
+def test_call_timeout(stuck_guardian, bot):
+    """
+    Test that a per-call timeout overrides the method's deadline.
+    """
+    with Client(address=stuck_guardian.address, port=stuck_guardian.port) as client:
+        with pytest.raises(grpc.RpcError) as error:
+            client.hedge(**hedge_inputs(bot, current_price=STUCK_PRICE), timeout=0.05)
+        assert error.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+def test_method_deadline(stuck_guardian, bot):
+    with Client(address=stuck_guardian.address, port=stuck_guardian.port,
+                deadlines={"HedgeBot": 0.05}) as client:
+        with pytest.raises(grpc.RpcError) as error:
+            client.hedge(**hedge_inputs(bot, current_price=STUCK_PRICE))
+        assert error.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+        assert client.hedge(**hedge_inputs(bot))["status"] == "active"
+
+
+def test_stream_timeout(client, bot):
+    """
+    Test that a stream still waiting for positions ends at its timeout.
+    """
+    release = threading.Event()
+
+    def positions():
+        yield hedge_inputs(bot)
+        release.wait(5)
+
+    try:
+        with pytest.raises(grpc.RpcError) as error:
+            list(client.hedge_stream(positions(), timeout=0.1))
+    finally:
+        release.set()
+    assert error.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+def test_batch_budget(stuck_guardian, bot):
+    """
+    Test that a batch gives up on stuck bots once its budget is spent and reports them.
+    """
+    prices = [160, STUCK_PRICE, 161, STUCK_PRICE, 162]
+    positions = [hedge_inputs(bot, current_price=price) for price in prices]
+    with Client(address=stuck_guardian.address, port=stuck_guardian.port) as client:
+        start = time.monotonic()
+        items = list(client.hedge_many(positions, concurrency=5, budget=0.2))
+        assert time.monotonic() - start < 1
+    assert [item.missed for item in items] == [price == STUCK_PRICE for price in prices]
+    assert all(item.ok for item in items if not item.missed)
+
+
+def test_async_call_timeout(stuck_guardian, bot):
+    async def hedge():
+        async with AsyncClient(address=stuck_guardian.address, port=stuck_guardian.port) as client:
+            await client.hedge(**hedge_inputs(bot, current_price=STUCK_PRICE), timeout=0.05)
+
+    with pytest.raises(grpc.RpcError) as error:
+        asyncio.run(hedge())
+    assert error.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
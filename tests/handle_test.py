@@ -0,0 +1,58 @@
+# Bot handle test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import pytest
+from DroidRpc import BotHandle
+from DroidRpc.coalesce import request_key
+from DroidRpc.grpc_interface import bot_pb2
+from hedging_test import hedge_inputs
+
+
+@pytest.fixture
+def bot(client):
+    return client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+
+
+@pytest.fixture
+def handle(client, bot):
+    return BotHandle(client, bot, investment_amount=100000)
+
+
+class TestBotHandle:
+    def test_hedge(self, client, bot, handle):
+        """
+        Test that a handle sends the same hedge as the full argument list.
+        """
+        request = handle.hedge_request(160, trading_day="2022-02-16")
+        expected = client._position_request(bot_pb2.Hedge, **hedge_inputs(bot))
+        assert request_key(request) == request_key(expected)
+        response = handle.hedge(160, trading_day="2022-02-16")
+        assert response == client.hedge(**hedge_inputs(bot))
+        assert handle.share_num == response['share_num']
+        assert handle.delta == response['delta']
+
+    def test_option_price_sent_once_returned(self, handle):
+        assert not handle.hedge_request(160).HasField("option_price")
+        handle._update({"option_price": 2.5}, 160)
+        assert handle.hedge_request(160).option_price == 2.5
+        handle._update({"option_price": 0}, 160)
+        request = handle.hedge_request(160)
+        assert request.HasField("option_price") and request.option_price == 0
+
+    def test_stop(self, client, bot, handle):
+        """
+        Test that a handle stops the bot like the full argument list, and carries the reply over.
+        """
+        response = handle.stop(160, trading_day="2022-02-16")
+        assert response == client.stop(**hedge_inputs(bot))
+        assert response['status'] == "stopped"
+        assert handle.share_num == 0
+        assert handle.bot_cash_balance == pytest.approx(100000 - bot['share_num'] * bot['entry_price']
+                                                        + bot['share_num'] * 160)
+
+
+def test_send_rejects_other_messages(client):
+    with pytest.raises(TypeError):
+        client.send(bot_pb2.EchoReply())
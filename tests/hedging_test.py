@@ -4,10 +4,41 @@ __author__ = "LORA Technologies"
 __email__ = "asklora@loratechai.com"
 
 import pytest
-from DroidRpc import Client
+from DroidRpc import HedgeResult
+
+def hedge_inputs(bot, current_price=160, trading_day="2022-02-16"):
+    """
+    Returns the `Client.hedge` arguments for the next hedge of a freshly created bot.
+    """
+    return {
+        "bot_id"            : bot['bot_id'],
+        "ticker"            : bot['ticker'],
+        "current_price"     : current_price,
+        "entry_price"       : bot['entry_price'],
+        "last_share_num"    : bot['share_num'],
+        "last_hedge_delta"  : bot['delta'],
+        "investment_amount" : 100000,
+        "bot_cash_balance"  : 100000 - bot['share_num'] * bot['entry_price'],
+        "stop_loss_price"   : bot['max_loss_price'],
+        "take_profit_price" : bot['target_profit_price'],
+        "expiry"            : bot['expiry'],
+        "trading_day"       : trading_day,
+    }
+
+@pytest.fixture
+def bot(client):
+    return client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
 
 class TestHedge:
-    @pytest.mark.skip(reason="Test not yet written")
-    def test_successful_hedge(self):
-        # TODO
-        pass
+    expected_keys = set(HedgeResult._fields)
+
+    def test_successful_hedge(self, client, bot):
+        response = client.hedge(**hedge_inputs(bot))
+        assert set(response) == self.expected_keys
+        assert response['status'] == "active"
+        assert response['share_num'] == bot['share_num'] + response['share_change']
+
+    def test_stop_loss_hit(self, client, bot):
+        response = client.hedge(**hedge_inputs(bot, current_price=bot['max_loss_price'] - 1))
+        assert response['status'] == "stopped"
+        assert response['share_num'] == 0
@@ -0,0 +1,32 @@
+# JSON backend test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import json
+import pytest
+from DroidRpc.json_backend import get_decoder
+
+class TestJsonBackend:
+    payload = '{"share_num": 319.0, "delta": 0.5, "status": "active", "side": "buy"}'
+
+    @pytest.mark.parametrize("name", ["auto", "json", "orjson", "ujson"])
+    def test_decodes_like_stdlib(self, name):
+        """
+        Test that every installed backend decodes replies like the stdlib.
+        """
+        try:
+            decode = get_decoder(name)
+        except ImportError:
+            pytest.skip("%s is not installed" % name)
+        assert decode(self.payload) == json.loads(self.payload)
+
+    def test_auto_falls_back_to_stdlib(self):
+        """
+        Test that payloads only the stdlib accepts still decode in auto mode.
+        """
+        assert get_decoder("auto")('{"delta": Infinity}') == {"delta": float("inf")}
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_decoder("simplejson")
@@ -0,0 +1,56 @@
+# Client metrics test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import grpc
+import pytest
+from DroidRpc import Client
+from DroidRpc.metrics import LatencyHistogram
+from hedging_test import hedge_inputs
+
+class TestLatencyHistogram:
+    def test_percentiles_within_precision(self):
+        """
+        Test that percentiles are within the histogram's relative precision.
+        """
+        histogram = LatencyHistogram()
+        values = list(range(1, 100001))
+        for value in values:
+            histogram.record(value)
+        for fraction in (0.5, 0.9, 0.99):
+            exact = values[int(fraction * len(values)) - 1]
+            assert abs(histogram.percentile(fraction) - exact) <= exact / 64
+
+    def test_empty(self):
+        assert LatencyHistogram().percentile(0.5) is None
+
+
+class TestClientMetrics:
+    def test_disabled_by_default(self, client):
+        assert client.metrics_snapshot() == {}
+
+    def test_records_calls(self, guardian):
+        """
+        Test that calls are recorded per method.
+        """
+        with Client(address=guardian.address, port=guardian.port, metrics=True) as client:
+            bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+            for _ in range(5):
+                client.hedge(**hedge_inputs(bot))
+            snapshot = client.metrics_snapshot()
+        hedge = snapshot["/echo.Echo/HedgeBot"]
+        assert hedge["latency"]["count"] == 5
+        assert hedge["status_codes"] == {"OK": 5}
+        assert hedge["request_bytes"] > 0 and hedge["response_bytes"] > 0
+        assert snapshot["/echo.Echo/CreateBot"]["latency"]["count"] == 1
+
+    def test_records_failures(self, closed_port):
+        """
+        Test that failed calls are recorded with their status code.
+        """
+        with Client(address="127.0.0.1", port=closed_port, metrics=True) as client:
+            with pytest.raises(grpc.RpcError):
+                client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025")
+            snapshot = client.metrics_snapshot()
+        assert snapshot["/echo.Echo/CreateBot"]["status_codes"] == {"UNAVAILABLE": 1}
@@ -0,0 +1,31 @@
+# Connection pooling test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from collections import Counter
+import pytest
+from DroidRpc import Client
+
+
+def test_calls_rotate_over_pool(guardian):
+    """
+    Test that calls are spread round-robin over the channels of the pool.
+    """
+    with Client(address=guardian.address, port=guardian.port, pool_size=3) as client:
+        assert len(client.channels) == len(client.stubs) == 3
+        used = Counter()
+        for index, stub in enumerate(client.stubs):
+            def counted(request, call=stub.CreateBot, index=index, **kwargs):
+                used[index] += 1
+                return call(request, **kwargs)
+            stub.CreateBot = counted
+        replies = [client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+                   for _ in range(6)]
+    assert used == {0: 2, 1: 2, 2: 2}
+    assert all(reply == replies[0] for reply in replies)
+
+
+def test_empty_pool():
+    with pytest.raises(ValueError):
+        Client(pool_size=0)
@@ -0,0 +1,98 @@
+# Portfolio test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import pytest
+from DroidRpc import BotHandle, Client
+from DroidRpc.grpc_interface import bot_pb2
+
+np = pytest.importorskip("numpy")
+from DroidRpc.portfolio import Portfolio
+
+BOTS = [("IBM", 156.5), ("AAPL", 170.0), ("MSFT", 290.0)]
+
+
+@pytest.fixture
+def creates(client):
+    return [client.create_bot(ticker, "2022-02-15", 100000, "CLASSIC_classic_025", price=price)
+            for ticker, price in BOTS]
+
+
+@pytest.fixture
+def portfolio(creates):
+    portfolio = Portfolio(capacity=2)
+    portfolio.extend(creates, investment_amount=100000)
+    return portfolio
+
+
+class TestPortfolio:
+    def test_rows(self, portfolio, creates):
+        assert len(portfolio) == 3
+        assert portfolio.row((creates[1]["bot_id"], "AAPL")) == 1
+        assert portfolio.tickers == ["IBM", "AAPL", "MSFT"]
+        assert portfolio.column("share_num").tolist() == [create["share_num"] for create in creates]
+        assert portfolio.active.all()
+
+    def test_rebalance_matches_bot_handles(self, client, portfolio, creates):
+        """
+        Test that chained rebalances give the same state as hedging each bot by handle.
+        """
+        handles = [BotHandle(client, create, investment_amount=100000) for create in creates]
+        for day, move in (("2022-02-16", 1.02), ("2022-02-17", 1.05), ("2022-02-18", 0.99)):
+            prices = {ticker: price * move for ticker, price in BOTS}
+            assert portfolio.rebalance(client, prices, trading_day=day, concurrency=2) == []
+            for handle in handles:
+                handle.hedge(prices[handle.ticker], trading_day=day)
+        assert portfolio.column("share_num").tolist() == [handle.share_num for handle in handles]
+        assert portfolio.column("delta").tolist() == [handle.delta for handle in handles]
+        assert portfolio.column("bot_cash_balance").tolist() == [handle.bot_cash_balance for handle in handles]
+
+    def test_requests_from_price_array(self, portfolio, creates):
+        requests = list(portfolio.requests(bot_pb2.Hedge,
+                                           np.array([150.0, 160.0, 170.0]), trading_day="2022-02-16",
+                                           ask_prices=np.array([151.0, 161.0, 171.0])))
+        assert [row for row, _ in requests] == [0, 1, 2]
+        _, request = requests[1]
+        assert request.bot_id == creates[1]["bot_id"] and request.ric == "AAPL"
+        assert request.current_price == 160.0 and request.ask_price == 161.0
+        assert request.last_share_num == creates[1]["share_num"]
+        assert not request.HasField("bid_price")
+
+    def test_stopped_bots_leave_the_round(self, client, portfolio):
+        """
+        Test that a bot hitting its stop loss is not hedged again.
+        """
+        prices = {"IBM": 1.0, "AAPL": 171.0, "MSFT": 291.0}
+        portfolio.rebalance(client, prices, trading_day="2022-02-16")
+        assert portfolio.active.tolist() == [False, True, True]
+        assert portfolio.statuses[portfolio.column("status")[0]] == "stopped"
+        rows = [row for row, _ in portfolio.requests(bot_pb2.Hedge, prices)]
+        assert rows == [1, 2]
+
+    def test_duplicate_bot(self, client, portfolio, creates):
+        """
+        Test that a second bot on the same strategy and ticker is not silently merged into the first.
+        """
+        other = client.create_bot("IBM", "2022-02-15", 50000, "CLASSIC_classic_025", price=150.0)
+        with pytest.raises(KeyError):
+            portfolio.add(other, investment_amount=50000)
+        assert len(portfolio) == 3
+        assert portfolio.add(other, investment_amount=50000, key="second IBM") == 3
+        assert portfolio.add(other, investment_amount=50000, replace=True) == 0
+        assert len(portfolio) == 4
+        assert portfolio.column("investment_amount").tolist() == [50000, 100000, 100000, 50000]
+
+    def test_stop(self, client, portfolio):
+        assert portfolio.stop(client, {"IBM": 160.0, "AAPL": 171.0, "MSFT": 291.0}) == []
+        assert not portfolio.active.any()
+
+    def test_missing_price(self, client, portfolio):
+        with pytest.raises(KeyError):
+            portfolio.rebalance(client, {"IBM": 160.0})
+
+    def test_failures_are_reported(self, portfolio, closed_port):
+        with Client(address="127.0.0.1", port=closed_port) as client:
+            failed = portfolio.rebalance(client, {"IBM": 160.0, "AAPL": 171.0, "MSFT": 291.0})
+        assert sorted(item.record for item in failed) == sorted(portfolio.keys)
+        assert portfolio.active.all()
@@ -0,0 +1,94 @@
+# Call profiling test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from DroidRpc import BotHandle, Client
+from DroidRpc.profiling import PHASES, CallProfiler
+from DroidRpc.testing import LocalGuardian
+from coalesce_test import GatedServicer, wait_for
+from hedging_test import hedge_inputs
+
+
+def test_disabled_by_default(client):
+    assert client.profiler is None
+
+
+def test_phase_breakdown(guardian):
+    """
+    Test that every phase of a call is timed and accounts for the whole call.
+    """
+    with Client(address=guardian.address, port=guardian.port, profile=True) as client:
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        for _ in range(5):
+            client.hedge(**hedge_inputs(bot))
+        snapshot = client.profiler.snapshot()
+        assert snapshot["CreateBot"]["count"] == 1
+        hedges = snapshot["HedgeBot"]
+        assert hedges["count"] == 5
+        for phase in PHASES:
+            assert hedges["phases"][phase]["mean_us"] > 0
+        assert abs(sum(phase["share"] for phase in hedges["phases"].values()) - 1) < 1e-9
+
+
+def test_worst_calls(guardian):
+    """
+    Test that only the slowest calls are kept, slowest first.
+    """
+    with Client(address=guardian.address, port=guardian.port, profile=True) as client:
+        client.profiler.worst_n = 3
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        for _ in range(5):
+            client.hedge(**hedge_inputs(bot))
+        worst = client.profiler.worst()
+        assert len(worst) == 3
+        totals = [call["total_us"] for call in worst]
+        assert totals == sorted(totals, reverse=True)
+        client.profiler.reset()
+        assert client.profiler.snapshot() == {} and client.profiler.worst() == []
+
+
+def test_finish_without_phases():
+    profiler = CallProfiler()
+    profiler.finish(profiler.start("HedgeBot"))
+    assert profiler.snapshot()["HedgeBot"]["count"] == 1
+    assert profiler.current() is None
+
+
+def test_failed_request_builder(guardian):
+    """
+    Test that a request that cannot be built leaves no profile behind for the next call.
+    """
+    with Client(address=guardian.address, port=guardian.port, profile=True) as client:
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        with pytest.raises(ValueError):
+            client.stop(**dict(hedge_inputs(bot), expiry="15/03/2022"))
+        assert client.profiler.current() is None
+        BotHandle(client, bot, investment_amount=100000).hedge(160, trading_day="2022-02-16")
+        snapshot = client.profiler.snapshot()
+        assert "StopBot" not in snapshot and snapshot["HedgeBot"]["count"] == 1
+
+
+def test_coalesced_follower():
+    """
+    Test that a hedge sharing another's call leaves no profile behind, and only the
+    call actually sent is profiled.
+    """
+    servicer = GatedServicer()
+    with LocalGuardian(servicer) as guardian, \
+            Client(address=guardian.address, port=guardian.port, profile=True, coalesce=True) as client, \
+            ThreadPoolExecutor(max_workers=2) as executor:
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+
+        def hedge():
+            client.hedge(**hedge_inputs(bot))
+            return client.profiler.current()
+
+        futures = [executor.submit(hedge) for _ in range(2)]
+        wait_for(lambda: client.coalescer.stats()["calls"] == 3)
+        servicer.gate.set()
+        assert [future.result() for future in futures] == [None, None]
+        assert client.coalescer.stats()["coalesced"] == 1
+        assert client.profiler.snapshot()["HedgeBot"]["count"] == 1
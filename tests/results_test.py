@@ -0,0 +1,46 @@
+# Typed results test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import pickle
+import pytest
+from DroidRpc import CreateResult, HedgeResult, StopResult
+
+class TestResults:
+    reply = {
+        "share_num": 319.0,
+        "delta": 0.5,
+        "share_change": 12.0,
+        "status": "active",
+        "current_price": 170.0,
+    }
+
+    def test_round_trip(self):
+        """
+        Test that to_dict gives back the reply the result was built from.
+        """
+        assert HedgeResult.from_reply(self.reply).to_dict() == self.reply
+
+    def test_missing_and_unknown_fields(self):
+        """
+        Test that missing documented fields read as None and unknown fields are kept.
+        """
+        result = StopResult.from_reply({"share_num": 0, "pnl": 12.5})
+        assert result.share_num == 0
+        assert result.strike is None
+        assert result.extra == {"pnl": 12.5}
+        assert result.to_dict() == {"share_num": 0, "pnl": 12.5}
+        with pytest.raises(AttributeError):
+            result.not_a_field
+
+    def test_no_instance_dict(self):
+        """
+        Test that results are slotted, without a per-instance dict.
+        """
+        for result_class in (CreateResult, HedgeResult, StopResult):
+            assert not hasattr(result_class.from_reply({}), "__dict__")
+
+    def test_pickle(self):
+        result = HedgeResult.from_reply(self.reply)
+        assert pickle.loads(pickle.dumps(result)) == result
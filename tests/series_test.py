@@ -0,0 +1,74 @@
+# Binary price series test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import struct
+import pytest
+
+np = pytest.importorskip("numpy")
+from DroidRpc.backtest import Bar, backtest
+from DroidRpc.series import bar_dtype, iter_bars, open_bars, write_bars
+
+BARS = [
+    Bar("2022-02-15", 100.0, 99.0, 101.0, 100.1, 99.9),
+    Bar("2022-02-16", 101.0, 100.0, 102.0),
+    Bar("2022-02-17", 103.0),
+]
+
+
+@pytest.mark.parametrize("name", ["ibm.bars", "ibm.npy"])
+def test_round_trip(tmp_path, name):
+    """
+    Test that bars written to either format are read back unchanged, chunk by chunk.
+    """
+    path = str(tmp_path / name)
+    assert write_bars(path, BARS, chunk_size=2) == 3
+    records = open_bars(path)
+    assert isinstance(records, np.memmap)
+    assert list(iter_bars(records, chunk_size=2)) == BARS
+
+
+def test_record_layout(tmp_path):
+    """
+    Test that records are packed 44-byte little-endian structs.
+    """
+    path = str(tmp_path / "ibm.bars")
+    write_bars(path, BARS[:1])
+    with open(path, "rb") as file:
+        data = file.read()
+    assert bar_dtype().itemsize == len(data) == 44
+    assert struct.unpack("<i5d", data) == (19038, 100.0, 99.0, 101.0, 100.1, 99.9)
+
+
+def test_empty_series(tmp_path):
+    path = str(tmp_path / "empty.bars")
+    assert write_bars(path, []) == 0
+    assert list(iter_bars(open_bars(path))) == []
+
+
+def test_failed_npy_write_leaves_no_temp_file(tmp_path):
+    """
+    Test that a bar failing mid-series does not leave the raw temp file behind.
+    """
+    def bars():
+        yield BARS[0]
+        raise RuntimeError("feed dropped")
+
+    with pytest.raises(RuntimeError):
+        write_bars(str(tmp_path / "ibm.npy"), bars(), chunk_size=1)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_wrong_npy_dtype(tmp_path):
+    path = str(tmp_path / "prices.npy")
+    np.save(path, np.zeros(3))
+    with pytest.raises(ValueError):
+        open_bars(path)
+
+
+def test_backtest_from_file(client, tmp_path):
+    path = str(tmp_path / "ibm.npy")
+    write_bars(path, BARS)
+    result = backtest(client, "IBM", "CLASSIC_classic_025", iter_bars(open_bars(path)), 100000)
+    assert [row.trading_day for row in result.timeline] == [bar.trading_day for bar in BARS]
@@ -3,11 +3,18 @@
 __author__ = "LORA Technologies"
 __email__ = "asklora@loratechai.com"
 
-import pytest
-from DroidRpc import Client
+from hedging_test import hedge_inputs
 
 class TestBotStop:
-    @pytest.mark.skip(reason="Test not yet written")
-    def test_successful_stop(self):
-        # TODO
-        pass
+    def test_successful_stop(self, client):
+        bot = client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+        response = client.stop(**hedge_inputs(bot))
+        assert response['status'] == "stopped"
+        assert response['share_num'] == 0
+        assert response['share_change'] == -bot['share_num']
+
+    def test_stop_many(self, client):
+        bots = [client.create_bot(ticker, "2022-02-15", 100000, "CLASSIC_classic_025") for ticker in ("IBM", "AAPL", "MSFT")]
+        items = list(client.stop_many([hedge_inputs(bot) for bot in bots], ordered=False))
+        assert sorted(item.index for item in items) == [0, 1, 2]
+        assert all(item.ok and item.result['status'] == "stopped" for item in items)
@@ -0,0 +1,37 @@
+# Hedge stream test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import pytest
+from hedging_test import hedge_inputs
+
+
+@pytest.fixture
+def bot(client):
+    return client.create_bot("IBM", "2022-02-15", 100000, "CLASSIC_classic_025", price=156.5)
+
+
+class TestHedgeStream:
+    def test_matches_unary_hedges(self, client, bot):
+        positions = [hedge_inputs(bot, current_price=price) for price in range(150, 170)]
+        assert list(client.hedge_stream(iter(positions))) == [client.hedge(**position) for position in positions]
+
+    def test_bad_position(self, guardian, client, bot):
+        """
+        Test that a malformed position raises its own error after the earlier replies.
+        """
+        positions = [hedge_inputs(bot, current_price=price) for price in range(150, 153)]
+        del positions[1]["expiry"]
+        received = guardian.servicer.calls["HedgeStream"]
+        replies = []
+        with pytest.raises(TypeError, match="expiry"):
+            for reply in client.hedge_stream(iter(positions)):
+                replies.append(reply)
+        assert replies == [client.hedge(**positions[0])]
+        assert guardian.servicer.calls["HedgeStream"] == received + 1
+
+    def test_rejects_timeout(self, client, bot):
+        positions = [dict(hedge_inputs(bot), timeout=1.0)]
+        with pytest.raises(TypeError, match="timeout"):
+            list(client.hedge_stream(positions))
@@ -0,0 +1,52 @@
+# Backtest sweep test
+
+__author__ = "LORA Technologies"
+__email__ = "asklora@loratechai.com"
+
+import pytest
+
+np = pytest.importorskip("numpy")
+from DroidRpc.backtest import Bar, backtest
+from DroidRpc.series import write_bars
+from DroidRpc.sweep import sweep
+
+SERIES = {
+    "IBM": [Bar("2022-02-15", 100.0), Bar("2022-02-16", 102.0), Bar("2022-02-17", 104.0)],
+    "AAPL": [Bar("2022-02-15", 100.0), Bar("2022-02-16", 90.0)],
+}
+
+
+def test_sweep(guardian, client, tmp_path):
+    """
+    Test that a sweep over a process pool gives one row per combination, matching
+    backtests run in this process.
+    """
+    path = str(tmp_path / "AAPL.bars")
+    write_bars(path, SERIES["AAPL"])
+    table = sweep(guardian.address, guardian.port, {"IBM": SERIES["IBM"], "AAPL": path},
+                  ["CLASSIC_classic_025", "CLASSIC_classic_001"], 100000,
+                  fractionals=(False, True), processes=2)
+    assert len(table) == 8 and table.errors == {}
+    rows = table.to_dicts()
+    assert [(row["ticker"], row["bot_id"], row["fractionals"]) for row in rows[:3]] == [
+        ("IBM", "CLASSIC_classic_025", False),
+        ("IBM", "CLASSIC_classic_025", True),
+        ("IBM", "CLASSIC_classic_001", False),
+    ]
+    for row in rows:
+        expected = backtest(client, row["ticker"], row["bot_id"], SERIES[row["ticker"]], 100000,
+                            fractionals=row["fractionals"])
+        assert (row["exit_reason"], row["bars"]) == (expected.exit_reason, len(expected.timeline))
+        assert row["pnl"] == pytest.approx(expected.pnl)
+    assert table.exit_reasons[table.column("exit_reason")[-1]] == "stop_loss"
+
+
+def test_errors_are_reported(tmp_path):
+    """
+    Test that a failing backtest is reported on its row without stopping the sweep.
+    """
+    table = sweep("127.0.0.1", "1", {"IBM": SERIES["IBM"]}, ["CLASSIC_classic_025"], 100000,
+                  processes=1, client_options={"deadlines": {"CreateBot": 1}})
+    assert table.exit_reasons == ["error"]
+    assert np.isnan(table.column("pnl")[0])
+    assert "UNAVAILABLE" in table.errors[0]